@@ -0,0 +1,146 @@
+"""
+🕸️ DAG Executor - Run independent agent steps concurrently
+Purpose: Multi-agent workflows (event creation, onboarding) declare which steps depend on which,
+and every step whose dependencies are done starts immediately, so a workflow takes as long as
+its critical path rather than the sum of all steps
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+DEFAULT_STEP_TIMEOUT_SECONDS = 30.0
+
+StepFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+StepCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class WorkflowStep:
+    """
+    One node of a workflow
+    run() receives the shared context plus the results of earlier steps, keyed by step name
+    """
+
+    def __init__(self, name: str, run: StepFunction, depends_on: Sequence[str] = (),
+                 timeout: Optional[float] = None, required: bool = True):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        # Optional steps (e.g. "send welcome email") may fail without failing the workflow
+        self.required = required
+
+
+class WorkflowStepError(Exception):
+    """Raised by DagExecutor.run when a required step fails or times out"""
+
+    def __init__(self, step: str, cause: BaseException, timings: Dict[str, Dict[str, Any]]):
+        super().__init__(f"Workflow step '{step}' failed: {cause!r}")
+        self.step = step
+        self.cause = cause
+        self.timings = timings
+
+
+class WorkflowResult:
+    """Step results plus per-step timings (offsets are relative to the workflow start)"""
+
+    def __init__(self, results: Dict[str, Any], timings: Dict[str, Dict[str, Any]], total_ms: float):
+        self.results = results
+        self.timings = timings
+        self.total_ms = total_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"results": self.results, "timings": self.timings, "total_ms": self.total_ms}
+
+
+class DagExecutor:
+    """Validates a set of steps once, then runs it any number of times"""
+
+    def __init__(self, steps: List[WorkflowStep], default_timeout: float = DEFAULT_STEP_TIMEOUT_SECONDS):
+        self.steps = {step.name: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("Workflow step names must be unique")
+        self.default_timeout = default_timeout
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Order steps so every dependency comes first; rejects unknown names and cycles"""
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Workflow has a dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self.steps[name].depends_on:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step '{name}' depends on unknown step '{dependency}'")
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    async def run(self, context: Optional[Dict[str, Any]] = None,
+                  on_step: Optional[StepCallback] = None) -> WorkflowResult:
+        """
+        Execute the workflow
+        on_step(name, timing) is called as each step finishes, e.g. to report job progress
+        """
+        context = dict(context or {})
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, Exception] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 2)
+
+        async def execute(step: WorkflowStep) -> None:
+            dependencies = [tasks[name] for name in step.depends_on]
+            if dependencies:
+                await asyncio.wait(dependencies)
+            blocked = [name for name in step.depends_on if timings[name]["status"] != "completed"]
+            if blocked:
+                timings[step.name] = {"status": "skipped", "blocked_by": blocked}
+            else:
+                step_started = elapsed_ms()
+                try:
+                    step_input = {**context, **{name: results[name] for name in step.depends_on}}
+                    timeout = step.timeout if step.timeout is not None else self.default_timeout
+                    results[step.name] = await asyncio.wait_for(step.run(step_input), timeout)
+                    status, error = "completed", None
+                except asyncio.TimeoutError as e:
+                    status, error = "timed_out", f"exceeded {timeout}s"
+                    errors[step.name] = e
+                except Exception as e:
+                    status, error = "failed", str(e)
+                    errors[step.name] = e
+                timings[step.name] = {
+                    "status": status,
+                    "started_ms": step_started,
+                    "duration_ms": round(elapsed_ms() - step_started, 2),
+                }
+                if error:
+                    timings[step.name]["error"] = error
+            if on_step:
+                on_step(step.name, timings[step.name])
+
+        for name in self.order:
+            tasks[name] = asyncio.create_task(execute(self.steps[name]), name=f"workflow-step-{name}")
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        for name in self.order:
+            if self.steps[name].required and timings[name]["status"] != "completed":
+                cause = errors.get(name) or RuntimeError(f"blocked by {timings[name]['blocked_by']}")
+                raise WorkflowStepError(name, cause, timings)
+        return WorkflowResult(results, timings, elapsed_ms())
@@ -0,0 +1,108 @@
+"""
+⏱️ Import Time - How long a fresh worker takes to import main, against a budget
+Purpose: Every worker (and every rolling restart) pays this before it can answer /health/live;
+anything heavy (agents, LLM clients, numpy) must be imported lazily to stay within the budget
+
+Run from apps/ecclesiaagents:
+    python -m benchmarks.import_time                      # fake DatabaseService, default budget
+    python -m benchmarks.import_time --budget-ms 600 --database real
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+DEFAULT_RUNS = 5
+# Modules main must never import eagerly; they load in the background warm-up or on first use
+LAZY_MODULES = ("agents.agent_manager", "services.analytics_engine", "numpy", "uvicorn")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _prelude(database: str) -> str:
+    if database == "fake":
+        return "from tests.fakes import install_fakes; install_fakes(database=True, agents=False); "
+    return ""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every line of python -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def measure_once(module: str = "main", database: str = "fake") -> Dict[str, Any]:
+    """Import `module` in a fresh interpreter and return its cumulative import time and breakdown"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{_prelude(database)}import {module}"],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    modules = parse_importtime(completed.stderr)
+    # A module's imports are listed before it, after the previous top-level line
+    end = next(index for index, (name, _, _, depth) in enumerate(modules) if name == module and depth == 0)
+    start = max((index for index in range(end) if modules[index][3] == 0), default=-1) + 1
+    total_us = modules[end][2]
+    imported = {name for name, *_ in modules[start:end]}
+    # Direct imports of main, slowest first: where the budget actually goes
+    children = sorted(
+        ((name, cumulative) for name, _, cumulative, depth in modules[start:end] if depth == 1),
+        key=lambda item: item[1], reverse=True,
+    )
+    return {
+        "total_ms": round(total_us / 1000, 2),
+        "slowest_imports_ms": {name: round(cumulative / 1000, 2) for name, cumulative in children[:10]},
+        "eager_lazy_modules": [name for name in LAZY_MODULES if name in imported],
+    }
+
+
+def measure_import_time(module: str = "main", runs: int = DEFAULT_RUNS, database: str = "fake",
+                        budget_ms: float = DEFAULT_BUDGET_MS) -> Dict[str, Any]:
+    """Median over `runs` fresh interpreters; within_budget is False if over budget or a lazy module loaded"""
+    samples = [measure_once(module, database) for _ in range(runs)]
+    totals = [sample["total_ms"] for sample in samples]
+    median_ms = round(statistics.median(totals), 2)
+    eager = samples[-1]["eager_lazy_modules"]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": median_ms,
+        "max_ms": max(totals),
+        "budget_ms": budget_ms,
+        "within_budget": median_ms <= budget_ms and not eager,
+        "eager_lazy_modules": eager,
+        "slowest_imports_ms": samples[-1]["slowest_imports_ms"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import time of the API module against a budget")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--database", choices=("fake", "real"), default="fake",
+                        help="Import with the in-memory DatabaseService, or the real one")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    result = measure_import_time(args.module, args.runs, args.database, args.budget_ms)
+    print(f"import {result['module']}: median {result['median_ms']:.0f} ms (max {result['max_ms']:.0f} ms, "
+          f"budget {result['budget_ms']:.0f} ms)")
+    for name, milliseconds in result["slowest_imports_ms"].items():
+        print(f"  {name:<40} {milliseconds:>8.1f} ms")
+    if result["eager_lazy_modules"]:
+        print(f"Imported eagerly but should be lazy: {', '.join(result['eager_lazy_modules'])}")
+    return 0 if result["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+🚦 Load Test - Concurrent load against every API route, in-process
+Purpose: Catch regressions in throughput and tail latency per endpoint before they ship
+The app runs inside this process behind httpx's ASGI transport (no sockets), with its lifespan,
+so numbers reflect routing, validation, agents/db (real or fake) and serialization only
+"""
+import asyncio
+import itertools
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+from fastapi.routing import APIRoute
+
+PERCENTILES = (50, 90, 95, 99)
+
+_unique = itertools.count(1)
+
+
+class Scenario:
+    """
+    One route under load
+    route: the route template it covers (used to check that every route in main.py is exercised);
+    request: builds (method, url, httpx kwargs) for each call, so bodies and ids can vary per request
+    """
+
+    def __init__(self, name: str, method: str, route: str,
+                 request: Optional[Callable[["ScenarioContext"], Tuple[str, str, Dict[str, Any]]]] = None):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.request = request or (lambda context: (method, route, {}))
+
+
+class ScenarioContext:
+    """Ids discovered from the running app, so path parameters point at real rows"""
+
+    def __init__(self):
+        self.event_ids: List[int] = [1]
+        self.member_ids: List[int] = [1]
+        self.task_ids: List[int] = [1]
+        self.job_id: str = "unknown"
+        self.rng = random.Random(7)
+
+    def event_id(self) -> int:
+        return self.rng.choice(self.event_ids)
+
+    def member_id(self) -> int:
+        return self.rng.choice(self.member_ids)
+
+    def task_id(self) -> int:
+        return self.rng.choice(self.task_ids)
+
+
+def _event_body(offset_days: int = 0) -> Dict[str, Any]:
+    start = datetime.now().replace(microsecond=0) + timedelta(days=30 + offset_days)
+    return {
+        "title": f"Benchmark event {next(_unique)}", "description": "Load test", "location": "Hall 1",
+        "start_date": start.isoformat(), "end_date": (start + timedelta(hours=2)).isoformat(), "group_ids": [1],
+    }
+
+
+def _member_body() -> Dict[str, Any]:
+    number = next(_unique)
+    return {"name": f"Load Test {number}", "email": f"loadtest{number}-{time.time_ns()}@example.org", "group_ids": [1]}
+
+
+def _import_csv(rows: int = 200) -> str:
+    lines = ["name,email,phone,role,group_ids"]
+    for _ in range(rows):
+        member = _member_body()
+        lines.append(f"{member['name']},{member['email']},,member,1;2")
+    return "\n".join(lines)
+
+
+def _flyer(context: ScenarioContext) -> Dict[str, Any]:
+    return {"event_id": context.event_id(), "style": "modern"}
+
+
+def _social(context: ScenarioContext) -> Dict[str, Any]:
+    return {"event_id": context.event_id(), "platform": "facebook", "content_type": "announcement"}
+
+
+def _welcome(context: ScenarioContext) -> Dict[str, Any]:
+    return {"member_id": context.member_id(), "material_type": "card"}
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("health", "GET", "/health"),
+    Scenario("liveness", "GET", "/health/live"),
+    Scenario("readiness", "GET", "/health/ready"),
+    Scenario("metrics", "GET", "/metrics"),
+    Scenario("root", "GET", "/"),
+    # Events
+    Scenario("list_events", "GET", "/api/v1/events", lambda c: ("GET", "/api/v1/events", {"params": {"limit": 50}})),
+    Scenario("list_events_projected", "GET", "/api/v1/events",
+             lambda c: ("GET", "/api/v1/events", {"params": {"limit": 50, "fields": "id,title,start_date"}})),
+    Scenario("create_event", "POST", "/api/v1/events", lambda c: ("POST", "/api/v1/events", {"json": _event_body()})),
+    Scenario("create_event_background", "POST", "/api/v1/events",
+             lambda c: ("POST", "/api/v1/events", {"json": _event_body(), "params": {"background": "true"}})),
+    Scenario("check_conflicts", "POST", "/api/v1/events/conflicts",
+             lambda c: ("POST", "/api/v1/events/conflicts", {"json": {"events": [_event_body(7 * week) for week in range(52)]}})),
+    Scenario("get_event", "GET", "/api/v1/events/{event_id}", lambda c: ("GET", f"/api/v1/events/{c.event_id()}", {})),
+    Scenario("check_in", "POST", "/api/v1/events/{event_id}/check-in",
+             lambda c: ("POST", f"/api/v1/events/{c.event_id()}/check-in", {"json": {"user_id": c.member_id()}})),
+    # Members
+    Scenario("list_members", "GET", "/api/v1/members", lambda c: ("GET", "/api/v1/members", {"params": {"limit": 50}})),
+    Scenario("create_member", "POST", "/api/v1/members", lambda c: ("POST", "/api/v1/members", {"json": _member_body()})),
+    Scenario("import_members", "POST", "/api/v1/members/import",
+             lambda c: ("POST", "/api/v1/members/import", {"content": _import_csv(), "headers": {"Content-Type": "text/csv"}})),
+    Scenario("member_tasks", "GET", "/api/v1/members/{member_id}/tasks",
+             lambda c: ("GET", f"/api/v1/members/{c.member_id()}/tasks", {})),
+    # Content
+    Scenario("generate_flyer", "POST", "/api/v1/content/generate-flyer",
+             lambda c: ("POST", "/api/v1/content/generate-flyer", {"json": _flyer(c)})),
+    Scenario("generate_social", "POST", "/api/v1/content/generate-social",
+             lambda c: ("POST", "/api/v1/content/generate-social", {"json": _social(c)})),
+    Scenario("generate_welcome", "POST", "/api/v1/content/generate-welcome",
+             lambda c: ("POST", "/api/v1/content/generate-welcome", {"json": _welcome(c)})),
+    Scenario("stream_flyer", "POST", "/api/v1/content/generate-flyer/stream",
+             lambda c: ("POST", "/api/v1/content/generate-flyer/stream", {"json": _flyer(c)})),
+    Scenario("stream_social", "POST", "/api/v1/content/generate-social/stream",
+             lambda c: ("POST", "/api/v1/content/generate-social/stream", {"json": _social(c)})),
+    Scenario("stream_welcome", "POST", "/api/v1/content/generate-welcome/stream",
+             lambda c: ("POST", "/api/v1/content/generate-welcome/stream", {"json": _welcome(c)})),
+    Scenario("content_batch", "POST", "/api/v1/content/batch",
+             lambda c: ("POST", "/api/v1/content/batch", {"json": {"items": [
+                 {"content_type": "flyer", "params": _flyer(c)} for _ in range(20)
+             ]}})),
+    # Insights
+    Scenario("insights_dashboard", "GET", "/api/v1/insights/dashboard"),
+    Scenario("insights_attendance", "GET", "/api/v1/insights/attendance"),
+    Scenario("insights_engagement", "GET", "/api/v1/insights/engagement"),
+    Scenario("rebuild_aggregates", "POST", "/api/v1/insights/aggregates/rebuild"),
+    # Groups and tasks
+    Scenario("list_groups", "GET", "/api/v1/groups", lambda c: ("GET", "/api/v1/groups", {"params": {"limit": 50}})),
+    Scenario("create_group", "POST", "/api/v1/groups",
+             lambda c: ("POST", "/api/v1/groups", {"json": {"name": f"Group {next(_unique)}", "group_type": "youth"}})),
+    Scenario("list_tasks", "GET", "/api/v1/tasks", lambda c: ("GET", "/api/v1/tasks", {"params": {"limit": 50}})),
+    Scenario("complete_task", "PUT", "/api/v1/tasks/{task_id}/complete",
+             lambda c: ("PUT", f"/api/v1/tasks/{c.task_id()}/complete", {})),
+    # Exports
+    Scenario("export_events", "GET", "/api/v1/export/events"),
+    Scenario("export_members", "GET", "/api/v1/export/members"),
+    Scenario("export_attendance", "GET", "/api/v1/export/attendance"),
+    # Jobs and agents
+    Scenario("get_job", "GET", "/api/v1/jobs/{job_id}", lambda c: ("GET", f"/api/v1/jobs/{c.job_id}", {})),
+    Scenario("job_events", "GET", "/api/v1/jobs/{job_id}/events", lambda c: ("GET", f"/api/v1/jobs/{c.job_id}/events", {})),
+    Scenario("agents_status", "GET", "/api/v1/agents/status"),
+]
+
+
+def uncovered_routes(app, scenarios: List[Scenario]) -> List[str]:
+    """API routes that no scenario exercises (a new endpoint should get a scenario)"""
+    covered: Set[Tuple[str, str]] = {(scenario.method, scenario.route) for scenario in scenarios}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not route.include_in_schema:
+            continue
+        for method in sorted(route.methods):
+            if (method, route.path) not in covered:
+                missing.append(f"{method} {route.path}")
+    return missing
+
+
+def summarize(latencies: List[float], elapsed: float, statuses: Dict[int, int], errors: int) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds) for one scenario"""
+    ordered = sorted(latencies)
+    summary: Dict[str, Any] = {
+        "requests": len(ordered),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+    }
+    if ordered:
+        summary["latency_ms"] = {
+            "min": round(ordered[0] * 1000, 3),
+            "mean": round(statistics.fmean(ordered) * 1000, 3),
+            **{f"p{p}": round(ordered[min(int(p / 100 * len(ordered)), len(ordered) - 1)] * 1000, 3) for p in PERCENTILES},
+            "max": round(ordered[-1] * 1000, 3),
+        }
+    return summary
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, context: ScenarioContext,
+                       requests: int, concurrency: int) -> Dict[str, Any]:
+    """Fire `requests` calls from `concurrency` workers and summarize them"""
+    remaining = itertools.count()
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while next(remaining) < requests:
+            method, url, kwargs = scenario.request(context)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 500:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, statuses, errors)
+
+
+async def discover_ids(client: httpx.AsyncClient, context: ScenarioContext) -> None:
+    """Point path parameters at rows that exist, and queue one job for the job endpoints"""
+    for path, attribute in (("/api/v1/events", "event_ids"), ("/api/v1/members", "member_ids"), ("/api/v1/tasks", "task_ids")):
+        response = await client.get(path, params={"limit": 200, "fields": "id"})
+        if response.status_code == 200 and response.json():
+            setattr(context, attribute, [row["id"] for row in response.json()])
+    response = await client.post("/api/v1/events", json=_event_body(), params={"background": "true"})
+    if response.status_code == 202:
+        context.job_id = response.json()["id"]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    """The app warms up in the background; measuring before it is ready would time the warm-up"""
+    deadline = time.perf_counter() + timeout
+    while (await client.get("/health/ready")).status_code != 200:
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"App not ready after {timeout}s")
+        await asyncio.sleep(0.05)
+
+
+async def run_load_test(app, requests: int = 200, concurrency: int = 16, warmup: int = 10,
+                        only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run every scenario (or the named ones) against the app, inside its lifespan"""
+    scenarios = [scenario for scenario in SCENARIOS if not only or scenario.name in only]
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            await wait_until_ready(client)
+            context = ScenarioContext()
+            await discover_ids(client, context)
+            for scenario in scenarios:
+                if warmup:
+                    await run_scenario(client, scenario, context, warmup, min(concurrency, warmup))
+                results[scenario.name] = {
+                    "route": f"{scenario.method} {scenario.route}",
+                    **await run_scenario(client, scenario, context, requests, concurrency),
+                }
+                print(f"  {scenario.name:<26} {results[scenario.name]['throughput_rps']:>10.1f} req/s  "
+                      f"p95 {results[scenario.name].get('latency_ms', {}).get('p95', 0):>9.2f} ms")
+    return {
+        "config": {"requests": requests, "concurrency": concurrency, "warmup": warmup},
+        "uncovered_routes": uncovered_routes(app, SCENARIOS),
+        "scenarios": results,
+    }
@@ -0,0 +1,121 @@
+"""
+🧮 Model Benchmarks - Validation and serialization cost of the Pydantic models
+Purpose: List endpoints and exports validate and serialize thousands of rows per call;
+this measures those steps alone, per model, at increasing row counts
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, parse_obj_as
+
+from models import (
+    AttendanceRecordResponse, EventCreateRequest, EventResponse, GroupResponse,
+    MemberCreateRequest, MemberResponse, TaskResponse,
+)
+from services.fast_json import dumps, project_rows
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+_NOW = datetime(2025, 1, 5, 10, 0)
+
+
+def _event(i: int) -> Dict[str, Any]:
+    start = _NOW + timedelta(days=i % 365)
+    return {
+        "id": i, "title": f"Service {i}", "description": "Weekly gathering", "start_date": start,
+        "end_date": start + timedelta(hours=2), "location": "Main Hall", "status": "published",
+        "max_attendees": 300, "created_at": _NOW, "updated_at": _NOW,
+        "groups": [{"id": 1, "name": "Worship"}], "attendees_count": i % 250,
+    }
+
+
+def _event_request(i: int) -> Dict[str, Any]:
+    start = _NOW + timedelta(days=i % 365)
+    # Requests arrive as JSON, so dates are strings here
+    return {"title": f"Service {i}", "start_date": start.isoformat(),
+            "end_date": (start + timedelta(hours=2)).isoformat(), "location": "Main Hall", "group_ids": [1, 2]}
+
+
+def _member(i: int) -> Dict[str, Any]:
+    return {
+        "id": i, "name": f"Member {i}", "email": f"member{i}@example.org", "phone": "+15550100",
+        "role": "member", "created_at": _NOW, "updated_at": _NOW,
+        "groups": [{"id": 2, "name": "Ushers"}], "tasks_completed": i % 5, "tasks_pending": i % 3,
+    }
+
+
+def _member_request(i: int) -> Dict[str, Any]:
+    return {"name": f"Member {i}", "email": f"Member{i}@Example.org", "role": "member", "group_ids": [2]}
+
+
+def _task(i: int) -> Dict[str, Any]:
+    return {
+        "id": i, "title": f"Follow up {i}", "description": None, "status": "pending", "priority": "medium",
+        "due_date": _NOW, "completed_at": None, "created_at": _NOW, "updated_at": _NOW,
+        "member": {"id": i, "name": f"Member {i}"},
+    }
+
+
+def _group(i: int) -> Dict[str, Any]:
+    return {
+        "id": i, "name": f"Group {i}", "description": None, "group_type": "worship", "created_at": _NOW,
+        "updated_at": _NOW, "leader": {"id": 1, "name": "Pastor"}, "members_count": 12,
+        "members": [{"id": member_id, "name": f"Member {member_id}"} for member_id in range(12)],
+    }
+
+
+def _attendance(i: int) -> Dict[str, Any]:
+    return {"id": i, "event_id": i % 500, "user_id": i % 5000, "attended_at": _NOW, "checked_in": True}
+
+
+MODEL_CASES: List[Tuple[Type[BaseModel], Callable[[int], Dict[str, Any]]]] = [
+    (EventCreateRequest, _event_request),
+    (EventResponse, _event),
+    (MemberCreateRequest, _member_request),
+    (MemberResponse, _member),
+    (TaskResponse, _task),
+    (GroupResponse, _group),
+    (AttendanceRecordResponse, _attendance),
+]
+
+
+def _timed(function: Callable[[], Any]) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    value = function()
+    return time.perf_counter() - started, value
+
+
+def benchmark_model(model: Type[BaseModel], make_row: Callable[[int], Dict[str, Any]], size: int) -> Dict[str, Any]:
+    """
+    Time each step a list endpoint performs for `size` rows:
+    per-row validation, List[Model] validation (what response_model does), .dict(),
+    jsonable_encoder + json.dumps (FastAPI's JSONResponse path) and per-row .json() (NDJSON exports),
+    against the FAST_LIST_SERIALIZATION path (project_rows + dumps) on the same rows
+    """
+    rows = [make_row(i) for i in range(size)]
+    steps: Dict[str, float] = {}
+    steps["parse_obj"], instances = _timed(lambda: [model.parse_obj(row) for row in rows])
+    steps["parse_obj_as_list"], _ = _timed(lambda: parse_obj_as(List[model], rows))
+    steps["dict"], _ = _timed(lambda: [instance.dict() for instance in instances])
+    steps["jsonable_encoder_dumps"], _ = _timed(lambda: json.dumps(jsonable_encoder(instances)))
+    steps["json_per_row"], _ = _timed(lambda: [instance.json() for instance in instances])
+    steps["fast_project_dumps"], _ = _timed(lambda: dumps(project_rows(rows, model)))
+    return {
+        step: {"seconds": round(seconds, 5), "rows_per_second": round(size / seconds) if seconds else None}
+        for step, seconds in steps.items()
+    }
+
+
+def run_model_benchmarks(sizes=DEFAULT_SIZES) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for model, make_row in MODEL_CASES:
+        results[model.__name__] = {}
+        for size in sizes:
+            results[model.__name__][str(size)] = benchmark_model(model, make_row, size)
+            timings = results[model.__name__][str(size)]
+            print(f"  {model.__name__:<26} {size:>7} rows  "
+                  + "  ".join(f"{step} {timing['seconds']:.3f}s" for step, timing in timings.items()))
+    return {"sizes": list(sizes), "models": results}
@@ -0,0 +1,162 @@
+"""
+📊 Benchmark Runner - Load tests and model micro-benchmarks, saved as JSON
+Purpose: Tell whether a change made /api/v1/events, the insights endpoints or serialization slower
+
+Run from apps/ecclesiaagents:
+    python -m benchmarks.run                               # everything, fake db + fake agents
+    python -m benchmarks.run --skip-models --requests 500 --concurrency 32
+    python -m benchmarks.run --database real --agents fake # seeded local DB from DATABASE_URL
+    python -m benchmarks.run --compare before.json --output after.json
+    python -m benchmarks.import_time --budget-ms 800       # import time of main only
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+DEFAULT_OUTPUT = "benchmark-results.json"
+REGRESSION_THRESHOLD = 0.10  # Flag changes of more than 10% when comparing runs
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="EcclesiaFlow API benchmarks")
+    parser.add_argument("--database", choices=("fake", "real"), default="fake",
+                        help="In-memory DatabaseService, or the real one against DATABASE_URL (seed it first)")
+    parser.add_argument("--agents", choices=("fake", "real"), default="fake",
+                        help="In-memory AgentManager, or the real agents (slow, uses LLM quota)")
+    parser.add_argument("--scale", type=float, default=0.1, help="Fake dataset size relative to 2k events / 5k members / 50k attendance")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="Simulated latency per fake database call")
+    parser.add_argument("--agent-latency-ms", type=float, default=50.0, help="Simulated latency per fake agent call")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per route")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per route before measuring")
+    parser.add_argument("--scenarios", nargs="*", help="Only run these load scenarios (see benchmarks/load_test.py)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None, help="Row counts for the model benchmarks")
+    parser.add_argument("--skip-load", action="store_true", help="Only run the model benchmarks")
+    parser.add_argument("--skip-models", action="store_true", help="Only run the load test")
+    parser.add_argument("--skip-import", action="store_true", help="Do not measure the import time of main")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare this run against")
+    return parser.parse_args(argv)
+
+
+def environment() -> Dict[str, Any]:
+    """What produced the numbers, so runs are only compared like for like"""
+    import fastapi
+    import pydantic
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "fastapi": fastapi.__version__,
+        "pydantic": pydantic.VERSION,
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float = REGRESSION_THRESHOLD) -> Dict[str, Any]:
+    """Relative change of throughput and p95 per scenario, and of every model step"""
+    changes: Dict[str, Any] = {"load": {}, "models": {}, "import_time": None, "regressions": []}
+
+    def relative(before: Optional[float], after: Optional[float]) -> Optional[float]:
+        return round((after - before) / before, 4) if before and after is not None else None
+
+    before_scenarios = (previous.get("load") or {}).get("scenarios", {})
+    for name, after in ((current.get("load") or {}).get("scenarios", {})).items():
+        before = before_scenarios.get(name)
+        if not before:
+            continue
+        change = {
+            "throughput_rps": relative(before["throughput_rps"], after["throughput_rps"]),
+            "p95_ms": relative(before.get("latency_ms", {}).get("p95"), after.get("latency_ms", {}).get("p95")),
+        }
+        changes["load"][name] = change
+        if (change["throughput_rps"] or 0) < -threshold or (change["p95_ms"] or 0) > threshold:
+            changes["regressions"].append(f"load:{name}")
+
+    before_models = (previous.get("models") or {}).get("models", {})
+    for model, sizes in ((current.get("models") or {}).get("models", {})).items():
+        for size, steps in sizes.items():
+            for step, timing in steps.items():
+                before = before_models.get(model, {}).get(size, {}).get(step)
+                if not before:
+                    continue
+                change = relative(before["seconds"], timing["seconds"])
+                changes["models"][f"{model}/{size}/{step}"] = change
+                if (change or 0) > threshold:
+                    changes["regressions"].append(f"models:{model}/{size}/{step}")
+
+    if previous.get("import_time") and current.get("import_time"):
+        changes["import_time"] = relative(previous["import_time"]["median_ms"], current["import_time"]["median_ms"])
+        if (changes["import_time"] or 0) > threshold:
+            changes["regressions"].append("import_time")
+    return changes
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results: Dict[str, Any] = {"environment": environment(), "config": vars(args)}
+
+    if not args.skip_import:
+        from benchmarks.import_time import measure_import_time
+
+        # Measured first, in fresh interpreters, so the fakes installed below do not affect it
+        results["import_time"] = measure_import_time(database=args.database)
+        print(f"Import time of main: median {results['import_time']['median_ms']:.0f} ms "
+              f"(budget {results['import_time']['budget_ms']:.0f} ms)")
+
+    if not args.skip_load:
+        from tests.fakes import install_fakes
+
+        # Fakes must be registered before main imports DatabaseService / AgentManager
+        install_fakes(
+            database=args.database == "fake", agents=args.agents == "fake", scale=args.scale,
+            db_latency=args.db_latency_ms / 1000, agent_latency=args.agent_latency_ms / 1000,
+        )
+        os.environ.setdefault("CONTENT_CACHE_DIR", tempfile.mkdtemp(prefix="ecclesiaflow-bench-"))
+        os.environ.pop("SLOW_REQUEST_THRESHOLD_MS", None)
+
+        from benchmarks.load_test import run_load_test
+        from main import app
+
+        print(f"Load test: {args.requests} requests x {args.concurrency} clients per route")
+        results["load"] = asyncio.run(run_load_test(
+            app, requests=args.requests, concurrency=args.concurrency, warmup=args.warmup, only=args.scenarios,
+        ))
+        if results["load"]["uncovered_routes"]:
+            print(f"Routes without a load scenario: {', '.join(results['load']['uncovered_routes'])}")
+
+    if not args.skip_models:
+        from benchmarks.model_benchmarks import DEFAULT_SIZES, run_model_benchmarks
+
+        print("Model validation/serialization benchmarks")
+        results["models"] = run_model_benchmarks(tuple(args.sizes) if args.sizes else DEFAULT_SIZES)
+
+    if args.compare:
+        with open(args.compare) as previous_file:
+            results["comparison"] = compare(json.load(previous_file), results)
+        regressions = results["comparison"]["regressions"]
+        print(f"Compared with {args.compare}: {len(regressions)} regression(s) over {REGRESSION_THRESHOLD:.0%}")
+        for regression in regressions:
+            print(f"  {regression}")
+
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2, default=str)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
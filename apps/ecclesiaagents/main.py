@@ -3,26 +3,77 @@
 Purpose: Central API server that orchestrates all AI agents for church management
 Architecture: Single FastAPI app with multiple AI agents working together
 """
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-import uvicorn
-from datetime import datetime
-
-# Import our agents and services
-from agents.agent_manager import AgentManager
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, AsyncIterator, List, Optional, Set, Type, Union
+import asyncio
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+# Import our services (the agents and numpy are imported lazily, see STARTUP below)
+from agents.dag_executor import DagExecutor, WorkflowStep
 from services.database_service import DatabaseService
+from services.database_pool import DatabasePool
+from services.database_settings import DatabaseSettings
+from services.metrics import TracedService, metrics, span_breakdown, start_trace
+from services.cache_service import TTLCache
+from services.aggregate_service import InsightAggregates
+from services.job_queue import JobQueue
+from services.content_cache import ContentCache
+from services.interval_index import EventConflictIndex
+from services.checkin_buffer import CheckInBuffer, CheckInBufferFull
+from services.warmup import LazyService, StartupWarmUp
+from services.shared_state import ChangeFeed, shared_state_from_url
+from services.admission_control import AdmissionController, AdmissionRejected, AgentLimit, Priority
+from services.relation_loader import DataLoader, Relation, attach_relations, relation_columns
+from services.fast_json import FastJSONResponse, dumps, project_rows
+from services.member_import import MemberImportError, candidate_emails, parse_member_rows, validate_member_rows
 from models import *
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Process startup and shutdown
+    Pools, aggregates and indexes load in the background (see STARTUP below) so the worker is
+    live immediately and ready once they are; on shutdown the workers drain before the pools close
+    """
+    warmup.start()
+    await job_queue.start()
+    await checkin_buffer.start()
+    await content_cache.start()
+    try:
+        yield
+    finally:
+        await warmup.stop()
+        # Pending check-ins are written before the pools close
+        await checkin_buffer.stop()
+        await job_queue.stop()
+        await content_cache.stop()
+        await change_feed.stop()
+        await shared_state.close()
+        if replica_pool is not None:
+            await replica_pool.close()
+        await database_pool.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Ecclesiaflow AI Agents",
     description="Multi-agent AI system for church management and automation",
     version="1.0.0",
     docs_url="/docs",  # Swagger UI at /docs
-    redoc_url="/redoc"  # ReDoc at /redoc
+    redoc_url="/redoc",  # ReDoc at /redoc
+    lifespan=lifespan
 )
 
 # CORS middleware to allow Next.js frontend to communicate
@@ -32,23 +83,433 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Lets the frontend read pagination cursors
 )
 
 # Initialize services
-database_service = DatabaseService()
-agent_manager = AgentManager(database_service)
+# Pool sizes, acquire timeout and statement cache come from DATABASE_URL / DB_POOL_* env vars.
+# GET endpoints read through read_database_service, which uses the replica when one is configured
+# and falls back to the primary pool while the replica is down or saturated.
+database_settings = DatabaseSettings.from_env()
+database_pool = DatabasePool(database_settings, "primary")
+replica_settings = database_settings.for_replica()
+replica_pool = DatabasePool(replica_settings, "replica", fallback=database_pool) if replica_settings else None
+# Services are wrapped so every db/agent call is timed as a span (see /metrics)
+database_service = TracedService(DatabaseService(database_pool), "db")
+read_database_service = TracedService(DatabaseService(replica_pool), "db_replica") if replica_pool else database_service
+
+# State every worker must agree on (see services/shared_state.py). memory:// is only correct for
+# a single process; the production run mode below switches multi-worker runs to a SQLite file.
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "memory://")
+shared_state = shared_state_from_url(SHARED_STATE_URL)
+
+def build_agent_manager():
+    """Import and construct the agents (and their LLM clients) on first use"""
+    from agents.agent_manager import AgentManager
+    return AgentManager(database_service)
+
+# Agent work counted in total_tasks_today / success_rate on /api/v1/agents/status
+AGENT_TASK_METHODS = ("create_event_with_agents", "onboard_new_member", "generate_content", "stream_content", "generate_insights")
+
+async def count_agent_call(name: str, succeeded: bool) -> None:
+    """Count agent calls in the shared state, so the status endpoint reports every worker's work"""
+    if name in AGENT_TASK_METHODS:
+        try:
+            await shared_state.incr(f"agent_calls:{date.today().isoformat()}:{name}:{'ok' if succeeded else 'error'}")
+        except Exception:
+            logger.exception("Failed to count agent call %s", name)
+
+agent_service = LazyService(build_agent_manager, "agent_manager")
+agent_manager = TracedService(agent_service, "agent", on_call=count_agent_call)
+
+# ==================== REQUEST METRICS ====================
+
+logger = logging.getLogger("ecclesiaflow")
+
+# Requests slower than this are logged with their span breakdown (unset or 0 disables the log)
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "0") or 0)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency histogram plus, for slow requests, a log line with the db/agent span breakdown"""
+    started = time.perf_counter()
+    with start_trace() as spans:
+        response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    # Label by route template (/api/v1/events/{event_id}), never the raw path, to bound cardinality
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", "unmatched")
+    metrics.observe_request(request.method, route_path, response.status_code, elapsed)
+    if SLOW_REQUEST_THRESHOLD_MS and elapsed * 1000 >= SLOW_REQUEST_THRESHOLD_MS:
+        logger.warning(
+            "Slow request %s %s: %s",
+            request.method, route_path, json.dumps(span_breakdown(spans, started, elapsed * 1000)),
+        )
+    return response
+
+# Insights are cached until their TTL expires or a write endpoint changes the underlying data
+INSIGHTS_CACHE_TTL_SECONDS = 300
+INSIGHTS_CACHE_MAX_ENTRIES = 128
+insights_cache = TTLCache("insights", max_entries=INSIGHTS_CACHE_MAX_ENTRIES, ttl_seconds=INSIGHTS_CACHE_TTL_SECONDS)
+
+# Dashboard counters are maintained incrementally by the write endpoints below
+aggregates = InsightAggregates()
+
+# Attendance and engagement insights are computed from columnar (NumPy) copies of the history,
+# kept current by the same write endpoints; set by the "analytics" warm-up step, and left None
+# when numpy is not installed (those insights then come from the Insights Agent)
+analytics_engine = None
+ANALYTICS_ENGINE_INSIGHTS = ("attendance", "engagement")
+
+# Slow multi-agent workflows can run in the background; per-agent limits protect the LLM quota.
+# Concurrency limits are per worker process; AGENT_RATE_LIMITS (e.g. "content=30,insights=10",
+# jobs per minute) are enforced across all workers through the shared state
+AGENT_CONCURRENCY_LIMITS = {"calendar": 2, "content": 2, "onboarding": 2, "insights": 1}
+AGENT_RATE_LIMITS_PER_MINUTE = {
+    agent.strip(): float(rate)
+    for agent, _, rate in (item.partition("=") for item in os.getenv("AGENT_RATE_LIMITS", "").split(",") if item.strip())
+}
+job_queue = JobQueue(
+    database_service,
+    agent_limits=AGENT_CONCURRENCY_LIMITS,
+    shared_state=shared_state,
+    agent_rates=AGENT_RATE_LIMITS_PER_MINUTE,
+)
+
+# Admission control in front of the LLM-backed content and insights calls: per worker, at most
+# max_concurrency calls per agent in flight and max_queue waiting (interactive requests ahead of
+# batch items) for up to max_wait seconds; beyond that, 429 with Retry-After. The rate limits
+# share their token buckets with the job queue above.
+AGENT_ADMISSION_LIMITS = {
+    "content": AgentLimit(max_concurrency=4, max_queue=32, max_wait=15.0,
+                          rate_per_minute=AGENT_RATE_LIMITS_PER_MINUTE.get("content")),
+    "insights": AgentLimit(max_concurrency=2, max_queue=16, max_wait=10.0,
+                           rate_per_minute=AGENT_RATE_LIMITS_PER_MINUTE.get("insights")),
+}
+admission = AdmissionController(AGENT_ADMISSION_LIMITS, shared_state=shared_state)
+
+def admission_error(rejected: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(rejected), headers={"Retry-After": str(math.ceil(rejected.retry_after))})
+
+@asynccontextmanager
+async def admitted(agent: str, priority: Priority = Priority.INTERACTIVE):
+    """Hold an admission slot for one agent call; rejections surface as 429"""
+    try:
+        ticket = await admission.acquire(agent, priority)
+    except AdmissionRejected as rejected:
+        raise admission_error(rejected)
+    try:
+        yield
+    finally:
+        ticket.release()
+
+async def job_result(workflow) -> Dict[str, Any]:
+    """Await a workflow inside a job and make its result JSON-safe for the AgentTask row"""
+    return jsonable_encoder(await workflow)
+
+def job_accepted(job) -> JSONResponse:
+    """202 response pointing the client at the job status and progress endpoints"""
+    return JSONResponse(status_code=202, content=jsonable_encoder(JobResponse(**job.to_dict())))
+
+def sse_event(event_type: str, data: Any) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event_type}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+# Check-ins are buffered, de-duplicated on (event, user) and written in batches; each flush
+# updates the attendance counters behind EventResponse.attendees_count and the insights
+CHECKIN_BATCH_SIZE = 500
+CHECKIN_FLUSH_INTERVAL_SECONDS = 1.0
+CHECKIN_MAX_PENDING = 10000
+CHECKIN_LOOKUP_CACHE_TTL_SECONDS = 30
+
+async def record_checkins(records: List[Dict[str, Any]]) -> None:
+    """Apply a flushed batch of newly written attendance records to the in-memory counters"""
+    await record_change("attendance_recorded", records)
+
+checkin_buffer = CheckInBuffer(
+    database_service,
+    on_flush=record_checkins,
+    batch_size=CHECKIN_BATCH_SIZE,
+    flush_interval=CHECKIN_FLUSH_INTERVAL_SECONDS,
+    max_pending=CHECKIN_MAX_PENDING,
+)
+# Event and member lookups for check-ins: a whole congregation checks in to the same event, so one
+# query serves them all, and members tapping in again skip the member query
+checkin_lookup_cache = TTLCache("checkin_lookups", max_entries=4096, ttl_seconds=CHECKIN_LOOKUP_CACHE_TTL_SECONDS)
+
+# Interval trees over every scheduled event, for O(log n + k) conflict checks
+conflict_index = EventConflictIndex()
+
+# ==================== CROSS-WORKER CHANGES ====================
+
+# How often each worker picks up the writes other workers made
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "0.5"))
+
+async def apply_change(kind: str, payload: Any) -> None:
+    """Bring this worker's aggregates, analytics columns, conflict index and insights cache up to date with a write"""
+    if kind == "event_created":
+        aggregates.record_event(payload)
+        if analytics_engine is not None:
+            analytics_engine.record_event(payload)
+        conflict_index.add(payload)
+        checkin_lookup_cache.invalidate("event")  # May hold a "not found" for it
+    elif kind == "members_created":
+        checkin_lookup_cache.invalidate("member")
+        for item in payload:
+            aggregates.record_member(item["member"])
+            if analytics_engine is not None:
+                analytics_engine.record_member(item["member"], group_ids=item["group_ids"])
+    elif kind == "tasks_created":
+        for task in payload:
+            aggregates.record_task(task)
+    elif kind == "task_completed":
+        aggregates.record_task_completed(payload)
+        if analytics_engine is not None:
+            analytics_engine.record_task_completed(payload)
+    elif kind == "group_created":
+        aggregates.record_group(payload)
+    elif kind == "attendance_recorded":
+        for record in payload:
+            aggregates.record_attendance(record)
+            if analytics_engine is not None:
+                analytics_engine.record_attendance(record)
+    elif kind == "aggregates_rebuilt":
+        await aggregates.rebuild(database_service)
+        if analytics_engine is not None:
+            await analytics_engine.load(database_service)
+    else:
+        raise ValueError(f"Unknown change kind: {kind}")
+    insights_cache.invalidate()
+
+async def record_change(kind: str, payload: Any) -> None:
+    """Apply a write to this worker's in-memory state, then pass it on to the other workers"""
+    await apply_change(kind, payload)
+    await change_feed.publish(kind, payload)
+
+change_feed = ChangeFeed(shared_state, apply_change, poll_interval=CHANGE_FEED_POLL_SECONDS)
+
+# ==================== STARTUP ====================
+
+# Each warm-up step gets this long (a full aggregates rebuild on a large database is the slowest)
+WARMUP_STEP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_STEP_TIMEOUT_SECONDS", "120"))
+# Build the agents in the background at startup instead of on the first agent request
+PREWARM_AGENTS = os.getenv("PREWARM_AGENTS", "true").lower() in ("1", "true", "yes")
+# API requests reaching a worker that is still warming up wait this long before getting a 503
+STARTUP_REQUEST_WAIT_SECONDS = float(os.getenv("STARTUP_REQUEST_WAIT_SECONDS", "10"))
+
+async def connect_primary(_: Dict[str, Any]) -> None:
+    await database_pool.open()
+
+async def connect_replica(_: Dict[str, Any]) -> None:
+    # Optional: until the replica pool opens, reads fall back to the primary
+    if replica_pool is not None:
+        await replica_pool.open()
+
+async def rebuild_aggregates(_: Dict[str, Any]) -> None:
+    await aggregates.rebuild(database_service)
+
+async def load_analytics_engine(_: Dict[str, Any]) -> Optional[str]:
+    """Optional: if numpy is missing or the load fails, attendance/engagement insights use the agent"""
+    global analytics_engine
+    try:
+        from services.analytics_engine import AnalyticsEngine
+    except ImportError:
+        return "numpy not installed"
+    engine = AnalyticsEngine()
+    await engine.load(database_service)
+    analytics_engine = engine
+    return None
+
+async def load_conflict_index(_: Dict[str, Any]) -> None:
+    await conflict_index.load(database_service)
+
+async def follow_changes(_: Dict[str, Any]) -> None:
+    # The feed position is taken now, before the loads below, and changes are applied once ready;
+    # a write landing in between can be counted twice until the next rebuild
+    await change_feed.start(ready=warmup.until_ready)
+
+async def load_agents(_: Dict[str, Any]) -> None:
+    # Agent construction is synchronous (imports, LLM clients), so it runs off the event loop
+    await asyncio.to_thread(agent_service.load)
+
+warmup_steps = [
+    WorkflowStep("change_feed", follow_changes),
+    WorkflowStep("db_primary", connect_primary),
+    WorkflowStep("db_replica", connect_replica, required=False),
+    WorkflowStep("aggregates", rebuild_aggregates, depends_on=["db_primary"]),
+    WorkflowStep("conflict_index", load_conflict_index, depends_on=["db_primary"]),
+    WorkflowStep("analytics", load_analytics_engine, depends_on=["db_primary"], required=False),
+]
+if PREWARM_AGENTS:
+    warmup_steps.append(WorkflowStep("agents", load_agents, depends_on=["db_primary"], required=False))
+warmup = StartupWarmUp(warmup_steps, step_timeout=WARMUP_STEP_TIMEOUT_SECONDS)
+
+@app.middleware("http")
+async def wait_until_ready(request: Request, call_next):
+    """Hold API requests that arrive mid warm-up (e.g. during a rolling restart) instead of failing them"""
+    if not warmup.ready and request.url.path.startswith("/api/"):
+        if not await warmup.wait(STARTUP_REQUEST_WAIT_SECONDS):
+            return JSONResponse(
+                status_code=503,
+                content={"detail": f"Service is starting up ({warmup.state})"},
+                headers={"Retry-After": "5"},
+            )
+    return await call_next(request)
+
+async def cached_insights(insight_type: str, **params):
+    """Generate insights through the cache, keyed by insight type and parameters"""
+    key = (insight_type, tuple(sorted(params.items())))
+    if analytics_engine is not None and insight_type in ANALYTICS_ENGINE_INSIGHTS:
+        compute = getattr(analytics_engine, f"{insight_type}_insights")
+        return await insights_cache.get_or_compute(key, lambda: compute(**params))
+
+    async def generate():
+        async with admitted("insights"):
+            return await agent_manager.generate_insights(insight_type, **params)
+
+    return await insights_cache.get_or_compute(key, generate)
+
+# ==================== PAGINATION HELPERS ====================
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Opt-in: serialize list pages and exports straight from the (trusted) DB rows, skipping the
+# response_model validation pass and jsonable_encoder (see services/fast_json.py)
+FAST_LIST_SERIALIZATION = os.getenv("FAST_LIST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Set[str]]:
+    """
+    Parse a comma-separated ?fields= projection and validate it against the response model
+    Returns None when no projection was requested (full rows, including nested relations)
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(model.__fields__)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # The cursor is always the row id, so it is always returned
+    return requested | {"id"}
+
+async def build_page(rows: List[Dict[str, Any]], limit: int, fields: Optional[Set[str]], response: Response,
+                     model: Type[BaseModel], relations: Optional[List[Relation]] = None,
+                     loaders: Optional[Dict[str, DataLoader]] = None):
+    """
+    Turn a limit+1 look-ahead query result into one page of results
+    The extra row only tells us another page exists; its predecessor's id becomes X-Next-Cursor
+    Nested relations are then batch-loaded for the rows actually returned
+    """
+    rows = list(rows)
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1]["id"])
+    if relations:
+        await attach_relations(rows, relations, loaders, fields)
+
+    if FAST_LIST_SERIALIZATION:
+        return FastJSONResponse(content=project_rows(rows, model, fields), headers=headers)
+
+    if fields is None:
+        response.headers.update(headers)
+        return rows
+
+    # Projected rows are partial, so they skip response_model validation
+    projected = [{key: value for key, value in row.items() if key in fields} for row in rows]
+    return JSONResponse(content=jsonable_encoder(projected), headers=headers)
+
+# ==================== RELATION LOADING ====================
+# List queries return base columns only; each nested relation is then fetched for the whole page
+# with one IN (...) query (counts via GROUP BY), so a page costs the same number of queries at any size
+
+EVENT_RELATIONS = [
+    Relation("groups", "groups", default=[]),
+    Relation("attendees_count", "attendance", default=0),
+]
+MEMBER_RELATIONS = [
+    Relation("groups", "groups", default=[]),
+    Relation("tasks_completed", "task_counts", select=lambda counts: counts.get("completed", 0), default=0),
+    Relation("tasks_pending", "task_counts", select=lambda counts: counts.get("pending", 0), default=0),
+]
+GROUP_RELATIONS = [
+    Relation("leader", "members_by_id", key="leader_id"),
+    Relation("members", "members", default=[]),
+    Relation("members_count", "member_counts", default=0),
+]
+TASK_RELATIONS = [
+    Relation("member", "members_by_id", key="member_id"),
+]
+
+async def attendance_counts(event_ids: List[int]) -> Dict[int, int]:
+    """attendees_count from the attendance counters (rebuilt at startup, updated by check-in flushes)"""
+    return {event_id: aggregates.attendance_by_event[event_id] for event_id in event_ids}
+
+def event_loaders() -> Dict[str, DataLoader]:
+    return {
+        "groups": DataLoader(read_database_service.get_groups_for_events),
+        "attendance": DataLoader(attendance_counts),
+    }
+
+def member_loaders() -> Dict[str, DataLoader]:
+    return {
+        "groups": DataLoader(read_database_service.get_groups_for_members),
+        "task_counts": DataLoader(read_database_service.count_tasks_by_member),
+    }
+
+def group_loaders() -> Dict[str, DataLoader]:
+    return {
+        "members_by_id": DataLoader(read_database_service.get_members_by_ids),
+        "members": DataLoader(read_database_service.get_members_for_groups),
+        "member_counts": DataLoader(read_database_service.count_members_by_group),
+    }
+
+def task_loaders() -> Dict[str, DataLoader]:
+    return {"members_by_id": DataLoader(read_database_service.get_members_by_ids)}
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Simple health check to verify the API is running"""
+    """
+    Simple health check to verify the API is running
+    Reports "degraded" while a connection pool is saturated (every connection checked out)
+    Agents are listed once loaded; this endpoint never builds them
+    """
+    pools = {"primary": database_pool.stats()}
+    if replica_pool is not None:
+        pools["replica"] = replica_pool.stats()
+    saturated = [name for name, pool in pools.items() if pool["in_use"] >= pool["max_size"]]
     return {
-        "status": "healthy",
+        "status": "degraded" if saturated else "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "Ecclesiaflow AI Agents",
-        "agents_available": agent_manager.get_available_agents()
+        "agents_available": agent_manager.get_available_agents() if agent_service.loaded else [],
+        "database_pools": pools,
+        "saturated_pools": saturated,
+        "ready": warmup.ready
     }
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving; never touches the database or the agents"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once the pools are connected and the aggregates and indexes are loaded,
+    503 before that (or if warm-up failed), with the per-step warm-up timings
+    """
+    return JSONResponse(
+        status_code=200 if warmup.ready else 503,
+        content={"status": "ready" if warmup.ready else "not_ready", "warmup": warmup.status()},
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency histograms and p50/p95/p99 per route and per db/agent call, in Prometheus format"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -57,65 +518,223 @@ async def root():
         "message": "Welcome to Ecclesiaflow AI Agents API",
         "version": "1.0.0",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/health/ready"
     }
 
 # ==================== EVENT ENDPOINTS ====================
 
 @app.get("/api/v1/events", response_model=List[EventResponse])
-async def get_events():
+async def get_events(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: only return events with a greater id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    start_from: Optional[datetime] = Query(None, description="Only events starting at or after this time"),
+    start_to: Optional[datetime] = Query(None, description="Only events starting before this time"),
+    status: Optional[EventStatus] = Query(None, description="Filter by event status"),
+    group_id: Optional[int] = Query(None, description="Only events assigned to this group"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,start_date"),
+):
     """
-    Get all events from the database
+    Get a page of events from the database
     Used by frontend dashboard and events page
+    Pages are keyset-paginated by id: pass the X-Next-Cursor header back as ?after=
     """
     try:
-        events = await database_service.get_all_events()
-        return events
+        projection = parse_fields(fields, EventResponse)
+        events = await read_database_service.get_all_events(
+            after=after,
+            limit=limit + 1,  # Look-ahead row tells us whether there is a next page
+            fields=relation_columns(projection, EVENT_RELATIONS),
+            include_relations=False,
+            start_from=start_from,
+            start_to=start_to,
+            status=status,
+            group_id=group_id,
+        )
+        return await build_page(events, limit, projection, response, EventResponse, EVENT_RELATIONS, event_loaders())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch events: {str(e)}")
 
-@app.post("/api/v1/events", response_model=EventResponse)
-async def create_event(event_data: EventCreateRequest):
+async def run_event_workflow(event_payload: Dict[str, Any]):
+    """Calendar/Content agent chain for a new event, plus the bookkeeping every event write triggers"""
+    # Use Calendar Agent to create event with intelligence
+    result = await agent_manager.create_event_with_agents(event_payload)
+    await record_change("event_created", result)
+    # Indexed check: O(log n + k) per location/group tree instead of a scan over every event
+    return {**result, "conflicts": conflict_index.find_conflicts(result, exclude_id=result.get("id"))}
+
+@app.post("/api/v1/events", response_model=EventCreateResponse, responses={202: {"model": JobResponse}})
+async def create_event(
+    event_data: EventCreateRequest,
+    background: bool = Query(False, description="Queue the agent workflow and return a job id (202) immediately"),
+):
     """
     Create a new event - triggers Calendar Agent
     This demonstrates multi-agent collaboration:
     1. Calendar Agent creates event and checks conflicts
     2. Content Agent can generate promotional materials
     3. Calendar Agent sends notifications
+    The response lists stored events it overlaps (same location or group) from the conflict index
+    With ?background=true the job is persisted and the client polls /api/v1/jobs/{id}
     """
     try:
-        # Use Calendar Agent to create event with intelligence
-        result = await agent_manager.create_event_with_agents(event_data.dict())
-        return result
+        payload = event_data.dict()
+        if background:
+            job = await job_queue.submit(
+                "calendar", "create_event", f"Create event '{event_data.title}'",
+                lambda job: job_result(run_event_workflow(payload)),
+            )
+            return job_accepted(job)
+        return await run_event_workflow(payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create event: {str(e)}")
 
+@app.post("/api/v1/events/conflicts", response_model=ConflictCheckResponse)
+async def check_event_conflicts(request: ConflictCheckRequest):
+    """
+    Check proposed events for scheduling conflicts before creating them
+    Accepts a whole recurring series: each proposal is checked against stored events
+    (same location or same ministry group at an overlapping time) and against the rest of the batch
+    """
+    try:
+        proposals = [event.dict() for event in request.events]
+        conflicts = conflict_index.check_batch(proposals)
+        results = [
+            ConflictCheckResult(
+                index=index,
+                title=proposal["title"],
+                start_date=proposal["start_date"],
+                has_conflicts=bool(found),
+                conflicts=found,
+            )
+            for index, (proposal, found) in enumerate(zip(proposals, conflicts))
+        ]
+        return ConflictCheckResponse(results=results, total_conflicting=sum(1 for result in results if result.has_conflicts))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to check event conflicts: {str(e)}")
+
 @app.get("/api/v1/events/{event_id}", response_model=EventResponse)
 async def get_event(event_id: int):
     """Get specific event by ID"""
     try:
-        event = await database_service.get_event_by_id(event_id)
+        event = await read_database_service.get_event_by_id(event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
+        event["attendees_count"] = aggregates.attendance_by_event[event_id]
         return event
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch event: {str(e)}")
 
+@app.post("/api/v1/events/{event_id}/check-in", response_model=CheckInResponse, status_code=202)
+async def check_in(event_id: int, request: CheckInRequest):
+    """
+    Check a member in to an event
+    The check-in is buffered and written with the next batch (within about a second);
+    repeat check-ins for the same member and event are reported as duplicates
+    Returns 503 with Retry-After when the buffer is full
+    """
+    try:
+        event = await checkin_lookup_cache.get_or_compute(
+            ("event", event_id), lambda: read_database_service.get_event_by_id(event_id)
+        )
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        if event.get("status") == EventStatus.CANCELLED:
+            raise HTTPException(status_code=409, detail="Event is cancelled")
+        # Checked here so an unknown user gets a 404 instead of failing the batch it is written with
+        member = await checkin_lookup_cache.get_or_compute(
+            ("member", request.user_id), lambda: read_database_service.get_member_by_id(request.user_id)
+        )
+        if not member:
+            raise HTTPException(status_code=404, detail="Member not found")
+        try:
+            record, accepted = await checkin_buffer.check_in(event_id, request.user_id, request.attended_at)
+        except CheckInBufferFull as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Check-in is busy, please retry: {str(e)}",
+                headers={"Retry-After": str(max(1, round(e.retry_after)))},
+            )
+        return {
+            "event_id": event_id,
+            "user_id": request.user_id,
+            "status": "accepted" if accepted else "duplicate",
+            "attended_at": record.get("attended_at"),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to check in: {str(e)}")
+
 # ==================== MEMBER ENDPOINTS ====================
 
 @app.get("/api/v1/members", response_model=List[MemberResponse])
-async def get_members():
-    """Get all church members"""
+async def get_members(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: only return members with a greater id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    role: Optional[MemberRole] = Query(None, description="Filter by member role"),
+    group_id: Optional[int] = Query(None, description="Only members of this group"),
+    joined_from: Optional[datetime] = Query(None, description="Only members created at or after this time"),
+    joined_to: Optional[datetime] = Query(None, description="Only members created before this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,email"),
+):
+    """Get a page of church members (keyset-paginated, see get_events)"""
     try:
-        members = await database_service.get_all_members()
-        return members
+        projection = parse_fields(fields, MemberResponse)
+        members = await read_database_service.get_all_members(
+            after=after,
+            limit=limit + 1,
+            fields=relation_columns(projection, MEMBER_RELATIONS),
+            include_relations=False,
+            role=role,
+            group_id=group_id,
+            joined_from=joined_from,
+            joined_to=joined_to,
+        )
+        return await build_page(members, limit, projection, response, MemberResponse, MEMBER_RELATIONS, member_loaders())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch members: {str(e)}")
 
-@app.post("/api/v1/members", response_model=MemberResponse)
-async def create_member(member_data: MemberCreateRequest):
+# Each onboarding step gets this long before the workflow fails with a timeout
+ONBOARDING_STEP_TIMEOUT_SECONDS = float(os.getenv("ONBOARDING_STEP_TIMEOUT_SECONDS", "30"))
+
+async def onboard_member(context: Dict[str, Any]) -> Dict[str, Any]:
+    return await agent_manager.onboard_new_member(context["member_data"])
+
+async def record_new_member(context: Dict[str, Any]) -> None:
+    member = context["member"]
+    await record_change("members_created", [{"member": member, "group_ids": context["member_data"].get("group_ids")}])
+
+# onboard_new_member runs the whole Onboarding/Content/Calendar chain (task list, welcome materials,
+# follow-up reminders) as one AgentManager call, so it is a single step here; once AgentManager
+# exposes those agents separately, each becomes its own step depending only on "member"
+onboarding_workflow = DagExecutor([
+    WorkflowStep("member", onboard_member),
+    WorkflowStep("record", record_new_member, depends_on=["member"]),
+], default_timeout=ONBOARDING_STEP_TIMEOUT_SECONDS)
+
+async def run_onboarding_workflow(member_payload: Dict[str, Any], job=None):
+    """Onboarding agent chain for a new member, plus the bookkeeping every member write triggers"""
+    def on_step(name: str, timing: Dict[str, Any]) -> None:
+        if job is not None:
+            job.report("step", f"Onboarding step '{name}' {timing['status']}", step=name, **timing)
+
+    workflow = await onboarding_workflow.run({"member_data": member_payload}, on_step=on_step)
+    return {**workflow.results["member"], "workflow": {"timings": workflow.timings, "total_ms": workflow.total_ms}}
+
+@app.post("/api/v1/members", response_model=MemberResponse, responses={202: {"model": JobResponse}})
+async def create_member(
+    member_data: MemberCreateRequest,
+    background: bool = Query(False, description="Queue the onboarding workflow and return a job id (202) immediately"),
+):
     """
     Add new church member - triggers Onboarding Agent
     Multi-agent workflow:
@@ -123,33 +742,165 @@ async def create_member(member_data: MemberCreateRequest):
     2. Onboarding Agent creates personalized task list
     3. Content Agent generates welcome materials
     4. Calendar Agent schedules follow-up reminders
+    With ?background=true the job is persisted and the client polls /api/v1/jobs/{id}
     """
     try:
-        result = await agent_manager.onboard_new_member(member_data.dict())
-        return result
+        payload = member_data.dict()
+        if background:
+            job = await job_queue.submit(
+                "onboarding", "onboard_member", f"Onboard {member_data.email}",
+                lambda job: job_result(run_onboarding_workflow(payload, job)),
+            )
+            return job_accepted(job)
+        return await run_onboarding_workflow(payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create member: {str(e)}")
 
+MEMBER_IMPORT_MAX_ROWS = 20000
+MEMBER_IMPORT_BATCH_SIZE = 1000  # Rows per multi-row INSERT
+
+@app.post("/api/v1/members/import", response_model=MemberImportResponse)
+async def import_members(request: Request):
+    """
+    Bulk-import members from a CSV file (Content-Type: text/csv) or a JSON array
+    1. Validate every row with the MemberCreateRequest rules and de-duplicate on email
+    2. Insert members and their group memberships with batched multi-row statements
+    3. Queue one background job that creates onboarding tasks for all new members
+    Returns a per-row error report; valid rows are imported even when others fail
+    """
+    try:
+        try:
+            rows = parse_member_rows(await request.body(), request.headers.get("content-type", ""))
+        except MemberImportError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if len(rows) > MEMBER_IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"Imports are limited to {MEMBER_IMPORT_MAX_ROWS} rows")
+
+        existing = await database_service.get_existing_emails(candidate_emails(rows))
+        valid, errors, duplicates = validate_member_rows(rows, set(existing))
+
+        created = []
+        for offset in range(0, len(valid), MEMBER_IMPORT_BATCH_SIZE):
+            chunk = [member.dict() for _, member in valid[offset:offset + MEMBER_IMPORT_BATCH_SIZE]]
+            created.extend(await database_service.create_members_bulk(chunk))
+
+        ids_by_email = {member["email"]: member["id"] for member in created}
+        memberships = [
+            (ids_by_email[member.email], group_id)
+            for _, member in valid
+            for group_id in member.group_ids or []
+            if member.email in ids_by_email
+        ]
+        for offset in range(0, len(memberships), MEMBER_IMPORT_BATCH_SIZE):
+            await database_service.add_group_members_bulk(memberships[offset:offset + MEMBER_IMPORT_BATCH_SIZE])
+
+        groups_by_member: Dict[int, List[int]] = {}
+        for member_id, group_id in memberships:
+            groups_by_member.setdefault(member_id, []).append(group_id)
+        await record_change("members_created", [
+            {"member": member, "group_ids": groups_by_member.get(member["id"], [])} for member in created
+        ])
+
+        job_id = None
+        if created:
+            member_ids = [member["id"] for member in created]
+
+            async def create_onboarding_tasks(job):
+                tasks = await database_service.create_onboarding_tasks_bulk(member_ids)
+                await record_change("tasks_created", tasks)
+                return {"members": len(member_ids), "tasks_created": len(tasks)}
+
+            job = await job_queue.submit(
+                "onboarding", "bulk_onboarding", f"Create onboarding tasks for {len(member_ids)} imported members",
+                create_onboarding_tasks,
+            )
+            job_id = job.id
+
+        return MemberImportResponse(
+            total_rows=len(rows),
+            imported=len(created),
+            duplicates=duplicates,
+            failed=len(errors) - duplicates,
+            errors=errors,
+            onboarding_job_id=job_id,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import members: {str(e)}")
+
 @app.get("/api/v1/members/{member_id}/tasks", response_model=List[TaskResponse])
 async def get_member_tasks(member_id: int):
     """Get onboarding tasks for a specific member"""
     try:
-        tasks = await database_service.get_member_tasks(member_id)
+        tasks = await read_database_service.get_member_tasks(member_id)
         return tasks
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch member tasks: {str(e)}")
 
 # ==================== CONTENT GENERATION ENDPOINTS ====================
 
+# Generated content is cached by request hash + source entity version (memory LRU, then disk)
+CONTENT_CACHE_DIR = os.getenv("CONTENT_CACHE_DIR", os.path.join(".cache", "content"))
+# The disk tier is pruned by age and, oldest first, down to this size (at startup and every interval)
+CONTENT_CACHE_MAX_DISK_MB = float(os.getenv("CONTENT_CACHE_MAX_DISK_MB", "512"))
+CONTENT_CACHE_PRUNE_INTERVAL_SECONDS = float(os.getenv("CONTENT_CACHE_PRUNE_INTERVAL_SECONDS", "3600"))
+content_cache = ContentCache(
+    CONTENT_CACHE_DIR,
+    max_disk_bytes=int(CONTENT_CACHE_MAX_DISK_MB * 1024 * 1024),
+    prune_interval=CONTENT_CACHE_PRUNE_INTERVAL_SECONDS,
+)
+
+async def content_source_version(params: Dict[str, Any]) -> Optional[str]:
+    """
+    Version of the entity the content is about (its updated_at)
+    Also rejects requests for events/members that do not exist before any LLM call is made
+    """
+    if params.get("event_id") is not None:
+        event = await database_service.get_event_by_id(params["event_id"])
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return f"event:{params['event_id']}:{event['updated_at']}"
+    if params.get("member_id") is not None:
+        member = await database_service.get_member_by_id(params["member_id"])
+        if not member:
+            raise HTTPException(status_code=404, detail="Member not found")
+        return f"member:{params['member_id']}:{member['updated_at']}"
+    return None
+
+def content_source_key(params: Dict[str, Any]) -> tuple:
+    """The entity a generation request is about (requests about the same entity share a lookup)"""
+    return params.get("event_id"), params.get("member_id")
+
+async def cached_content(content_type: str, params: Dict[str, Any], source_version: Optional[str],
+                         priority: Priority = Priority.INTERACTIVE) -> Dict[str, Any]:
+    """Serve generated content from the content cache, calling the Content Agent only on a miss"""
+    key = ContentCache.make_key(content_type, params, source_version)
+
+    async def generate():
+        async with admitted("content", priority):
+            return jsonable_encoder(await agent_manager.generate_content(content_type, params))
+
+    content, cache_source = await content_cache.get_or_generate(key, generate)
+    metadata = {**(content.get("metadata") or {}), "cache_hit": cache_source != "miss", "cache_source": cache_source}
+    return {**content, "metadata": metadata}
+
+async def generate_cached_content(content_type: str, request: BaseModel) -> Dict[str, Any]:
+    """Look up the source entity version, then generate through the content cache"""
+    params = request.dict()
+    return await cached_content(content_type, params, await content_source_version(params))
+
 @app.post("/api/v1/content/generate-flyer", response_model=ContentResponse)
 async def generate_event_flyer(request: FlyerGenerationRequest):
     """
     Generate event flyer using Content Agent
     Uses Gemini AI to create promotional content
+    Identical requests are served from the content cache (metadata.cache_hit)
     """
     try:
-        result = await agent_manager.generate_content("flyer", request.dict())
-        return result
+        return await generate_cached_content("flyer", request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate flyer: {str(e)}")
 
@@ -157,8 +908,9 @@ async def generate_event_flyer(request: FlyerGenerationRequest):
 async def generate_social_post(request: SocialPostRequest):
     """Generate social media post using Content Agent"""
     try:
-        result = await agent_manager.generate_content("social_post", request.dict())
-        return result
+        return await generate_cached_content("social_post", request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate social post: {str(e)}")
 
@@ -166,31 +918,184 @@ async def generate_social_post(request: SocialPostRequest):
 async def generate_welcome_materials(request: WelcomeMaterialRequest):
     """Generate welcome materials for new members"""
     try:
-        result = await agent_manager.generate_content("welcome_material", request.dict())
-        return result
+        return await generate_cached_content("welcome_material", request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate welcome materials: {str(e)}")
 
+# ---- Streaming variants: tokens as Server-Sent Events, then the complete ContentResponse ----
+
+async def stream_cached_content(content_type: str, request: BaseModel) -> StreamingResponse:
+    """
+    SSE stream of the Content Agent's output
+    Events: "token" ({"text": ...}) while generating, then "complete" (the ContentResponse)
+    or "error"; cached content is sent as a single "complete" event
+    """
+    params = request.dict()
+    key = ContentCache.make_key(content_type, params, await content_source_version(params))
+    cached, cache_source = await content_cache.lookup(key)
+    ticket = None
+    if cached is None:
+        # Admitted before the response starts, so an overloaded agent is still a plain 429
+        try:
+            ticket = await admission.acquire("content")
+        except AdmissionRejected as rejected:
+            raise admission_error(rejected)
+
+    async def events():
+        if cached is not None:
+            metadata = {**(cached.get("metadata") or {}), "cache_hit": True, "cache_source": cache_source}
+            yield sse_event("complete", {**cached, "metadata": metadata})
+            return
+
+        chunks = []
+        try:
+            async for chunk in agent_manager.stream_content(content_type, params):
+                chunks.append(chunk)
+                yield sse_event("token", {"text": chunk})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Failed to generate {content_type}: {str(e)}"})
+            return
+        finally:
+            ticket.release()
+
+        content = jsonable_encoder(ContentResponse(
+            id=str(uuid.uuid4()),
+            content_type=content_type,
+            content="".join(chunks),
+            metadata={"streamed": True},
+        ))
+        await content_cache.store(key, content)
+        yield sse_event("complete", {**content, "metadata": {**content["metadata"], "cache_hit": False, "cache_source": "miss"}})
+
+    # The background task also runs when the client disconnects before the stream starts
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(ticket.release) if ticket is not None else None,
+    )
+
+@app.post("/api/v1/content/generate-flyer/stream")
+async def stream_event_flyer(request: FlyerGenerationRequest):
+    """Streaming variant of generate-flyer (SSE: token ... complete)"""
+    return await stream_cached_content("flyer", request)
+
+@app.post("/api/v1/content/generate-social/stream")
+async def stream_social_post(request: SocialPostRequest):
+    """Streaming variant of generate-social (SSE: token ... complete)"""
+    return await stream_cached_content("social_post", request)
+
+@app.post("/api/v1/content/generate-welcome/stream")
+async def stream_welcome_materials(request: WelcomeMaterialRequest):
+    """Streaming variant of generate-welcome (SSE: token ... complete)"""
+    return await stream_cached_content("welcome_material", request)
+
+# Batch generation: request model per content type, and how many unique items run at once
+CONTENT_REQUEST_MODELS: Dict[str, Type[BaseModel]] = {
+    "flyer": FlyerGenerationRequest,
+    "social_post": SocialPostRequest,
+    "welcome_material": WelcomeMaterialRequest,
+}
+CONTENT_BATCH_CONCURRENCY = 4
+
+@app.post("/api/v1/content/batch", response_model=ContentBatchResponse)
+async def generate_content_batch(batch: ContentBatchRequest):
+    """
+    Generate many flyers / social posts / welcome materials in one call
+    e.g. the weekly run that posts every upcoming event to every platform
+    Identical items are generated once and each event/member is looked up once per batch;
+    failures are reported per item instead of failing the whole batch
+    """
+    try:
+        # 1. Validate every item and de-duplicate identical requests
+        errors: Dict[int, str] = {}
+        item_keys: Dict[int, str] = {}
+        unique: Dict[str, tuple] = {}  # dedupe key -> (content_type, params)
+        for index, item in enumerate(batch.items):
+            model = CONTENT_REQUEST_MODELS.get(item.content_type)
+            if model is None:
+                errors[index] = f"Unknown content_type '{item.content_type}'"
+                continue
+            try:
+                params = model.parse_obj(item.params).dict()
+            except ValidationError as e:
+                errors[index] = str(e)
+                continue
+            key = ContentCache.make_key(item.content_type, params, None)
+            unique.setdefault(key, (item.content_type, params))
+            item_keys[index] = key
+
+        # 2. One version lookup per distinct source entity
+        sources = {content_source_key(params): params for _, params in unique.values()}
+        lookups = await asyncio.gather(*(content_source_version(params) for params in sources.values()),
+                                       return_exceptions=True)
+        versions = dict(zip(sources, lookups))
+
+        # 3. Generate the unique requests with bounded concurrency
+        semaphore = asyncio.Semaphore(CONTENT_BATCH_CONCURRENCY)
+
+        async def generate(content_type: str, params: Dict[str, Any]):
+            version = versions[content_source_key(params)]
+            if isinstance(version, Exception):
+                raise version
+            async with semaphore:
+                # Batch items queue behind interactive requests for the Content Agent
+                return await cached_content(content_type, params, version, Priority.BATCH)
+
+        outcomes = await asyncio.gather(*(generate(*request) for request in unique.values()), return_exceptions=True)
+        outcome_by_key = dict(zip(unique, outcomes))
+
+        # 4. Fan results back out in request order
+        results = []
+        for index, item in enumerate(batch.items):
+            outcome = outcome_by_key.get(item_keys.get(index))
+            if index in errors:
+                error = errors[index]
+            elif isinstance(outcome, HTTPException):
+                error = outcome.detail
+            elif isinstance(outcome, Exception):
+                error = str(outcome)
+            else:
+                results.append(ContentBatchResult(index=index, content_type=item.content_type, success=True, content=outcome))
+                continue
+            results.append(ContentBatchResult(index=index, content_type=item.content_type, success=False, error=error))
+
+        succeeded = sum(1 for result in results if result.success)
+        return ContentBatchResponse(
+            results=results,
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            unique_requests=len(unique),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate content batch: {str(e)}")
+
 # ==================== INSIGHTS ENDPOINTS ====================
 
 @app.get("/api/v1/insights/dashboard", response_model=DashboardInsights)
 async def get_dashboard_insights():
     """
-    Get dashboard metrics using Insights Agent
-    Analyzes attendance, engagement, and provides summaries
+    Get dashboard metrics
+    Read straight from the incremental aggregates, so latency does not grow with history size
     """
     try:
-        insights = await agent_manager.generate_insights("dashboard")
-        return insights
+        return DashboardInsights(**aggregates.dashboard())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
 
 @app.get("/api/v1/insights/attendance", response_model=AttendanceInsights)
 async def get_attendance_insights():
-    """Get detailed attendance analytics"""
+    """Get detailed attendance analytics (monthly buckets, top events, rolling trends and a short forecast)"""
     try:
-        insights = await agent_manager.generate_insights("attendance")
+        insights = jsonable_encoder(await cached_insights("attendance"))
+        # Monthly buckets are kept current by the aggregates, even between cache refreshes
+        insights["attendance_by_month"] = dict(aggregates.attendance_by_month)
         return insights
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate attendance insights: {str(e)}")
 
@@ -198,19 +1103,48 @@ async def get_attendance_insights():
 async def get_engagement_insights():
     """Get member engagement metrics"""
     try:
-        insights = await agent_manager.generate_insights("engagement")
+        insights = await cached_insights("engagement")
         return insights
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate engagement insights: {str(e)}")
 
+@app.post("/api/v1/insights/aggregates/rebuild", response_model=SuccessResponse)
+async def rebuild_insight_aggregates():
+    """Recompute the dashboard aggregates and analytics columns from the database (e.g. after a manual data fix)"""
+    try:
+        # Every worker rebuilds its own copy
+        await record_change("aggregates_rebuilt", None)
+        return SuccessResponse(message="Insight aggregates rebuilt", data=aggregates.dashboard())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild aggregates: {str(e)}")
+
 # ==================== GROUP ENDPOINTS ====================
 
 @app.get("/api/v1/groups", response_model=List[GroupResponse])
-async def get_groups():
-    """Get all ministry groups (worship, ushers, etc.)"""
+async def get_groups(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: only return groups with a greater id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    group_type: Optional[str] = Query(None, description="Filter by group type (worship, ushers, ...)"),
+    leader_id: Optional[int] = Query(None, description="Only groups led by this member"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,members_count"),
+):
+    """Get a page of ministry groups (worship, ushers, etc.)"""
     try:
-        groups = await database_service.get_all_groups()
-        return groups
+        projection = parse_fields(fields, GroupResponse)
+        groups = await read_database_service.get_all_groups(
+            after=after,
+            limit=limit + 1,
+            fields=relation_columns(projection, GROUP_RELATIONS),
+            include_relations=False,
+            group_type=group_type,
+            leader_id=leader_id,
+        )
+        return await build_page(groups, limit, projection, response, GroupResponse, GROUP_RELATIONS, group_loaders())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch groups: {str(e)}")
 
@@ -219,6 +1153,7 @@ async def create_group(group_data: GroupCreateRequest):
     """Create new ministry group"""
     try:
         group = await database_service.create_group(group_data.dict())
+        await record_change("group_created", group)
         return group
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create group: {str(e)}")
@@ -226,11 +1161,34 @@ async def create_group(group_data: GroupCreateRequest):
 # ==================== TASK ENDPOINTS ====================
 
 @app.get("/api/v1/tasks", response_model=List[TaskResponse])
-async def get_tasks():
-    """Get all tasks (onboarding, assignments, etc.)"""
+async def get_tasks(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: only return tasks with a greater id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    status: Optional[TaskStatus] = Query(None, description="Filter by task status"),
+    member_id: Optional[int] = Query(None, description="Only tasks assigned to this member"),
+    group_id: Optional[int] = Query(None, description="Only tasks assigned to members of this group"),
+    due_from: Optional[datetime] = Query(None, description="Only tasks due at or after this time"),
+    due_to: Optional[datetime] = Query(None, description="Only tasks due before this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status"),
+):
+    """Get a page of tasks (onboarding, assignments, etc.)"""
     try:
-        tasks = await database_service.get_all_tasks()
-        return tasks
+        projection = parse_fields(fields, TaskResponse)
+        tasks = await read_database_service.get_all_tasks(
+            after=after,
+            limit=limit + 1,
+            fields=relation_columns(projection, TASK_RELATIONS),
+            include_relations=False,
+            status=status,
+            member_id=member_id,
+            group_id=group_id,
+            due_from=due_from,
+            due_to=due_to,
+        )
+        return await build_page(tasks, limit, projection, response, TaskResponse, TASK_RELATIONS, task_loaders())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tasks: {str(e)}")
 
@@ -241,12 +1199,84 @@ async def complete_task(task_id: int):
         task = await database_service.complete_task(task_id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
+        await record_change("task_completed", task)
         return task
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to complete task: {str(e)}")
 
+# ==================== EXPORT ENDPOINTS ====================
+# NDJSON streams for nightly sync jobs and bulk analytics.
+# Rows come from server-side database cursors and are written out one at a time,
+# so memory stays flat regardless of table size and the first row is sent immediately.
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def ndjson_lines(rows: AsyncIterator[Dict[str, Any]], model: Type[BaseModel]) -> AsyncIterator[Union[str, bytes]]:
+    """Serialize each row through its response model (or the fast path) as one JSON document per line"""
+    if FAST_LIST_SERIALIZATION:
+        async for row in rows:
+            yield dumps(project_rows((row,), model)[0]) + b"\n"
+        return
+    async for row in rows:
+        yield model.parse_obj(row).json() + "\n"
+
+def ndjson_response(rows: AsyncIterator[Dict[str, Any]], model: Type[BaseModel], filename: str) -> StreamingResponse:
+    """Wrap a row stream in a StreamingResponse that downloads as <filename>.ndjson"""
+    return StreamingResponse(
+        ndjson_lines(rows, model),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'},
+    )
+
+@app.get("/api/v1/export/events")
+async def export_events(updated_since: Optional[datetime] = Query(None, description="Only rows changed after this time")):
+    """Stream every event as NDJSON (used by nightly sync jobs)"""
+    return ndjson_response(read_database_service.stream_events(updated_since=updated_since), EventResponse, "events")
+
+@app.get("/api/v1/export/members")
+async def export_members(updated_since: Optional[datetime] = Query(None, description="Only rows changed after this time")):
+    """Stream every member as NDJSON"""
+    return ndjson_response(read_database_service.stream_members(updated_since=updated_since), MemberResponse, "members")
+
+@app.get("/api/v1/export/attendance")
+async def export_attendance(
+    event_id: Optional[int] = Query(None, description="Only attendance for this event"),
+    attended_from: Optional[datetime] = Query(None, description="Only check-ins at or after this time"),
+):
+    """Stream attendance records as NDJSON (feeds the insights page and sync jobs)"""
+    rows = read_database_service.stream_attendance(event_id=event_id, attended_from=attended_from)
+    return ndjson_response(rows, AttendanceRecordResponse, "attendance")
+
+# ==================== JOB ENDPOINTS ====================
+
+@app.get("/api/v1/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Poll the status of a background agent job"""
+    try:
+        job = await job_queue.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch job: {str(e)}")
+
+@app.get("/api/v1/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events stream of job progress; closes once the job completes or fails"""
+    progress = await job_queue.watch(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Job not found or no longer tracked; poll /api/v1/jobs/{id}")
+
+    async def events():
+        async for event in progress:
+            yield sse_event(event["type"], event)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # ==================== AGENT STATUS ENDPOINT ====================
 
 @app.get("/api/v1/agents/status")
@@ -256,7 +1286,20 @@ async def get_agent_status():
     Useful for debugging and monitoring
     """
     try:
-        status = await agent_manager.get_agent_status()
+        status = jsonable_encoder(await agent_manager.get_agent_status())
+        # AgentManager only sees this worker's calls; the shared counters cover every worker
+        calls = await shared_state.counters(f"agent_calls:{date.today().isoformat()}:")
+        total_calls = sum(calls.values())
+        status["total_tasks_today"] = total_calls
+        if total_calls:
+            succeeded = sum(count for key, count in calls.items() if key.endswith(":ok"))
+            status["success_rate"] = round(succeeded / total_calls, 4)
+        # Cache, queue and check-in counters below are this worker's own
+        status["caches"] = {"insights": insights_cache.stats(), "content": content_cache.stats()}
+        status["jobs"] = {**job_queue.stats(), **await job_queue.shared_stats()}
+        status["checkins"] = checkin_buffer.stats()
+        status["admission"] = admission.stats()
+        status["shared_state"] = change_feed.stats()
         return status
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agent status: {str(e)}")
@@ -274,12 +1317,42 @@ async def global_exception_handler(request, exc):
         }
     )
 
+def default_worker_count() -> int:
+    """One worker per core this process may use (CPU affinity, and the cgroup CPU quota in containers)"""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, -(-int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
 # Run the application
+# RUN_MODE=production runs WEB_CONCURRENCY workers (default: one per core) without auto-reload
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Auto-reload during development
-        log_level="info"
-    )
\ No newline at end of file
+    import uvicorn
+
+    if os.getenv("RUN_MODE", "development") == "production":
+        workers = int(os.getenv("WEB_CONCURRENCY") or default_worker_count())
+        if workers > 1 and SHARED_STATE_URL.startswith("memory://"):
+            if "SHARED_STATE_URL" in os.environ:
+                raise SystemExit("SHARED_STATE_URL=memory:// cannot be shared by several workers")
+            # Each worker is a new process that imports main and reads this
+            os.environ["SHARED_STATE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "ecclesiaflow-shared-state.db")
+        uvicorn.run(
+            "main:app",
+            host=os.getenv("HOST", "0.0.0.0"),
+            port=int(os.getenv("PORT", "8000")),
+            workers=workers,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,  # Auto-reload during development
+            log_level="info"
+        )
\ No newline at end of file
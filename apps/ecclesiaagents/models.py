@@ -23,6 +23,13 @@ class TaskStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
 
+class JobStatus(str, Enum):
+    """Background agent job status (persisted to the AgentTask table)"""
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class MemberRole(str, Enum):
     """Member roles in the church"""
     ADMIN = "admin"
@@ -65,6 +72,37 @@ class EventResponse(BaseModel):
     groups: Optional[List[Dict[str, Any]]] = []
     attendees_count: Optional[int] = 0
 
+class EventConflict(BaseModel):
+    """An existing (or proposed) event that clashes with a proposed event"""
+    event_id: Optional[int] = Field(None, description="Conflicting stored event")
+    proposal_index: Optional[int] = Field(None, description="Conflicting proposal in the same batch")
+    title: Optional[str]
+    start_date: datetime
+    end_date: datetime
+    location: Optional[str]
+    reasons: List[str] = Field(..., description="'location' and/or 'group:<id>'")
+
+class ConflictCheckRequest(BaseModel):
+    """Request model for checking a batch of proposed events, e.g. a recurring series"""
+    events: List[EventCreateRequest] = Field(..., min_items=1, max_items=1000)
+
+class ConflictCheckResult(BaseModel):
+    """Conflicts for one proposed event"""
+    index: int
+    title: str
+    start_date: datetime
+    has_conflicts: bool
+    conflicts: List[EventConflict] = []
+
+class ConflictCheckResponse(BaseModel):
+    """Response model for batch conflict checks"""
+    results: List[ConflictCheckResult]
+    total_conflicting: int
+
+class EventCreateResponse(EventResponse):
+    """Response model for a newly created event"""
+    conflicts: List[EventConflict] = Field(default=[], description="Stored events it overlaps in location or group")
+
 # ==================== MEMBER MODELS ====================
 
 class MemberCreateRequest(BaseModel):
@@ -96,6 +134,43 @@ class MemberResponse(BaseModel):
     tasks_completed: Optional[int] = 0
     tasks_pending: Optional[int] = 0
 
+# ==================== ATTENDANCE MODELS ====================
+
+class AttendanceRecordResponse(BaseModel):
+    """Response model for attendance records (mirrors the Prisma AttendanceRecord table)"""
+    id: int
+    event_id: int
+    user_id: int
+    attended_at: datetime
+    checked_in: bool = True
+
+class CheckInRequest(BaseModel):
+    """Request model for checking a member in to an event"""
+    user_id: int = Field(..., description="Member checking in")
+    attended_at: Optional[datetime] = Field(None, description="Check-in time (defaults to now)")
+
+class CheckInResponse(BaseModel):
+    """Response model for check-ins (they are written to the database in batches, shortly after)"""
+    event_id: int
+    user_id: int
+    status: str = Field(..., description="'accepted', or 'duplicate' when already checked in")
+    attended_at: Optional[datetime] = None
+
+class MemberImportRowError(BaseModel):
+    """Why one row of a bulk import was not imported"""
+    row: int = Field(..., description="1-based data row (CSV header excluded)")
+    email: Optional[str]
+    error: str
+
+class MemberImportResponse(BaseModel):
+    """Response model for bulk member imports"""
+    total_rows: int
+    imported: int
+    duplicates: int
+    failed: int
+    errors: List[MemberImportRowError] = []
+    onboarding_job_id: Optional[str] = Field(None, description="Background job creating onboarding tasks")
+
 # ==================== CONTENT GENERATION MODELS ====================
 
 class FlyerGenerationRequest(BaseModel):
@@ -136,6 +211,31 @@ class ContentResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(default={}, description="Additional metadata")
     created_at: datetime = Field(default_factory=datetime.now)
 
+class ContentBatchItem(BaseModel):
+    """One generation request inside a batch; params follow the matching single-item request model"""
+    content_type: str = Field(..., description="Type of content (flyer, social_post, welcome_material)")
+    params: Dict[str, Any] = Field(..., description="FlyerGenerationRequest, SocialPostRequest or WelcomeMaterialRequest fields")
+
+class ContentBatchRequest(BaseModel):
+    """Request model for generating many pieces of content in one call"""
+    items: List[ContentBatchItem] = Field(..., min_items=1, max_items=200, description="Requests, processed in order")
+
+class ContentBatchResult(BaseModel):
+    """Outcome of one batch item (results keep the request order)"""
+    index: int
+    content_type: str
+    success: bool
+    content: Optional[ContentResponse] = None
+    error: Optional[str] = None
+
+class ContentBatchResponse(BaseModel):
+    """Response model for batch content generation"""
+    results: List[ContentBatchResult]
+    total: int
+    succeeded: int
+    failed: int
+    unique_requests: int = Field(..., description="Distinct requests after de-duplication")
+
 # ==================== TASK MODELS ====================
 
 class TaskCreateRequest(BaseModel):
@@ -234,8 +334,28 @@ class AgentSystemStatus(BaseModel):
     total_tasks_today: int
     success_rate: float
     uptime: str
+    caches: Optional[Dict[str, Dict[str, Any]]] = Field(default=None, description="Hit/miss counters per cache")
+    jobs: Optional[Dict[str, Any]] = Field(default=None, description="Background job queue counters")
+    checkins: Optional[Dict[str, Any]] = Field(default=None, description="Check-in buffer counters")
+    admission: Optional[Dict[str, Dict[str, Any]]] = Field(
+        default=None, description="Admission control per agent: calls in flight, queue depth and rejections"
+    )
     generated_at: datetime = Field(default_factory=datetime.now)
 
+class JobResponse(BaseModel):
+    """Response model for background agent jobs (event and onboarding workflows)"""
+    id: str = Field(..., description="AgentTask ID, used to poll /api/v1/jobs/{id}")
+    agent: str = Field(..., description="Agent that runs the job (calendar, onboarding, ...)")
+    job_type: str
+    description: Optional[str] = None
+    status: JobStatus
+    result: Optional[Dict[str, Any]] = Field(None, description="Workflow result once completed")
+    error: Optional[str] = None
+    progress: List[Dict[str, Any]] = Field(default=[], description="Progress events so far")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
 # ==================== GENERIC RESPONSE MODELS ====================
 
 class SuccessResponse(BaseModel):
@@ -0,0 +1,223 @@
+"""
+🚧 Admission Control - Bounded concurrency, queueing and rate limits in front of the LLM agents
+Purpose: A burst from the web UI must not exhaust the provider quota or leave dozens of calls
+timing out together. Each agent admits a fixed number of calls at once; the rest wait in a
+short priority queue (interactive requests ahead of batch work) with a deadline, and anything
+beyond the queue, the deadline or the shared rate limit is rejected at once with a retry hint
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from services.shared_state import MemorySharedState, SharedState
+
+# Initial estimate of how long an admitted call holds its slot, refined as calls finish
+INITIAL_SERVICE_SECONDS = 2.0
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first"""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class AdmissionRejected(Exception):
+    """The call was not admitted; retry_after is a hint in seconds (sent as Retry-After)"""
+
+    def __init__(self, agent: str, reason: str, retry_after: float):
+        super().__init__(f"{agent} agent is busy ({reason}); retry in {math.ceil(retry_after)}s")
+        self.agent = agent
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AgentLimit:
+    """
+    Limits for one agent
+    max_concurrency calls in flight per worker; max_queue waiting, each for at most max_wait seconds;
+    rate_per_minute (optional) is a token bucket shared by every worker, with burst tokens
+    (default: ten seconds' worth)
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 32, max_wait: float = 10.0,
+                 rate_per_minute: Optional[float] = None, burst: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+
+
+class _Gate:
+    """Admission state of one agent"""
+
+    def __init__(self, agent: str, limit: AgentLimit):
+        self.agent = agent
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []  # Heap of (priority, arrival, future)
+        self.service_seconds = INITIAL_SERVICE_SECONDS
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.rejected_rate_limit = 0
+        self.displaced = 0
+
+    def retry_after(self) -> float:
+        """Rough time until a new caller would get a slot: queued work divided by the slots"""
+        backlog = (len(self.waiters) + 1) * self.service_seconds / self.limit.max_concurrency
+        return max(1.0, min(backlog, self.limit.max_wait))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.limit.max_concurrency,
+            "queued": len(self.waiters),
+            "queued_interactive": sum(1 for entry in self.waiters if entry[0] == Priority.INTERACTIVE),
+            "queued_batch": sum(1 for entry in self.waiters if entry[0] == Priority.BATCH),
+            "max_queue": self.limit.max_queue,
+            "rate_per_minute": self.limit.rate_per_minute,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "rejected_rate_limit": self.rejected_rate_limit,
+            "displaced": self.displaced,
+            "avg_service_seconds": round(self.service_seconds, 3),
+        }
+
+
+class Ticket:
+    """An admitted call's slot; release() is idempotent, so it can be called from several cleanup paths"""
+
+    def __init__(self, controller: Optional["AdmissionController"], gate: Optional[_Gate]):
+        self._controller = controller
+        self._gate = gate
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released and self._gate is not None:
+            self._released = True
+            self._controller._release(self._gate, time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """
+    Per-agent admission in front of agent_manager calls
+
+    acquire() returns at once while a slot is free and nobody is queued; otherwise the caller
+    waits in the agent's priority queue. A full queue rejects immediately, except that an
+    interactive caller displaces the newest queued batch caller. Agents without a limit pass through.
+    """
+
+    def __init__(self, limits: Dict[str, AgentLimit], shared_state: Optional[SharedState] = None):
+        self._gates = {agent: _Gate(agent, limit) for agent, limit in limits.items()}
+        # Rate limits only hold across workers with a shared backend; memory covers a single worker
+        self.shared_state = shared_state or MemorySharedState()
+        self._arrivals = itertools.count()
+
+    async def acquire(self, agent: str, priority: Priority = Priority.INTERACTIVE) -> Ticket:
+        """Wait for a slot (and a rate-limit token); raises AdmissionRejected instead of waiting past the deadline"""
+        gate = self._gates.get(agent)
+        if gate is None:
+            return Ticket(None, None)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + gate.limit.max_wait
+        if gate.in_flight < gate.limit.max_concurrency and not gate.waiters:
+            gate.in_flight += 1
+        else:
+            await self._wait_for_slot(gate, priority, deadline)
+        ticket = Ticket(self, gate)
+        try:
+            await self._take_token(gate, deadline)
+        except BaseException:
+            ticket.release()
+            raise
+        gate.admitted += 1
+        return ticket
+
+    @asynccontextmanager
+    async def admit(self, agent: str, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        ticket = await self.acquire(agent, priority)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+    async def _wait_for_slot(self, gate: _Gate, priority: Priority, deadline: float) -> None:
+        if len(gate.waiters) >= gate.limit.max_queue:
+            victim = max(gate.waiters, default=None)  # Lowest priority, latest arrival
+            if victim is None or victim[0] <= priority:
+                gate.rejected_queue_full += 1
+                raise AdmissionRejected(gate.agent, "queue full", gate.retry_after())
+            self._remove(gate, victim)
+            gate.displaced += 1
+            victim[2].set_exception(AdmissionRejected(gate.agent, "displaced by interactive requests", gate.retry_after()))
+
+        loop = asyncio.get_running_loop()
+        entry = (int(priority), next(self._arrivals), loop.create_future())
+        heapq.heappush(gate.waiters, entry)
+        future = entry[2]
+        try:
+            # Not wait_for: it swallows a cancellation that arrives as the slot is handed over
+            done, _ = await asyncio.wait({future}, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.CancelledError:
+            # The caller went away (e.g. client disconnect); hand back a slot it was just given
+            if future.done() and future.exception() is None:
+                self._release(gate, None)
+            else:
+                self._remove(gate, entry)
+                future.cancel()
+            raise
+        if not done:
+            self._remove(gate, entry)
+            future.cancel()
+            gate.rejected_timeout += 1
+            raise AdmissionRejected(gate.agent, "queue wait deadline exceeded", gate.retry_after())
+        future.result()  # Raises AdmissionRejected if displaced by an interactive caller
+
+    async def _take_token(self, gate: _Gate, deadline: float) -> None:
+        """Shares the agent_rate:<agent> bucket with JobQueue, so background jobs and requests draw on one quota"""
+        per_minute = gate.limit.rate_per_minute
+        if not per_minute:
+            return
+        rate = per_minute / 60
+        burst = gate.limit.burst or max(1.0, rate * 10)
+        loop = asyncio.get_running_loop()
+        while True:
+            wait = await self.shared_state.take_token(f"agent_rate:{gate.agent}", rate, burst)
+            if not wait:
+                return
+            if loop.time() + wait > deadline:
+                gate.rejected_rate_limit += 1
+                raise AdmissionRejected(gate.agent, "rate limit", wait)
+            await asyncio.sleep(wait)
+
+    def _remove(self, gate: _Gate, entry: Tuple[int, int, asyncio.Future]) -> None:
+        for index, waiting in enumerate(gate.waiters):
+            if waiting is entry:
+                gate.waiters[index] = gate.waiters[-1]
+                gate.waiters.pop()
+                heapq.heapify(gate.waiters)
+                return
+
+    def _release(self, gate: _Gate, held_seconds: Optional[float]) -> None:
+        if held_seconds is not None:
+            gate.service_seconds += SERVICE_TIME_SMOOTHING * (held_seconds - gate.service_seconds)
+        # Hand the slot straight to the next waiter, so a newcomer cannot jump the queue
+        while gate.waiters:
+            _, _, future = heapq.heappop(gate.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        gate.in_flight -= 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent counters and queue depth, reported on /api/v1/agents/status"""
+        return {agent: gate.stats() for agent, gate in self._gates.items()}
@@ -0,0 +1,161 @@
+"""
+📊 Aggregate Service - Incrementally maintained dashboard counters
+Purpose: Keep DashboardInsights and monthly attendance numbers up to date as data is written,
+so the dashboard no longer scans every member, event, task and attendance row per request
+"""
+import heapq
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from services.datetimes import as_naive_local
+
+RECENT_ACTIVITY_LIMIT = 20
+TREND_MONTHS = 6
+OPEN_TASK_STATUSES = ("pending", "in_progress")  # Tuple, not set: str-Enum members hash differently from their values
+
+
+def _month_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+class InsightAggregates:
+    """
+    Counters behind the dashboard and attendance insights
+
+    Every record_* call is O(1) (O(log n) for the upcoming-events heap), and rebuild()
+    recomputes everything from the database streams, e.g. at startup or after a bulk change.
+    """
+
+    def __init__(self):
+        self.total_members = 0
+        self.total_events = 0
+        self.active_tasks = 0
+        self.completed_tasks = 0
+        self.attendance_by_month: Counter = Counter()
+        self.attendance_by_event: Counter = Counter()
+        self.recent_activity: Deque[Dict[str, Any]] = deque(maxlen=RECENT_ACTIVITY_LIMIT)
+        self.rebuilt_at: Optional[datetime] = None
+        self._upcoming_starts: List[datetime] = []  # Min-heap of start dates not yet reached
+        self._completed_task_ids: Set[int] = set()
+        self._engaged_member_ids: Set[int] = set()
+
+    # ==================== WRITE HOOKS ====================
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        """A new event was created"""
+        self.total_events += 1
+        start_date = as_naive_local(event.get("start_date"))
+        if start_date and start_date > datetime.now():
+            heapq.heappush(self._upcoming_starts, start_date)
+        self._add_activity("event_created", event.get("id"), event.get("title"))
+
+    def record_member(self, member: Dict[str, Any]) -> None:
+        """A new member joined (onboarding may already have created pending tasks)"""
+        self.total_members += 1
+        self.active_tasks += member.get("tasks_pending") or 0
+        self._add_activity("member_joined", member.get("id"), member.get("name"))
+
+    def record_group(self, group: Dict[str, Any]) -> None:
+        """A new ministry group was created"""
+        self._add_activity("group_created", group.get("id"), group.get("name"))
+
+    def record_task(self, task: Dict[str, Any]) -> None:
+        """A task was created"""
+        if task.get("status", "pending") in OPEN_TASK_STATUSES:
+            self.active_tasks += 1
+        else:
+            self._count_completed(task)
+
+    def record_task_completed(self, task: Dict[str, Any]) -> None:
+        """An open task was marked completed"""
+        if task.get("id") in self._completed_task_ids:
+            return  # Completing an already completed task changes nothing
+        self.active_tasks = max(self.active_tasks - 1, 0)
+        self._count_completed(task)
+        self._add_activity("task_completed", task.get("id"), task.get("title"))
+
+    def record_attendance(self, record: Dict[str, Any]) -> None:
+        """A member checked in to an event"""
+        attended_at = as_naive_local(record.get("attended_at")) or datetime.now()
+        self.attendance_by_month[_month_key(attended_at)] += 1
+        self.attendance_by_event[record.get("event_id")] += 1
+        self._engaged_member_ids.add(record.get("user_id"))
+
+    def _count_completed(self, task: Dict[str, Any]) -> None:
+        self.completed_tasks += 1
+        self._completed_task_ids.add(task.get("id"))
+        # Rows from the database carry member_id; tasks returned with their relations carry member
+        member_id = task.get("member_id", (task.get("member") or {}).get("id"))
+        if member_id is not None:
+            self._engaged_member_ids.add(member_id)
+
+    def _add_activity(self, activity_type: str, entity_id: Any, label: Optional[str]) -> None:
+        self.recent_activity.appendleft({
+            "type": activity_type,
+            "id": entity_id,
+            "label": label,
+            "timestamp": datetime.now().isoformat(),
+        })
+
+    # ==================== READ MODELS ====================
+
+    @property
+    def upcoming_events(self) -> int:
+        now = datetime.now()
+        while self._upcoming_starts and self._upcoming_starts[0] <= now:
+            heapq.heappop(self._upcoming_starts)
+        return len(self._upcoming_starts)
+
+    @property
+    def engagement_score(self) -> float:
+        """Percentage of members who attended an event or completed a task"""
+        if not self.total_members:
+            return 0.0
+        return round(min(len(self._engaged_member_ids) / self.total_members, 1.0) * 100, 1)
+
+    def attendance_trend(self) -> Dict[str, Any]:
+        """Attendance for the most recent months plus the month-over-month change"""
+        months = sorted(self.attendance_by_month)[-TREND_MONTHS:]
+        series = {month: self.attendance_by_month[month] for month in months}
+        change = None
+        if len(months) >= 2 and series[months[-2]]:
+            change = round((series[months[-1]] - series[months[-2]]) / series[months[-2]] * 100, 1)
+        return {"months": series, "month_over_month_change": change}
+
+    def dashboard(self) -> Dict[str, Any]:
+        """Fields for a DashboardInsights response"""
+        return {
+            "total_members": self.total_members,
+            "total_events": self.total_events,
+            "upcoming_events": self.upcoming_events,
+            "active_tasks": self.active_tasks,
+            "recent_activity": list(self.recent_activity),
+            "attendance_trend": self.attendance_trend(),
+            "engagement_score": self.engagement_score,
+        }
+
+    # ==================== FULL REBUILD ====================
+
+    async def rebuild(self, database_service) -> None:
+        """
+        Recompute every aggregate from the database
+        Streams rows (constant memory) into a fresh store, then swaps it in at once
+        """
+        fresh = InsightAggregates()
+        async for event in database_service.stream_events():
+            fresh.total_events += 1
+            start_date = as_naive_local(event.get("start_date"))
+            if start_date and start_date > datetime.now():
+                fresh._upcoming_starts.append(start_date)
+        heapq.heapify(fresh._upcoming_starts)
+        async for _member in database_service.stream_members():
+            fresh.total_members += 1
+        async for task in database_service.stream_tasks():
+            fresh.record_task(task)
+        async for record in database_service.stream_attendance():
+            fresh.record_attendance(record)
+
+        fresh.recent_activity = self.recent_activity
+        fresh.rebuilt_at = datetime.now()
+        self.__dict__.update(fresh.__dict__)
@@ -0,0 +1,478 @@
+"""
+📐 Analytics Engine - Columnar attendance and engagement analytics
+Purpose: Compute AttendanceInsights and EngagementInsights with vectorized NumPy group-bys
+instead of walking attendance, membership and task rows one dict at a time
+History is loaded into typed columns once at startup and extended by the write hooks, so a
+multi-year history (millions of check-ins) is analyzed in tens of milliseconds
+"""
+import asyncio
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.datetimes import as_naive_local
+
+ACTIVE_WINDOW_DAYS = 90  # A member is active after attending or completing a task within this window
+TOP_EVENTS = 10
+TOP_MEMBERS = 10
+TREND_WEEKS = 12
+FORECAST_HISTORY_WEEKS = 26
+FORECAST_WEEKS = 4
+MEMBER_GROUP_BATCH = 1000
+LOW_GROUP_ENGAGEMENT = 50.0  # Percent
+MIN_GROUP_SIZE = 5  # Smaller groups are too noisy to flag
+STABLE_TREND = 0.01  # Weekly slope under 1% of the mean counts as flat
+# Pending rows are converted to arrays this many at a time: list conversion holds the GIL, so a
+# worker thread folding millions of rows must let the event loop run in between
+FOLD_CHUNK_ROWS = 50000
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _day(value: Any) -> int:
+    """Days since 1970-01-01 for a datetime, date or ISO string (aware values count in local days)"""
+    if isinstance(value, datetime) or not isinstance(value, date):
+        value = as_naive_local(value).date()
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _to_array(values: List[Any], dtype: Any) -> np.ndarray:
+    """Convert and empty a list of pending values, a chunk at a time (freeing millions of ints holds the GIL too)"""
+    chunks = []
+    while values:
+        chunks.append(np.asarray(values[-FOLD_CHUNK_ROWS:], dtype))
+        del values[-FOLD_CHUNK_ROWS:]
+    return np.concatenate(chunks[::-1]) if chunks else np.empty(0, dtype)
+
+
+def _date(day: int) -> date:
+    return date.fromordinal(int(day) + _EPOCH_ORDINAL)
+
+
+def _week(days: np.ndarray) -> np.ndarray:
+    """Monday-based week number (1970-01-01 was a Thursday)"""
+    return (days + 3) // 7
+
+
+def _month_label(month: int) -> str:
+    return f"{1970 + month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def _months(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+class _Columns:
+    """
+    Append-only typed columns; appends land in Python lists and are folded into arrays on read
+    With sort_by, rows are kept ordered by that column, so time windows are binary-searched
+    slices instead of boolean masks over the whole history
+    """
+
+    def __init__(self, sort_by: Optional[str] = None, **dtypes: Any):
+        self._sort_by = sort_by
+        self._dtypes = dtypes
+        self._arrays = {name: np.empty(0, dtype) for name, dtype in dtypes.items()}
+        self._pending: Dict[str, List[Any]] = {name: [] for name in dtypes}
+        self._merging = 0  # Rows taken out of _pending by a fold that has not stored its arrays yet
+        # Appends (event loop) and folds (worker threads) only hold _lock to swap lists and arrays;
+        # _fold_lock keeps two folds from building on the same arrays
+        self._lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        first = next(iter(self._dtypes))
+        with self._lock:
+            return len(self._arrays[first]) + self._merging + len(self._pending[first])
+
+    def append(self, **values: Any) -> None:
+        with self._lock:
+            for name in self._dtypes:
+                self._pending[name].append(values[name])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Fold pending rows into the arrays (concatenate, and re-sort if needed); call from a worker thread"""
+        with self._fold_lock:
+            with self._lock:
+                pending, arrays = self._pending, self._arrays
+                count = len(pending[next(iter(self._dtypes))])
+                if not count:
+                    return dict(arrays)
+                self._pending = {name: [] for name in self._dtypes}
+                self._merging = count
+
+            added = {name: _to_array(pending[name], dtype) for name, dtype in self._dtypes.items()}
+            in_order = True
+            if self._sort_by:
+                key, existing = added[self._sort_by], arrays[self._sort_by]
+                # Check-ins arrive roughly in time order, so the full re-sort is rare (mostly the initial load)
+                in_order = bool(np.all(key[1:] >= key[:-1])) and (not len(existing) or key[0] >= existing[-1])
+            merged = {name: np.concatenate([arrays[name], added[name]]) for name in self._dtypes}
+            if not in_order:
+                order = np.argsort(merged[self._sort_by], kind="stable")
+                merged = {name: column[order] for name, column in merged.items()}
+
+            with self._lock:
+                self._arrays = merged
+                self._merging = 0
+            return dict(merged)
+
+
+class AnalyticsEngine:
+    """
+    Columnar store of attendance, events, members, group memberships and task completions
+    load() builds it from the database; the record_* hooks mirror InsightAggregates' write hooks
+    """
+
+    def __init__(self):
+        self.attendance = _Columns(sort_by="day", event_id=np.int64, user_id=np.int64, day=np.int64)
+        self.events = _Columns(event_id=np.int64, day=np.int64)
+        self.members = _Columns(member_id=np.int64)
+        self.memberships = _Columns(member_id=np.int64, group_id=np.int64)
+        self.completions = _Columns(sort_by="day", member_id=np.int64, day=np.int64)
+        self.event_titles: Dict[int, Tuple[Optional[str], Any]] = {}
+        self.member_names: Dict[int, Optional[str]] = {}
+        self.group_names: Dict[int, str] = {}
+        self._completed_task_ids: Set[Any] = set()
+        self.loaded_at: Optional[datetime] = None
+
+    # ==================== LOADING & WRITE HOOKS ====================
+
+    async def load(self, database_service) -> None:
+        """(Re)build every column from the database streams, then swap the new store in"""
+        fresh = AnalyticsEngine()
+        async for event in database_service.stream_events():
+            fresh.record_event(event)
+        member_ids: List[int] = []
+        async for member in database_service.stream_members():
+            fresh.record_member(member, group_ids=())
+            member_ids.append(member["id"])
+        # Memberships come from the same batch query the member list endpoint uses
+        for start in range(0, len(member_ids), MEMBER_GROUP_BATCH):
+            groups_by_member = await database_service.get_groups_for_members(member_ids[start:start + MEMBER_GROUP_BATCH])
+            for member_id, groups in groups_by_member.items():
+                for group in groups or []:
+                    fresh._add_membership(member_id, group.get("id"), group.get("name"))
+        async for task in database_service.stream_tasks():
+            if task.get("status") == "completed":
+                fresh.record_task_completed(task)
+        async for record in database_service.stream_attendance():
+            fresh.record_attendance(record)
+        # Fold the loaded rows (and sort millions of check-ins) off the event loop, before the swap
+        await asyncio.to_thread(fresh._fold)
+        fresh.loaded_at = datetime.now()
+        self.__dict__.update(fresh.__dict__)
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        if event.get("id") is None or event.get("start_date") is None:
+            return
+        self.events.append(event_id=event["id"], day=_day(event["start_date"]))
+        self.event_titles[event["id"]] = (event.get("title"), as_naive_local(event["start_date"]))
+
+    def record_member(self, member: Dict[str, Any], group_ids: Optional[Iterable[int]] = None) -> None:
+        """A member joined; group_ids defaults to the member's group_ids / groups fields"""
+        if member.get("id") is None:
+            return
+        self.members.append(member_id=member["id"])
+        self.member_names[member["id"]] = member.get("name")
+        if group_ids is None:
+            group_ids = member.get("group_ids") or [group.get("id") for group in member.get("groups") or []]
+        for group_id in group_ids:
+            self._add_membership(member["id"], group_id, None)
+
+    def _add_membership(self, member_id: int, group_id: Optional[int], name: Optional[str]) -> None:
+        if group_id is None:
+            return
+        self.memberships.append(member_id=member_id, group_id=group_id)
+        if name or group_id not in self.group_names:
+            self.group_names[group_id] = name or f"Group {group_id}"
+
+    def record_task_completed(self, task: Dict[str, Any]) -> None:
+        if task.get("id") in self._completed_task_ids:
+            return  # Completing an already completed task changes nothing
+        self._completed_task_ids.add(task.get("id"))
+        member_id = task.get("member_id") or (task.get("member") or {}).get("id")
+        if member_id is not None:
+            self.completions.append(member_id=member_id, day=_day(task.get("completed_at") or datetime.now()))
+
+    def record_attendance(self, record: Dict[str, Any]) -> None:
+        self.attendance.append(
+            event_id=record["event_id"], user_id=record["user_id"],
+            day=_day(record.get("attended_at") or datetime.now()),
+        )
+
+    # ==================== INSIGHTS ====================
+
+    def _columns(self) -> Dict[str, _Columns]:
+        return {
+            "attendance": self.attendance,
+            "events": self.events,
+            "members": self.members,
+            "memberships": self.memberships,
+            "completions": self.completions,
+        }
+
+    def _fold(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Arrays of every column as of now (worker thread)"""
+        return {name: columns.arrays() for name, columns in self._columns().items()}
+
+    async def _compute(self, compute: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run compute on a snapshot in a worker thread; the arrays are folded there too, so the
+        event loop only copies the small lookups (which its write hooks keep changing)
+        """
+        lookups = {
+            "event_titles": dict(self.event_titles),
+            "member_names": dict(self.member_names),
+            "group_names": dict(self.group_names),
+            "today": _day(datetime.now()),
+        }
+        return await asyncio.to_thread(lambda: compute({**self._fold(), **lookups}))
+
+    async def attendance_insights(self) -> Dict[str, Any]:
+        """Fields for an AttendanceInsights response"""
+        return await self._compute(compute_attendance_insights)
+
+    async def engagement_insights(self) -> Dict[str, Any]:
+        """Fields for an EngagementInsights response"""
+        return await self._compute(compute_engagement_insights)
+
+
+# ==================== VECTORIZED COMPUTATIONS ====================
+
+class DailyCounts:
+    """
+    Check-ins per calendar day, the base of every time series
+    Weekly and monthly series fold this histogram (thousands of days, not millions of rows)
+    """
+
+    def __init__(self, days: np.ndarray, today: int):
+        """days must be sorted (see _Columns sort_by): each day's count is then one binary search"""
+        self.today = today
+        self.first = int(days[0]) if len(days) else today
+        last = int(days[-1]) if len(days) else today - 1
+        self.day_numbers = np.arange(self.first, last + 1)
+        self.counts = np.diff(np.searchsorted(days, np.arange(self.first, last + 2)))
+
+    def _fold(self, buckets: np.ndarray, before: int) -> Tuple[int, np.ndarray]:
+        keep = buckets < before
+        if not keep.any():
+            return before, np.zeros(0, np.int64)
+        first = int(buckets[keep][0])
+        folded = np.bincount(buckets[keep] - first, weights=self.counts[keep], minlength=before - first)
+        return first, folded.astype(np.int64)
+
+    def weekly(self) -> Tuple[int, np.ndarray]:
+        """(first week number, check-ins per complete week); the current, partial week is left out"""
+        return self._fold(_week(self.day_numbers), int(_week(np.int64(self.today))))
+
+    def monthly(self) -> Tuple[int, np.ndarray]:
+        """(first month number, check-ins per month), including the current and any later month"""
+        months = _months(self.day_numbers)
+        return self._fold(months, int(months[-1]) + 1) if len(months) else (0, np.zeros(0, np.int64))
+
+
+def rolling_mean(series: np.ndarray, window: int) -> Optional[float]:
+    if len(series) < window:
+        return None
+    return round(float(np.convolve(series, np.ones(window) / window, mode="valid")[-1]), 1)
+
+
+def attendance_trends(daily: DailyCounts) -> Dict[str, Any]:
+    """Weekly totals, 4/12-week rolling averages, month-over-month change and the weekly slope"""
+    first_week, series = daily.weekly()
+    recent = series[-TREND_WEEKS:]
+    slope = None
+    direction = "insufficient_data"
+    if len(recent) >= 4:
+        slope = float(np.polyfit(np.arange(len(recent)), recent, 1)[0])
+        mean = float(recent.mean()) or 1.0
+        direction = "stable" if abs(slope) < STABLE_TREND * mean else ("growing" if slope > 0 else "declining")
+
+    # Last complete month against the one before it
+    first_month, monthly = daily.monthly()
+    current_month = int(_months(np.array([daily.today]))[0])
+    month_over_month = None
+    last, previous = current_month - 1 - first_month, current_month - 2 - first_month
+    if 0 <= previous and last < len(monthly) and monthly[previous]:
+        month_over_month = round(float((monthly[last] - monthly[previous]) / monthly[previous] * 100), 1)
+
+    start_week = first_week + len(series) - len(recent)
+    return {
+        "weekly_totals": {
+            _date(week * 7 - 3).isoformat(): int(count) for week, count in zip(range(start_week, start_week + len(recent)), recent)
+        },
+        "rolling_4_week_average": rolling_mean(series, 4),
+        "rolling_12_week_average": rolling_mean(series, 12),
+        "month_over_month_change": month_over_month,
+        "weekly_slope": round(slope, 2) if slope is not None else None,
+        "direction": direction,
+    }
+
+
+def attendance_forecast(daily: DailyCounts, events_per_week: np.ndarray) -> Optional[Dict[str, Any]]:
+    """Linear trend over recent complete weeks, projected FORECAST_WEEKS ahead with a 95% band"""
+    first_week, series = daily.weekly()
+    history = series[-FORECAST_HISTORY_WEEKS:].astype(np.float64)
+    if len(history) < 4:
+        return None
+    x = np.arange(len(history))
+    slope, intercept = np.polyfit(x, history, 1)
+    residual_std = float(np.std(history - (slope * x + intercept)))
+    ahead = np.arange(len(history), len(history) + FORECAST_WEEKS)
+    expected = np.clip(slope * ahead + intercept, 0, None)
+    next_week = first_week + len(series)
+    # Check-ins per held event over the same window, for sizing rooms and volunteer rosters
+    held = events_per_week[-len(history):].sum()
+    return {
+        "method": f"linear trend over the last {len(history)} complete weeks",
+        "next_weeks": [
+            {
+                "week_start": _date((next_week + offset) * 7 - 3).isoformat(),
+                "expected_attendance": round(float(value), 1),
+                "low": round(max(float(value) - 1.96 * residual_std, 0.0), 1),
+                "high": round(float(value) + 1.96 * residual_std, 1),
+            }
+            for offset, value in enumerate(expected)
+        ],
+        "expected_per_event": round(float(history.sum() / held), 1) if held else None,
+        "residual_std": round(residual_std, 2),
+    }
+
+
+def compute_attendance_insights(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    attendance, events, today = snapshot["attendance"], snapshot["events"], snapshot["today"]
+    event_ids = attendance["event_id"]
+    daily = DailyCounts(attendance["day"], today)
+
+    # Check-ins per event id (ids are dense autoincrement integers, so bincount is the group-by)
+    size = int(max(event_ids.max(initial=-1), events["event_id"].max(initial=-1))) + 1
+    per_event = np.bincount(event_ids, minlength=size)
+    held_ids = events["event_id"][events["day"] <= today]
+    if not len(held_ids):
+        held_ids = np.flatnonzero(per_event)  # No event rows loaded: analyze events that had check-ins
+    held_counts = per_event[held_ids]
+
+    top = held_ids[np.argsort(-held_counts, kind="stable")[:TOP_EVENTS]] if len(held_ids) else held_ids
+    top_events = []
+    for event_id in top:
+        if not per_event[event_id]:
+            break
+        title, start_date = snapshot["event_titles"].get(int(event_id), (None, None))
+        top_events.append({"event_id": int(event_id), "title": title, "start_date": start_date,
+                           "attendance": int(per_event[event_id])})
+
+    first_month, monthly = daily.monthly()
+    by_month = {_month_label(first_month + offset): int(count) for offset, count in enumerate(monthly) if count}
+
+    # Events held in each of the last FORECAST_HISTORY_WEEKS complete weeks (oldest first)
+    weeks_ago = _week(np.int64(today)) - _week(events["day"])
+    recent = weeks_ago[(weeks_ago >= 1) & (weeks_ago <= FORECAST_HISTORY_WEEKS)]
+    events_per_week = np.bincount(FORECAST_HISTORY_WEEKS - recent, minlength=FORECAST_HISTORY_WEEKS)
+    return {
+        "total_events_analyzed": int(len(held_ids)),
+        "average_attendance": round(float(held_counts.mean()), 1) if len(held_counts) else 0.0,
+        "attendance_by_month": by_month,
+        "top_attended_events": top_events,
+        "attendance_trends": attendance_trends(daily),
+        "predictions": attendance_forecast(daily, events_per_week),
+        "generated_at": datetime.now(),
+    }
+
+
+def _split_window(member_ids: np.ndarray, days: np.ndarray, cutoff: int, previous_cutoff: int,
+                  size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-member counts in [cutoff, ...) and in [previous_cutoff, cutoff); days must be sorted"""
+    previous_start, current_start = np.searchsorted(days, [previous_cutoff, cutoff])
+    return (
+        np.bincount(member_ids[current_start:], minlength=size),
+        np.bincount(member_ids[previous_start:current_start], minlength=size),
+    )
+
+
+def compute_engagement_insights(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    attendance, completions = snapshot["attendance"], snapshot["completions"]
+    member_ids = snapshot["members"]["member_id"]
+    memberships, today = snapshot["memberships"], snapshot["today"]
+    cutoff, previous_cutoff = today - ACTIVE_WINDOW_DAYS, today - 2 * ACTIVE_WINDOW_DAYS
+
+    size = int(max(member_ids.max(initial=-1), attendance["user_id"].max(initial=-1),
+                   completions["member_id"].max(initial=-1))) + 1
+    attended, seen_earlier = _split_window(attendance["user_id"], attendance["day"], cutoff, previous_cutoff, size)
+    completed, completed_earlier = _split_window(completions["member_id"], completions["day"], cutoff, previous_cutoff, size)
+    active = (attended + completed) > 0
+    # Active in the window before last, but not since: the members most worth a call
+    earlier = (seen_earlier + completed_earlier) > 0
+
+    total = int(len(member_ids))
+    active_count = int(active[member_ids].sum())
+    at_risk = int((earlier[member_ids] & ~active[member_ids]).sum())
+
+    engagement_by_group: Dict[str, float] = {}
+    group_sizes: Dict[str, int] = {}
+    if len(memberships["group_id"]):
+        groups, group_index = np.unique(memberships["group_id"], return_inverse=True)
+        members_per_group = np.bincount(group_index)
+        active_per_group = np.bincount(group_index, weights=active[memberships["member_id"]].astype(np.float64))
+        for group_id, members_count, active_members in zip(groups, members_per_group, active_per_group):
+            name = snapshot["group_names"].get(int(group_id), f"Group {group_id}")
+            engagement_by_group[name] = round(float(active_members / members_count * 100), 1)
+            group_sizes[name] = int(members_count)
+
+    scores = attended[member_ids] + completed[member_ids]
+    most_active = member_ids[np.argsort(-scores, kind="stable")[:TOP_MEMBERS]]
+    member_activity = [
+        {
+            "member_id": int(member_id),
+            "name": snapshot["member_names"].get(int(member_id)),
+            "attendance_last_90_days": int(attended[member_id]),
+            "tasks_completed_last_90_days": int(completed[member_id]),
+        }
+        for member_id in most_active if attended[member_id] + completed[member_id]
+    ]
+
+    insights = {
+        "total_members_analyzed": total,
+        "engagement_score": round(active_count / total * 100, 1) if total else 0.0,
+        "active_members": active_count,
+        "inactive_members": total - active_count,
+        "engagement_by_group": engagement_by_group,
+        "member_activity": member_activity,
+    }
+    trend = attendance_trends(DailyCounts(attendance["day"], today))
+    insights["recommendations"] = recommendations(insights, group_sizes, at_risk, trend)
+    insights["generated_at"] = datetime.now()
+    return insights
+
+
+def recommendations(insights: Dict[str, Any], group_sizes: Dict[str, int], at_risk: int,
+                    trend: Dict[str, Any]) -> List[str]:
+    """Rule-based follow-ups derived from the computed metrics"""
+    advice: List[str] = []
+    total, inactive = insights["total_members_analyzed"], insights["inactive_members"]
+    if total and inactive / total >= 0.25:
+        advice.append(
+            f"{inactive} of {total} members ({inactive / total:.0%}) have not attended or completed a task "
+            f"in the last {ACTIVE_WINDOW_DAYS} days; plan personal follow-ups."
+        )
+    if at_risk:
+        advice.append(
+            f"{at_risk} members who were active {ACTIVE_WINDOW_DAYS}-{2 * ACTIVE_WINDOW_DAYS} days ago "
+            f"have not been seen since; reach out before they drift away."
+        )
+    low_groups = sorted(
+        (score, name) for name, score in insights["engagement_by_group"].items()
+        if score < LOW_GROUP_ENGAGEMENT and group_sizes.get(name, 0) >= MIN_GROUP_SIZE
+    )
+    for score, name in low_groups[:3]:
+        advice.append(f"Only {score}% of {name} members are active; check in with the group leader.")
+    if trend["direction"] == "declining":
+        advice.append(
+            f"Weekly attendance is declining by about {abs(trend['weekly_slope'])} check-ins per week "
+            f"over the last {TREND_WEEKS} weeks."
+        )
+    if not advice:
+        advice.append("Engagement is healthy across groups; keep the current follow-up rhythm.")
+    return advice
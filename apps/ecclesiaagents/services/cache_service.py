@@ -0,0 +1,115 @@
+"""
+🗄️ Cache Service - TTL + LRU cache for expensive agent results
+Purpose: Avoid recomputing insights (some of them LLM-backed) on every dashboard poll
+Concurrent misses for the same key share a single computation (single-flight)
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    In-process cache with a time-to-live per entry and least-recently-used eviction
+
+    Keys are tuples whose first element is a namespace (e.g. the insight type),
+    so callers can invalidate one namespace or everything at once.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Bumped on every invalidation so results computed from stale data are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) and refresh the entry's LRU position"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries when full"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, or compute it once
+        Callers that miss while a computation is already running wait for that result
+        """
+        found, value = self.get(key)
+        if found:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        # The computation runs in its own task, so a cancelled caller (e.g. a client disconnect)
+        # only stops waiting; the callers coalesced onto it still get the result
+        generation = self._generation
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done, generation))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future, generation: int) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:  # Also marks it retrieved when every caller has gone
+            return
+        if generation == self._generation:
+            self.set(key, task.result())
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Drop every entry, or only the entries whose key starts with namespace"""
+        self.invalidations += 1
+        self._generation += 1
+        # Computations already running may have read the old data; later callers start a fresh one
+        if namespace is None:
+            self._entries.clear()
+            self._inflight.clear()
+            return
+        for key in [key for key in self._entries if key[0] == namespace]:
+            del self._entries[key]
+        for key in [key for key in self._inflight if key[0] == namespace]:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters reported on /api/v1/agents/status"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
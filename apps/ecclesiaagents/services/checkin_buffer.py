@@ -0,0 +1,271 @@
+"""
+✅ Check-in Buffer - Absorbs the burst of attendance check-ins when a service starts
+Purpose: Hundreds of members check in within a couple of minutes; instead of one INSERT per tap,
+check-ins are de-duplicated in memory on (event, user) and written with batched upserts
+A flush runs when a batch fills up or after a short interval, whichever comes first
+"""
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_BACKPRESSURE_WAIT = 2.0
+# Keys already written are remembered so repeat taps are answered without touching the database;
+# the (eventId, userId) unique constraint still backs this up once a key ages out
+MAX_REMEMBERED_KEYS = 100000
+# A row that fails this many times when written on its own (e.g. a foreign key violation) is set aside
+MAX_ROW_ATTEMPTS = 5
+# Failed flushes back off exponentially from flush_interval up to this many seconds
+MAX_RETRY_DELAY = 30.0
+
+
+class CheckInBufferFull(Exception):
+    """The buffer stayed full for the whole backpressure wait (or is shutting down)"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CheckInBuffer:
+    """
+    In-process write buffer in front of DatabaseService.upsert_attendance_bulk
+
+    check_in() only queues the record; a background task flushes it. When max_pending check-ins
+    are waiting (e.g. the database is slow), callers wait up to backpressure_wait for room and
+    then get CheckInBufferFull. stop() flushes everything still pending before shutdown.
+    A failing batch is bisected until the row that breaks it is found; that row is retried on its
+    own, after the others, and quarantined (logged and dropped) after MAX_ROW_ATTEMPTS failures.
+    """
+
+    def __init__(self, database_service, on_flush: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_pending: int = DEFAULT_MAX_PENDING, backpressure_wait: float = DEFAULT_BACKPRESSURE_WAIT):
+        self.database_service = database_service
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.backpressure_wait = backpressure_wait
+        self._pending: "OrderedDict[Tuple[Hashable, Hashable], Dict[str, Any]]" = OrderedDict()
+        self._written: "OrderedDict[Tuple[Hashable, Hashable], None]" = OrderedDict()
+        # Rows that failed when written alone -> failures so far; they are written one at a time
+        self._suspects: Dict[Tuple[Hashable, Hashable], int] = {}
+        self._consecutive_failures = 0
+        self._batch_ready = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closed = False
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.failed_updates = 0  # Written batches whose on_flush raised; counters catch up on the next rebuild
+        self.quarantined = 0
+        self.last_flush_at: Optional[datetime] = None
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        """Start the background flusher (called from the FastAPI lifespan)"""
+        if self._flusher is None:
+            self._closed = False
+            self._flusher = asyncio.create_task(self._flush_loop(), name="checkin-flusher")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Refuse new check-ins, then keep flushing until nothing is pending (up to timeout)"""
+        self._closed = True
+        self._space_available.set()  # Wake waiting callers so they fail fast instead of hanging
+        if self._flusher is not None:
+            # Holding the lock means the flusher is not mid-write when it is cancelled
+            async with self._flush_lock:
+                self._flusher.cancel()
+                await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._pending:
+            logger.error("Check-in buffer shut down with %d check-ins not written", len(self._pending))
+
+    async def _drain(self) -> None:
+        while self._pending:
+            if not await self.flush():
+                await asyncio.sleep(self._retry_delay())
+
+    # ==================== INGESTION ====================
+
+    async def check_in(self, event_id: Hashable, user_id: Hashable,
+                       attended_at: Optional[datetime] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a check-in; returns (record, accepted)
+        accepted is False for a repeat of a check-in that is already pending or written
+        """
+        key = (event_id, user_id)
+        existing = self._pending.get(key)
+        if existing is not None or key in self._written:
+            self.duplicates += 1
+            return existing or {"event_id": event_id, "user_id": user_id, "attended_at": attended_at}, False
+
+        await self._wait_for_space()
+        if key in self._pending:  # Same member tapped twice while we waited
+            self.duplicates += 1
+            return self._pending[key], False
+        record = {
+            "event_id": event_id,
+            "user_id": user_id,
+            "attended_at": attended_at or datetime.now(),
+            "checked_in": True,
+        }
+        self._pending[key] = record
+        self.accepted += 1
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+        return record, True
+
+    async def _wait_for_space(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.backpressure_wait
+        while True:
+            if self._closed:
+                self.rejected += 1
+                raise CheckInBufferFull("Check-in is shutting down", retry_after=self.flush_interval)
+            if len(self._pending) < self.max_pending:
+                return
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.rejected += 1
+                raise CheckInBufferFull(
+                    f"{len(self._pending)} check-ins waiting to be written", retry_after=self.flush_interval
+                )
+            self._batch_ready.set()
+            self._space_available.clear()
+            try:
+                await asyncio.wait_for(self._space_available.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    # ==================== FLUSHING ====================
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            if not self._pending:
+                continue
+            # A failed flush keeps its rows pending and is retried after a back-off. Nothing may
+            # end this task: check-ins would then sit in the buffer until shutdown
+            try:
+                while self._pending:
+                    if not await self.flush():
+                        # Full batches would otherwise retry an unavailable database on every check-in
+                        await asyncio.sleep(self._retry_delay())
+                        break
+                    if len(self._pending) < self.batch_size:
+                        break
+            except Exception:
+                logger.exception("Check-in flusher error; retrying in %.1fs", self.flush_interval)
+
+    def _retry_delay(self) -> float:
+        return min(MAX_RETRY_DELAY, self.flush_interval * 2 ** max(0, self._consecutive_failures - 1))
+
+    async def flush(self) -> bool:
+        """
+        Write one batch; returns False when nothing could be written (the rows stay pending)
+        A failed write is retried at once with the first half of the batch, down to a single row,
+        so the rows ahead of a bad one are still written
+        """
+        async with self._flush_lock:
+            keys = self._next_batch()
+            if not keys:
+                return True
+            while True:
+                records = [self._pending[key] for key in keys]
+                try:
+                    # Rows already in the table (unique eventId/userId) are skipped, not duplicated
+                    inserted = await self.database_service.upsert_attendance_bulk(records)
+                    break
+                except Exception as e:
+                    # Rows only leave _pending once written, so nothing is lost here
+                    self.failed_flushes += 1
+                    if len(keys) > 1:
+                        logger.warning("Check-in flush of %d records failed (%s); retrying the first half", len(keys), e)
+                        keys = keys[:len(keys) // 2]
+                        continue
+                    self._consecutive_failures += 1
+                    self._row_failed(keys[0], e)
+                    return False
+
+            self._consecutive_failures = 0
+            for key in keys:
+                del self._pending[key]
+                self._suspects.pop(key, None)
+                self._written[key] = None
+            while len(self._written) > MAX_REMEMBERED_KEYS:
+                self._written.popitem(last=False)
+            self.batches += 1
+            self.written += len(inserted)
+            self.last_flush_at = datetime.now()
+            self._space_available.set()
+            # Separate from the write: a failing counter update must not make a written batch look unwritten
+            if inserted and self.on_flush is not None:
+                try:
+                    await self.on_flush(inserted)
+                except Exception:
+                    self.failed_updates += 1
+                    logger.exception("Updating counters for %d written check-ins failed", len(inserted))
+            return True
+
+    def _next_batch(self) -> List[Tuple[Hashable, Hashable]]:
+        """The oldest batch_size rows that have not failed alone; those only go one at a time, when nothing else is left"""
+        keys = list(itertools.islice((key for key in self._pending if key not in self._suspects), self.batch_size))
+        if not keys and self._pending:
+            keys = [next(iter(self._pending))]
+        return keys
+
+    def _row_failed(self, key: Tuple[Hashable, Hashable], error: Exception) -> None:
+        """A single row failed: move it behind the others, or set it aside once it has used up its attempts"""
+        attempts = self._suspects.get(key, 0) + 1
+        if attempts < MAX_ROW_ATTEMPTS:
+            self._suspects[key] = attempts
+            self._pending.move_to_end(key)
+            logger.warning("Check-in %s failed on its own (%d/%d): %s", key, attempts, MAX_ROW_ATTEMPTS, error)
+            return
+        record = self._pending.pop(key)
+        del self._suspects[key]
+        self.quarantined += 1
+        self._space_available.set()
+        logger.error("Check-in %s not written after %d attempts, dropping it: %s", record, attempts, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters reported on /api/v1/agents/status"""
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_flushes": self.failed_flushes,
+            "failed_updates": self.failed_updates,
+            "retrying_rows": len(self._suspects),
+            "quarantined": self.quarantined,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+        }
+
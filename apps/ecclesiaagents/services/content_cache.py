@@ -0,0 +1,265 @@
+"""
+🎨 Content Cache - Content-addressed cache for AI-generated flyers, posts and welcome materials
+Purpose: Identical generation requests (same normalized parameters, same source entity version)
+return the stored result instead of calling the LLM again
+Two tiers: an in-memory LRU (shared with identical in-flight requests) and JSON files on disk
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 512
+DEFAULT_MEMORY_TTL_SECONDS = 60 * 60
+DEFAULT_DISK_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+DEFAULT_PRUNE_INTERVAL_SECONDS = 60 * 60
+# Pruning for size stops below the cap so the next few writes do not trigger another full scan
+PRUNE_TARGET_RATIO = 0.9
+ORPHAN_TMP_SECONDS = 60 * 60  # Leftovers of writes interrupted by a crash
+
+
+def _normalize(value: Any) -> Any:
+    """Strip surrounding whitespace so cosmetic differences map to the same key"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class ContentCache:
+    """
+    Memory tier -> disk tier -> generate
+    get_or_generate() reports where the content came from: "memory", "disk", "coalesced"
+    (waited for an identical request already in flight) or "miss" (freshly generated)
+
+    Entries for edited or deleted entities are never read again, so the disk tier is pruned
+    by age and size at start(), every prune_interval seconds and whenever a write takes it
+    over max_disk_bytes (oldest entries go first)
+    """
+
+    def __init__(self, disk_dir: Optional[str], max_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 memory_ttl_seconds: float = DEFAULT_MEMORY_TTL_SECONDS,
+                 disk_ttl_seconds: float = DEFAULT_DISK_TTL_SECONDS,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                 prune_interval: float = DEFAULT_PRUNE_INTERVAL_SECONDS):
+        self.memory = TTLCache("content", max_entries=max_entries, ttl_seconds=memory_ttl_seconds)
+        self.disk_dir = disk_dir
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.prune_interval = prune_interval
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_pruned = 0
+        self.last_prune_at: Optional[float] = None
+        # None until the first prune has measured the directory; then kept up to date by writes
+        self._disk_bytes: Optional[int] = None
+        self._prune_lock = threading.Lock()
+        self._pruner: Optional[asyncio.Task] = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        """Prune the disk tier now and then periodically (called from the FastAPI lifespan)"""
+        if self.disk_dir and self._pruner is None:
+            self._pruner = asyncio.create_task(self._prune_loop(), name="content-cache-pruner")
+
+    async def stop(self) -> None:
+        if self._pruner is not None:
+            self._pruner.cancel()
+            await asyncio.gather(self._pruner, return_exceptions=True)
+            self._pruner = None
+
+    async def _prune_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.prune)
+            except Exception:
+                logger.exception("Content cache pruning failed")
+            await asyncio.sleep(self.prune_interval)
+
+    @staticmethod
+    def make_key(content_type: str, params: Dict[str, Any], source_version: Optional[str]) -> str:
+        """
+        SHA-256 over the content type, the normalized request and the source entity version
+        Editing the event/member changes its updated_at, so stale content is never served
+        """
+        material = json.dumps(
+            {"content_type": content_type, "params": _normalize(params), "source": source_version},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[Dict[str, Any]]]
+                              ) -> Tuple[Dict[str, Any], str]:
+        found, value = self.memory.get(key)
+        if found:
+            self.memory.hits += 1
+            return value, "memory"
+
+        source = "coalesced"
+
+        async def load() -> Dict[str, Any]:
+            nonlocal source
+            stored = await asyncio.to_thread(self._read_disk, key)
+            if stored is not None:
+                source = "disk"
+                self.disk_hits += 1
+                return stored
+            source = "miss"
+            generated = await generate()
+            await asyncio.to_thread(self._write_disk, key, generated)
+            return generated
+
+        value = await self.memory.get_or_compute(key, load)
+        return value, source
+
+    async def lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Check both tiers without generating; returns (None, "miss") when neither has the key"""
+        found, value = self.memory.get(key)
+        if found:
+            self.memory.hits += 1
+            return value, "memory"
+        stored = await asyncio.to_thread(self._read_disk, key)
+        if stored is not None:
+            self.disk_hits += 1
+            self.memory.set(key, stored)
+            return stored, "disk"
+        self.memory.misses += 1
+        return None, "miss"
+
+    async def store(self, key: str, value: Dict[str, Any]) -> None:
+        """Save content produced outside get_or_generate (e.g. assembled from a token stream)"""
+        self.memory.set(key, value)
+        await asyncio.to_thread(self._write_disk, key, value)
+
+    # ==================== DISK TIER ====================
+
+    def _path(self, key: str) -> str:
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Discarding unreadable content cache entry %s", path)
+            return None
+        if entry.get("stored_at", 0) + self.disk_ttl_seconds < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def _write_disk(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump({"stored_at": time.time(), "value": value}, handle, default=str)
+            os.replace(temporary, path)  # Atomic, so concurrent workers never read half a file
+            self.disk_writes += 1
+        except OSError:
+            logger.exception("Failed to write content cache entry %s", path)
+            return
+        if self._disk_bytes is not None:
+            try:
+                self._disk_bytes += os.path.getsize(path)
+            except OSError:
+                pass
+            if self._disk_bytes > self.max_disk_bytes:
+                self.prune()
+
+    def prune(self) -> Dict[str, int]:
+        """
+        Delete entries older than the disk TTL, then the oldest entries until the directory is
+        under PRUNE_TARGET_RATIO of max_disk_bytes; returns what was removed
+        Ages come from file modification times, so no entry has to be opened
+        """
+        if not self.disk_dir:
+            return {"expired": 0, "evicted": 0, "bytes_freed": 0}
+        with self._prune_lock:
+            now = time.time()
+            expired = evicted = freed = 0
+            entries = []  # (mtime, size, path) of live entries
+            for directory, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue  # Removed meanwhile by another worker
+                    if name.endswith(".tmp"):
+                        stale = stat.st_mtime + ORPHAN_TMP_SECONDS < now
+                    else:
+                        stale = stat.st_mtime + self.disk_ttl_seconds < now
+                    if not stale:
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                    elif self._remove(path):
+                        expired += 1
+                        freed += stat.st_size
+
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_disk_bytes:
+                target = self.max_disk_bytes * PRUNE_TARGET_RATIO
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    if self._remove(path):
+                        evicted += 1
+                        freed += size
+                    total -= size
+
+            self._disk_bytes = total
+            self.disk_pruned += expired + evicted
+            self.last_prune_at = now
+        if expired or evicted:
+            logger.info("Pruned %d expired and %d evicted content cache entries (%d bytes)", expired, evicted, freed)
+        return {"expired": expired, "evicted": evicted, "bytes_freed": freed}
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False  # Another worker pruned it first
+        except OSError:
+            logger.warning("Failed to remove content cache entry %s", path)
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.stats(),
+            "disk_enabled": bool(self.disk_dir),
+            "disk_hits": self.disk_hits,
+            "disk_writes": self.disk_writes,
+            "disk_bytes": self._disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes,
+            "disk_pruned": self.disk_pruned,
+        }
@@ -0,0 +1,270 @@
+"""
+🏊 Database Pool - Async connection pool with prepared hot queries and read-replica fallback
+Purpose: DatabaseService runs its queries through a DatabasePool instead of connecting per call.
+The pool keeps between pool_min_size and pool_max_size connections, makes a request wait at most
+acquire_timeout for one, prepares the hot queries once per connection, and reports saturation
+for /health. A replica pool falls back to the primary while the replica is down or saturated
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from services.database_settings import DatabaseSettings
+
+logger = logging.getLogger(__name__)
+
+# Queries on the hot path of the API (tables and columns as in the Prisma schema); each pooled
+# connection prepares one the first time it runs it and reuses the statement afterwards
+PREPARED_QUERIES: Dict[str, str] = {
+    "get_event_by_id": "SELECT * FROM events WHERE id = $1",
+    "get_member_tasks": (
+        'SELECT progress.*, task.title, task.description, task.type, task."order" '
+        "FROM onboarding_task_progress progress "
+        'JOIN member_onboarding onboarding ON onboarding.id = progress."onboardingId" '
+        'JOIN onboarding_tasks task ON task.id = progress."taskId" '
+        'WHERE onboarding."userId" = $1 ORDER BY task."order"'
+    ),
+    "complete_task": (
+        "UPDATE onboarding_task_progress SET status = 'COMPLETED', \"completedAt\" = now() "
+        "WHERE id = $1 RETURNING *"
+    ),
+}
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's acquire timeout"""
+
+
+class _PooledConnection:
+    """A driver connection plus the statements it has prepared"""
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.statements: Dict[str, Any] = {}
+
+
+class DatabasePool:
+    """
+    Bounded pool of asyncpg connections
+
+    A checked-in connection goes straight to the longest-waiting caller, so a burst cannot
+    starve anyone; callers still waiting after acquire_timeout get PoolTimeout, or, for a
+    pool with a fallback (the replica), the fallback pool's connection instead.
+    connect(url, statement_cache_size) opens one driver connection (asyncpg.connect by default).
+    """
+
+    def __init__(self, settings: DatabaseSettings, name: str = "primary",
+                 fallback: Optional["DatabasePool"] = None,
+                 connect: Optional[Callable[..., Awaitable[Any]]] = None):
+        self.settings = settings
+        self.name = name
+        self.fallback = fallback
+        self._connect = connect
+        self._idle: Deque[_PooledConnection] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._size = 0  # Connections open or being opened, idle or checked out
+        self._open = False
+        self.acquired = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+        self.prepared = 0
+        self.peak_in_use = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    @property
+    def in_use(self) -> int:
+        return self._size - len(self._idle)
+
+    # ==================== LIFECYCLE ====================
+
+    async def open(self) -> None:
+        """Open pool_min_size connections (called by the warm-up); a pool without a URL stays closed"""
+        if self._open:
+            return
+        if not self.settings.url:
+            logger.warning("No URL configured for the %s database pool; it stays closed", self.name)
+            return
+        if self._connect is None:
+            import asyncpg  # Driver of the real DatabaseService; the tests and benchmarks run without it
+
+            self._connect = lambda url, statement_cache_size: asyncpg.connect(
+                url, statement_cache_size=statement_cache_size, timeout=self.settings.acquire_timeout,
+            )
+        connections = await asyncio.gather(*(self._new_connection() for _ in range(self.settings.pool_min_size)))
+        self._idle.extend(connections)
+        self._size = len(connections)
+        self._open = True
+        logger.info("Opened %s database pool with %d connections", self.name, self._size)
+
+    async def close(self) -> None:
+        """Close idle connections now and checked-out ones as they come back"""
+        self._open = False
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolTimeout(f"{self.name} database pool closed"))
+        idle, self._idle = list(self._idle), deque()
+        self._size -= len(idle)
+        await asyncio.gather(*(pooled.connection.close() for pooled in idle), return_exceptions=True)
+
+    async def _new_connection(self) -> _PooledConnection:
+        return _PooledConnection(await self._connect(self.settings.url, self.settings.statement_cache_size))
+
+    # ==================== CHECKOUT ====================
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """A driver connection for ad-hoc queries and transactions"""
+        async with self._checked_out() as pooled:
+            yield pooled.connection
+
+    async def fetch_prepared(self, name: str, *args: Any) -> List[Any]:
+        """Run one of PREPARED_QUERIES and return every row"""
+        async with self._checked_out() as pooled:
+            return await (await self._statement(pooled, name)).fetch(*args)
+
+    async def fetchrow_prepared(self, name: str, *args: Any) -> Optional[Any]:
+        """Run one of PREPARED_QUERIES and return its first row (None if there is none)"""
+        async with self._checked_out() as pooled:
+            return await (await self._statement(pooled, name)).fetchrow(*args)
+
+    async def _statement(self, pooled: _PooledConnection, name: str) -> Any:
+        statement = pooled.statements.get(name)
+        if statement is None:
+            statement = await pooled.connection.prepare(PREPARED_QUERIES[name])
+            pooled.statements[name] = statement
+            self.prepared += 1
+        return statement
+
+    @asynccontextmanager
+    async def _checked_out(self) -> AsyncIterator[_PooledConnection]:
+        if not self._open:
+            if self.fallback is None:
+                raise RuntimeError(f"{self.name} database pool is not open")
+            self.fallbacks += 1
+            async with self.fallback._checked_out() as pooled:
+                yield pooled
+            return
+        try:
+            pooled = await self._checkout()
+        except PoolTimeout:
+            if self.fallback is None:
+                raise
+            self.fallbacks += 1
+            async with self.fallback._checked_out() as pooled:
+                yield pooled
+            return
+        try:
+            yield pooled
+        finally:
+            self._checkin(pooled)
+
+    async def _checkout(self) -> _PooledConnection:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.settings.acquire_timeout
+        while True:
+            pooled = self._take_idle()
+            if pooled is None and self._size < self.settings.pool_max_size:
+                self._size += 1
+                try:
+                    pooled = await self._new_connection()
+                except BaseException:
+                    self._size -= 1
+                    self._wake()
+                    raise
+            if pooled is None:
+                pooled = await self._wait(deadline)
+            if pooled is not None:
+                self.acquired += 1
+                self._wait_seconds += loop.time() - started
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+                return pooled
+
+    def _take_idle(self) -> Optional[_PooledConnection]:
+        while self._idle:
+            pooled = self._idle.pop()  # Most recently used first, so surplus connections stay idle
+            if not pooled.connection.is_closed():
+                return pooled
+            self._size -= 1
+        return None
+
+    async def _wait(self, deadline: float) -> Optional[_PooledConnection]:
+        """Wait for a checked-in connection; None means a slot opened up and the caller should retry"""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            # Not wait_for: it swallows a cancellation that arrives as the connection is handed over
+            done, _ = await asyncio.wait({waiter}, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.CancelledError:
+            if waiter.done() and waiter.exception() is None:
+                if waiter.result() is not None:
+                    self._checkin(waiter.result())
+                else:
+                    self._wake()
+            else:
+                self._discard(waiter)
+            raise
+        if not done:
+            self._discard(waiter)
+            self.timeouts += 1
+            raise PoolTimeout(
+                f"No {self.name} database connection free within {self.settings.acquire_timeout}s "
+                f"({self.settings.pool_max_size} in use)"
+            )
+        return waiter.result()
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _checkin(self, pooled: _PooledConnection) -> None:
+        if not self._open or pooled.connection.is_closed():
+            self._size -= 1
+            if not pooled.connection.is_closed():
+                asyncio.ensure_future(pooled.connection.close())
+            self._wake()
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(pooled)
+                return
+        self._idle.append(pooled)
+
+    def _wake(self) -> None:
+        """Let the next waiter retry (a connection was dropped, so it may open a new one)"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Reported on /health; in_use == max_size means the pool is saturated"""
+        return {
+            "open": self._open,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self.in_use,
+            "min_size": self.settings.pool_min_size,
+            "max_size": self.settings.pool_max_size,
+            "waiting": sum(1 for waiter in self._waiters if not waiter.done()),
+            "peak_in_use": self.peak_in_use,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "fallbacks": self.fallbacks,
+            "prepared_statements": self.prepared,
+            "avg_wait_ms": round(self._wait_seconds / self.acquired * 1000, 3) if self.acquired else 0.0,
+        }
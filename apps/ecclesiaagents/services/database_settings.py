@@ -0,0 +1,44 @@
+"""
+⚙️ Database Settings - Connection pool, statement cache and read-replica configuration
+Purpose: One place that reads the DATABASE_* / DB_POOL_* environment variables and hands
+DatabasePool (services/database_pool.py) everything it needs to open its connections
+"""
+import os
+from typing import Optional
+
+from pydantic import BaseModel, Field, validator
+
+
+class DatabaseSettings(BaseModel):
+    """Pool and routing configuration for DatabasePool"""
+    url: Optional[str] = Field(None, description="Primary database URL (DATABASE_URL)")
+    replica_url: Optional[str] = Field(None, description="Read-replica URL for GET endpoints (DATABASE_REPLICA_URL)")
+    pool_min_size: int = Field(2, ge=0, description="Connections opened at startup")
+    pool_max_size: int = Field(10, ge=1, description="Upper bound on concurrent connections")
+    acquire_timeout: float = Field(5.0, gt=0, description="Seconds to wait for a free connection")
+    statement_cache_size: int = Field(100, ge=0, description="Driver statement cache per connection (other queries)")
+
+    @validator("pool_max_size")
+    def validate_pool_size(cls, v, values):
+        if "pool_min_size" in values and v < values["pool_min_size"]:
+            raise ValueError("pool_max_size must be at least pool_min_size")
+        return v
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        """Build settings from the environment, keeping defaults for anything unset"""
+        env = {
+            "url": os.getenv("DATABASE_URL"),
+            "replica_url": os.getenv("DATABASE_REPLICA_URL"),
+            "pool_min_size": os.getenv("DB_POOL_MIN_SIZE"),
+            "pool_max_size": os.getenv("DB_POOL_MAX_SIZE"),
+            "acquire_timeout": os.getenv("DB_POOL_ACQUIRE_TIMEOUT"),
+            "statement_cache_size": os.getenv("DB_STATEMENT_CACHE_SIZE"),
+        }
+        return cls(**{key: value for key, value in env.items() if value is not None})
+
+    def for_replica(self) -> Optional["DatabaseSettings"]:
+        """Same pool settings pointed at the read replica (None when no replica is configured)"""
+        if not self.replica_url:
+            return None
+        return self.copy(update={"url": self.replica_url, "replica_url": None})
@@ -0,0 +1,24 @@
+"""
+🕰️ Datetimes - One time zone convention for the in-memory indexes and counters
+Purpose: Stored rows and datetime.now() are naive local times, but clients may send aware
+ISO timestamps (e.g. "2027-01-01T10:00:00Z"); Python refuses to compare the two kinds
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+
+def as_naive_local(value: Any) -> Optional[datetime]:
+    """
+    A datetime or ISO string as a naive datetime in the server's local time, comparable with datetime.now()
+    Aware values are converted to local time first; naive values are assumed to be local already
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        text = str(value)
+        if text.endswith(("Z", "z")):  # fromisoformat only accepts the suffix from Python 3.11
+            text = text[:-1] + "+00:00"
+        value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
@@ -0,0 +1,260 @@
+"""
+🗓️ Interval Index - Fast scheduling conflict detection for the Calendar Agent
+Purpose: Keep every scheduled event in interval trees keyed by location and by ministry group,
+so "what overlaps this time slot?" costs O(log n + k) instead of a scan over all events
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from models import EventStatus
+from services.datetimes import as_naive_local
+
+DEFAULT_EVENT_DURATION = timedelta(hours=1)  # Used for events stored without an end date
+
+
+class _Node:
+    __slots__ = ("start", "end", "key", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, start, end, key, value):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.value = value
+        self.priority = random.random()
+        self.max_end = end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+    def update(self) -> None:
+        self.max_end = self.end
+        if self.left is not None and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+class IntervalTree:
+    """
+    Treap ordered by (start, key) where every node also stores the latest end in its subtree
+    Intervals are half-open [start, end): back-to-back services do not conflict
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, start, end, key: Hashable, value: Any) -> None:
+        self._root = self._insert(self._root, _Node(start, end, key, value))
+        self._size += 1
+
+    def remove(self, start, key: Hashable) -> bool:
+        self._root, removed = self._remove(self._root, (start, key))
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlapping(self, start, end) -> List[Any]:
+        """Values of every interval that overlaps [start, end)"""
+        found: List[Any] = []
+        self._query(self._root, start, end, found)
+        return found
+
+    # ==================== TREAP INTERNALS ====================
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    def _insert(self, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if (new.start, new.key) < (node.start, node.key):
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return self._rotate_left(node)
+        node.update()
+        return node
+
+    def _remove(self, node: Optional[_Node], target: Tuple) -> Tuple[Optional[_Node], bool]:
+        if node is None:
+            return None, False
+        current = (node.start, node.key)
+        if target < current:
+            node.left, removed = self._remove(node.left, target)
+        elif target > current:
+            node.right, removed = self._remove(node.right, target)
+        else:
+            if node.left is None:
+                return node.right, True
+            if node.right is None:
+                return node.left, True
+            # Rotate the higher-priority child up, then keep removing below it
+            if node.left.priority > node.right.priority:
+                node = self._rotate_right(node)
+                node.right, removed = self._remove(node.right, target)
+            else:
+                node = self._rotate_left(node)
+                node.left, removed = self._remove(node.left, target)
+        node.update()
+        return node, removed
+
+    def _query(self, node: Optional[_Node], start, end, found: List[Any]) -> None:
+        # Nothing in this subtree ends after our start: prune it
+        if node is None or node.max_end <= start:
+            return
+        self._query(node.left, start, end, found)
+        # Everything to the right starts at or after node.start, so stop once that passes our end
+        if node.start < end:
+            if node.end > start:
+                found.append(node.value)
+            self._query(node.right, start, end, found)
+
+
+class EventConflictIndex:
+    """
+    Interval trees per location and per ministry group
+    Two events conflict when they overlap in time and share a location or an assigned group
+    """
+
+    def __init__(self, default_duration: timedelta = DEFAULT_EVENT_DURATION):
+        self.default_duration = default_duration
+        self._by_location: Dict[str, IntervalTree] = {}
+        self._by_group: Dict[Any, IntervalTree] = {}
+        self._events: Dict[Hashable, Dict[str, Any]] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @staticmethod
+    def _location_key(location: Optional[str]) -> Optional[str]:
+        return location.strip().lower() if location and location.strip() else None
+
+    @staticmethod
+    def _group_ids(event: Dict[str, Any]) -> List[Any]:
+        if event.get("group_ids"):
+            group_ids = event["group_ids"]
+        else:
+            group_ids = [group["id"] for group in event.get("groups") or [] if group.get("id") is not None]
+        return list(dict.fromkeys(group_ids))
+
+    def _interval(self, event: Dict[str, Any]) -> Tuple[datetime, datetime]:
+        """Naive local times: one tree never mixes aware and naive bounds, which do not compare"""
+        start = as_naive_local(event["start_date"])
+        end = as_naive_local(event.get("end_date")) or start + self.default_duration
+        return start, end
+
+    # ==================== WRITES ====================
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Index an event (re-adding an id replaces the previous entry)"""
+        event_id = event["id"]
+        self.remove(event_id)
+        if event.get("status") == EventStatus.CANCELLED:
+            return  # Cancelled events no longer occupy their slot
+        start, end = self._interval(event)
+        entry = {
+            "event_id": event_id,
+            "title": event.get("title"),
+            "start_date": start,
+            "end_date": end,
+            "location": event.get("location"),
+            "location_key": self._location_key(event.get("location")),
+            "group_ids": self._group_ids(event),
+        }
+        self._events[event_id] = entry
+        if entry["location_key"]:
+            self._by_location.setdefault(entry["location_key"], IntervalTree()).insert(start, end, event_id, entry)
+        for group_id in entry["group_ids"]:
+            self._by_group.setdefault(group_id, IntervalTree()).insert(start, end, event_id, entry)
+
+    def remove(self, event_id: Hashable) -> None:
+        entry = self._events.pop(event_id, None)
+        if entry is None:
+            return
+        if entry["location_key"]:
+            self._by_location[entry["location_key"]].remove(entry["start_date"], event_id)
+        for group_id in entry["group_ids"]:
+            self._by_group[group_id].remove(entry["start_date"], event_id)
+
+    async def load(self, database_service) -> None:
+        """(Re)build the index from every stored event"""
+        fresh = EventConflictIndex(self.default_duration)
+        async for event in database_service.stream_events():
+            fresh.add(event)
+        fresh.loaded_at = datetime.now()
+        self.__dict__.update(fresh.__dict__)
+
+    # ==================== QUERIES ====================
+
+    def find_conflicts(self, event: Dict[str, Any], exclude_id: Optional[Hashable] = None) -> List[Dict[str, Any]]:
+        """Indexed events that clash with a (proposed) event, with the reason for each clash"""
+        start, end = self._interval(event)
+        conflicts: Dict[Hashable, Dict[str, Any]] = {}
+
+        location_key = self._location_key(event.get("location"))
+        if location_key and location_key in self._by_location:
+            for entry in self._by_location[location_key].overlapping(start, end):
+                conflicts.setdefault(entry["event_id"], self._conflict(entry))["reasons"].append("location")
+
+        for group_id in self._group_ids(event):
+            if group_id not in self._by_group:
+                continue
+            for entry in self._by_group[group_id].overlapping(start, end):
+                reasons = conflicts.setdefault(entry["event_id"], self._conflict(entry))["reasons"]
+                reasons.append(f"group:{group_id}")
+
+        conflicts.pop(exclude_id, None)
+        return sorted(conflicts.values(), key=lambda conflict: conflict["start_date"])
+
+    @staticmethod
+    def _conflict(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "event_id": entry["event_id"],
+            "title": entry["title"],
+            "start_date": entry["start_date"],
+            "end_date": entry["end_date"],
+            "location": entry["location"],
+            "reasons": [],
+        }
+
+    def check_batch(self, proposals: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Conflicts for a series of proposed events (e.g. a year of weekly services)
+        Proposals are checked against stored events and against each other
+        """
+        proposals = list(proposals)
+        batch_index = EventConflictIndex(self.default_duration)
+        for position, proposal in enumerate(proposals):
+            batch_index.add({**proposal, "id": position})
+
+        results = []
+        for position, proposal in enumerate(proposals):
+            conflicts = self.find_conflicts(proposal)
+            for conflict in batch_index.find_conflicts(proposal, exclude_id=position):
+                conflict["proposal_index"] = conflict.pop("event_id")
+                conflicts.append(conflict)
+            results.append(conflicts)
+        return results
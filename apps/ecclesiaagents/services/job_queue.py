@@ -0,0 +1,372 @@
+"""
+⏳ Job Queue - Background execution of multi-agent workflows
+Purpose: Run slow agent chains (event creation, member onboarding) outside the HTTP request
+Jobs are persisted to the AgentTask table and run by per-agent workers, capped per agent
+so a burst of requests cannot overrun the LLM quota
+With a shared state backend, progress is visible from every API worker and the per-agent
+rate limits hold across all of them
+"""
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from models import JobStatus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AGENT_CONCURRENCY = 2
+MAX_TRACKED_JOBS = 1000
+# Progress snapshots in the shared state outlive the job by this long; after that the AgentTask row answers
+SHARED_JOB_TTL_SECONDS = 3600
+SHARED_POLL_INTERVAL = 0.5
+
+# AgentTask rows belong to the AIAgent of the job's agent (Prisma AgentType) ...
+AGENT_TYPES = {"calendar": "CALENDAR", "content": "DESIGN", "onboarding": "ONBOARDING", "insights": "INSIGHTS"}
+# ... and store the status as a Prisma TaskStatus
+TASK_STATUSES = {
+    JobStatus.PENDING: "PENDING",
+    JobStatus.IN_PROGRESS: "IN_PROGRESS",
+    JobStatus.COMPLETED: "COMPLETED",
+    JobStatus.FAILED: "FAILED",
+}
+JOB_STATUSES = {task_status: job_status for job_status, task_status in TASK_STATUSES.items()}
+
+
+class Job:
+    """One queued workflow plus its progress log (what the poll and SSE endpoints report)"""
+
+    def __init__(self, job_id: str, agent: str, job_type: str, description: str,
+                 run: Callable[["Job"], Awaitable[Optional[Dict[str, Any]]]]):
+        self.id = job_id
+        self.agent = agent
+        self.job_type = job_type
+        self.description = description
+        self.status = JobStatus.PENDING
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.progress: List[Dict[str, Any]] = []
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self._run = run
+        self._changed = asyncio.Event()
+        self.on_change: Optional[Callable[["Job"], None]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def report(self, event_type: str, message: str, **data: Any) -> None:
+        """Append a progress event and wake up anyone watching this job"""
+        self.progress.append({
+            "type": event_type,
+            "message": message,
+            "timestamp": datetime.now().isoformat(),
+            **data,
+        })
+        self._changed.set()
+        self._changed = asyncio.Event()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    async def watch(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every progress event (past and future) until the job finishes"""
+        seen = 0
+        while True:
+            while seen < len(self.progress):
+                yield self.progress[seen]
+                seen += 1
+            if self.finished:
+                return
+            await self._changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "job_type": self.job_type,
+            "description": self.description,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+        }
+
+
+class JobQueue:
+    """
+    One asyncio queue per agent, each drained by as many workers as the agent's limit
+
+    A worker only takes a job its agent can run now, so e.g. at most two Content Agent jobs
+    call Gemini at once while calendar jobs keep flowing, and a backlog of one agent never
+    ties up the workers of another. Queues and workers are created on an agent's first job.
+    agent_rates (jobs per minute) are token buckets in shared_state, so they cap every API
+    worker together; the per-agent limits only bound concurrency within this process.
+    """
+
+    def __init__(self, database_service, agent_limits: Optional[Dict[str, int]] = None,
+                 default_agent_limit: int = DEFAULT_AGENT_CONCURRENCY,
+                 shared_state=None, agent_rates: Optional[Dict[str, float]] = None):
+        self.database_service = database_service
+        self.agent_limits = agent_limits or {}
+        self.default_agent_limit = default_agent_limit
+        self.shared_state = shared_state
+        self.agent_rates = agent_rates or {}
+        self._unshared: "OrderedDict[str, Job]" = OrderedDict()
+        self._share_task: Optional[asyncio.Task] = None
+        self._queues: Dict[str, "asyncio.Queue[Job]"] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers: Dict[str, List[asyncio.Task]] = {}
+        self._agent_ids: Dict[str, asyncio.Future] = {}
+        self._running = False
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        """Start the workers of agents that already have jobs (called from the FastAPI startup hook)"""
+        if self._running:
+            return
+        self._running = True
+        for agent in self._queues:
+            self._spawn_workers(agent)
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Let queued jobs finish (up to timeout), then cancel the workers"""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Job queue shutdown timed out with %d jobs pending", self._queued())
+        self._running = False
+        workers = [worker for agent_workers in self._workers.values() for worker in agent_workers]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers = {}
+
+    def _queue(self, agent: str) -> "asyncio.Queue[Job]":
+        queue = self._queues.get(agent)
+        if queue is None:
+            queue = self._queues[agent] = asyncio.Queue()
+            if self._running:
+                self._spawn_workers(agent)
+        return queue
+
+    def _spawn_workers(self, agent: str) -> None:
+        if agent in self._workers:
+            return
+        limit = self.agent_limits.get(agent, self.default_agent_limit)
+        self._workers[agent] = [
+            asyncio.create_task(self._worker(agent), name=f"job-worker-{agent}-{index}")
+            for index in range(limit)
+        ]
+
+    def _queued(self) -> int:
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    # ==================== SUBMISSION & LOOKUP ====================
+
+    async def submit(self, agent: str, job_type: str, description: str,
+                     run: Callable[[Job], Awaitable[Optional[Dict[str, Any]]]]) -> Job:
+        """Persist a pending AgentTask row, then queue the workflow that fulfils it"""
+        record = await self.database_service.create_agent_task({
+            "agent_id": await self._agent_id(agent),
+            "type": job_type,
+            "description": description,
+            "status": TASK_STATUSES[JobStatus.PENDING],
+        })
+        job = Job(str(record["id"]), agent, job_type, description, run)
+        if self.shared_state is not None:
+            job.on_change = self._share
+        job.report("queued", description)
+        self._track(job)
+        await self._queue(agent).put(job)
+        return job
+
+    async def _agent_id(self, agent: str) -> str:
+        """Id of the agent's AIAgent row, registered on first use; looked up once per process"""
+        lookup = self._agent_ids.get(agent)
+        if lookup is None:
+            lookup = self._agent_ids[agent] = asyncio.ensure_future(self._find_or_create_agent(agent))
+        try:
+            return await asyncio.shield(lookup)
+        except Exception:
+            if self._agent_ids.get(agent) is lookup:
+                del self._agent_ids[agent]  # Let the next job retry
+            raise
+
+    async def _find_or_create_agent(self, agent: str) -> str:
+        agent_type = AGENT_TYPES.get(agent)
+        if agent_type is None:
+            raise ValueError(f"Unknown agent: {agent}")
+        record = await self.database_service.get_ai_agent_by_type(agent_type)
+        if record is None:
+            record = await self.database_service.create_ai_agent({
+                "name": f"{agent.capitalize()} Agent",
+                "type": agent_type,
+                "capabilities": [],
+            })
+        return record["id"]
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job state from memory, then the shared state (jobs run by another worker), then the AgentTask table"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.shared_state is not None:
+            snapshot = await self.shared_state.get(f"job:{job_id}")
+            if snapshot is not None:
+                return snapshot
+        record = await self.database_service.get_agent_task(job_id)
+        return self._from_record(record) if record is not None else None
+
+    @staticmethod
+    def _from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        """A job that is no longer tracked, rebuilt from its AgentTask row (with its agent)"""
+        agent_types = {agent_type: agent for agent, agent_type in AGENT_TYPES.items()}
+        status = JOB_STATUSES[record["status"]]
+        result = json.loads(record["result"]) if record.get("result") else None
+        error = result.get("error") if status == JobStatus.FAILED and isinstance(result, dict) else None
+        return {
+            "id": str(record["id"]),
+            "agent": agent_types.get(record["agent"]["type"], record["agent"]["type"].lower()),
+            "job_type": record["type"],
+            "description": record["description"],
+            "status": status,
+            "result": None if error is not None else result,
+            "error": error,
+            "progress": [],
+            "created_at": record["created_at"],
+            "started_at": None,
+            "completed_at": record.get("completed_at"),
+        }
+
+    async def watch(self, job_id: str) -> Optional[AsyncIterator[Dict[str, Any]]]:
+        """Progress stream for a job tracked in memory, or in the shared state if another worker runs it"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.watch()
+        if self.shared_state is not None:
+            snapshot = await self.shared_state.get(f"job:{job_id}")
+            if snapshot is not None:
+                return self._watch_shared(job_id, snapshot)
+        return None
+
+    async def _watch_shared(self, job_id: str, snapshot: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        seen = 0
+        while True:
+            for event in snapshot["progress"][seen:]:
+                yield event
+            seen = len(snapshot["progress"])
+            if snapshot["status"] in (JobStatus.COMPLETED.value, JobStatus.FAILED.value):
+                return
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+            snapshot = await self.shared_state.get(f"job:{job_id}")
+            if snapshot is None:  # Expired; the AgentTask row still has the outcome
+                return
+
+    def _share(self, job: Job) -> None:
+        """Queue a snapshot of the job for the shared state; one writer task coalesces bursts of reports"""
+        self._unshared[job.id] = job
+        if self._share_task is None or self._share_task.done():
+            self._share_task = asyncio.create_task(self._write_shared(), name="job-share")
+
+    async def _write_shared(self) -> None:
+        while self._unshared:
+            _, job = self._unshared.popitem(last=False)
+            try:
+                await self.shared_state.set(f"job:{job.id}", job.to_dict(), ttl=SHARED_JOB_TTL_SECONDS)
+            except Exception:
+                logger.exception("Failed to share state of job %s", job.id)
+
+    async def shared_stats(self) -> Dict[str, Any]:
+        """Completed/failed totals across every worker (this worker's own counts without a shared state)"""
+        if self.shared_state is None:
+            return {}
+        totals = await self.shared_state.counters("jobs:")
+        return {"completed": totals.get("jobs:completed", 0), "failed": totals.get("jobs:failed", 0)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": sum(len(workers) for workers in self._workers.values()),
+            "queued": self._queued(),
+            "queued_by_agent": {agent: queue.qsize() for agent, queue in self._queues.items()},
+            "running": sum(1 for job in self._jobs.values() if job.status == JobStatus.IN_PROGRESS),
+            "completed": self.jobs_completed,
+            "failed": self.jobs_failed,
+        }
+
+    def _track(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        # Forget the oldest finished jobs; they remain readable from the database
+        while len(self._jobs) > MAX_TRACKED_JOBS:
+            oldest_id = next((job_id for job_id, tracked in self._jobs.items() if tracked.finished), None)
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+    # ==================== EXECUTION ====================
+
+    async def _worker(self, agent: str) -> None:
+        queue = self._queues[agent]
+        while True:
+            job = await queue.get()
+            try:
+                await self._throttle(job)
+                await self._execute(job)
+            finally:
+                queue.task_done()
+
+    async def _throttle(self, job: Job) -> None:
+        """Wait for a token from the agent's shared bucket (burst: ten seconds' worth of jobs)"""
+        per_minute = self.agent_rates.get(job.agent)
+        if not per_minute or self.shared_state is None:
+            return
+        rate = per_minute / 60
+        while True:
+            wait = await self.shared_state.take_token(f"agent_rate:{job.agent}", rate, max(1.0, rate * 10))
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    async def _execute(self, job: Job) -> None:
+        job.status = JobStatus.IN_PROGRESS
+        job.started_at = datetime.now()
+        job.report("started", f"{job.agent} agent started {job.job_type}")
+        await self._persist(job)
+        try:
+            job.result = await job._run(job)
+            job.status = JobStatus.COMPLETED
+            self.jobs_completed += 1
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.job_type)
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            self.jobs_failed += 1
+        job.completed_at = datetime.now()
+        job.report(job.status.value, job.error or f"{job.job_type} finished", result=job.result)
+        await self._persist(job)
+        if self.shared_state is not None:
+            try:
+                await self.shared_state.incr(f"jobs:{job.status.value}")
+            except Exception:
+                logger.exception("Failed to count job %s", job.id)
+
+    async def _persist(self, job: Job) -> None:
+        """Mirror the job state into its AgentTask row; a failed write must not kill the worker"""
+        result = job.result if job.error is None else {"error": job.error}
+        try:
+            await self.database_service.update_agent_task(job.id, {
+                "status": TASK_STATUSES[job.status],
+                "result": json.dumps(result, default=str) if result is not None else None,
+                "completed_at": job.completed_at,
+            })
+        except Exception:
+            logger.exception("Failed to persist state of job %s", job.id)
@@ -0,0 +1,98 @@
+"""
+📥 Member Import - Parse and validate spreadsheet/JSON member imports in one pass
+Purpose: Migrating a congregation means thousands of members at once; rows are validated with the
+same rules as MemberCreateRequest and de-duplicated on email before anything touches the database
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from pydantic import ValidationError
+
+from models import MemberCreateRequest
+
+CSV_GROUP_SEPARATOR = ";"
+
+
+class MemberImportError(ValueError):
+    """The upload itself could not be read (as opposed to individual bad rows)"""
+
+
+def parse_member_rows(body: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """
+    Turn an upload into a list of raw rows
+    CSV needs a header row (name,email,phone,role,group_ids); group_ids are ';'-separated
+    Anything that is not CSV must be a JSON array of MemberCreateRequest objects
+    """
+    try:
+        text = body.decode("utf-8-sig")  # Spreadsheet exports often start with a BOM
+    except UnicodeDecodeError as e:
+        raise MemberImportError(f"Upload is not UTF-8 text (byte {e.start}); export the file as UTF-8")
+    if "csv" in (content_type or ""):
+        try:
+            return _csv_rows(text)
+        except csv.Error as e:
+            raise MemberImportError(f"Invalid CSV: {e}")
+
+    try:
+        rows = json.loads(text)
+    except ValueError as e:
+        raise MemberImportError(f"Invalid JSON: {e}")
+    if not isinstance(rows, list):
+        raise MemberImportError("JSON upload must be an array of members")
+    return rows
+
+
+def _csv_rows(text: str) -> List[Dict[str, Any]]:
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise MemberImportError("CSV upload has no header row")
+    rows = []
+    for record in reader:
+        row = {key.strip(): (value or "").strip() for key, value in record.items() if key}
+        groups = row.get("group_ids", "")
+        row["group_ids"] = [group.strip() for group in groups.split(CSV_GROUP_SEPARATOR) if group.strip()]
+        # Empty optional cells mean "not provided", not an empty string
+        rows.append({key: value for key, value in row.items() if value != ""})
+    return rows
+
+
+def validate_member_rows(rows: Iterable[Any], existing_emails: Set[str] = frozenset()
+                         ) -> Tuple[List[Tuple[int, MemberCreateRequest]], List[Dict[str, Any]], int]:
+    """
+    Validate every row and de-duplicate on (normalized) email
+    Returns (valid rows with their 1-based row numbers, per-row errors, duplicate count);
+    the first occurrence of an email in the upload wins
+    """
+    valid: List[Tuple[int, MemberCreateRequest]] = []
+    errors: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    duplicates = 0
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": row_number, "email": None, "error": "Row must be an object"})
+            continue
+        email = row.get("email")
+        try:
+            member = MemberCreateRequest.parse_obj(row)
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+            errors.append({"row": row_number, "email": email, "error": message})
+            continue
+        if member.email in seen or member.email in existing_emails:
+            duplicates += 1
+            errors.append({"row": row_number, "email": member.email, "error": "Duplicate email"})
+            continue
+        seen.add(member.email)
+        valid.append((row_number, member))
+    return valid, errors, duplicates
+
+
+def candidate_emails(rows: Iterable[Any]) -> Set[str]:
+    """Emails in an upload, normalized like validate_email, for one existence query up front"""
+    return {
+        str(row["email"]).lower()
+        for row in rows
+        if isinstance(row, dict) and row.get("email")
+    }
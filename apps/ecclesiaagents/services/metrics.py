@@ -0,0 +1,228 @@
+"""
+📈 Metrics - In-process latency histograms and request tracing
+Purpose: Show where request time goes (database, agents/LLM, or everything else such as
+validation and serialization) without depending on an external collector
+Exposed in Prometheus text format on /metrics
+"""
+import contextvars
+import functools
+import inspect
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds, from fast cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RECENT_SAMPLES = 1024  # Window used for the p50/p95/p99 estimates
+METRIC_PREFIX = "ecclesiaflow"
+
+# Spans recorded during the current request (None outside a request, e.g. in background jobs)
+_current_trace: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+class Histogram:
+    """Cumulative buckets for Prometheus plus a sliding window of samples for exact percentiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.recent: Deque[float] = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {quantile: 0.0 for quantile in QUANTILES}
+        return {
+            quantile: ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+            for quantile in QUANTILES
+        }
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class MetricsRegistry:
+    """Per-route request histograms, per-call span histograms and request counters"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str], Histogram] = {}
+        self.spans: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        self.requests.setdefault((method, route), Histogram()).observe(seconds)
+        key = (method, route, status_code)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def observe_span(self, kind: str, name: str, seconds: float) -> None:
+        self.spans.setdefault((kind, name), Histogram()).observe(seconds)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        self._render_histograms(
+            lines, f"{METRIC_PREFIX}_http_request_duration_seconds", "HTTP request latency by route",
+            {key: {"method": key[0], "route": key[1]} for key in self.requests}, self.requests,
+        )
+        self._render_histograms(
+            lines, f"{METRIC_PREFIX}_span_duration_seconds", "Database and agent call latency",
+            {key: {"kind": key[0], "name": key[1]} for key in self.spans}, self.spans,
+        )
+        name = f"{METRIC_PREFIX}_http_responses_total"
+        lines += [f"# HELP {name} HTTP responses by route and status code", f"# TYPE {name} counter"]
+        for (method, route, status_code), count in sorted(self.responses.items()):
+            lines.append(f"{name}{{{_labels(method=method, route=route, status=status_code)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: List[str], name: str, description: str,
+                           labels: Dict[Tuple[str, str], Dict[str, str]],
+                           histograms: Dict[Tuple[str, str], Histogram]) -> None:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        for key in sorted(histograms):
+            histogram, label_text = histograms[key], _labels(**labels[key])
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{label_text}}} {histogram.total:.6f}")
+            lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+
+        # Recent-window percentiles as separate gauges, so the histogram itself stays standard
+        quantile_name = f"{name.rsplit('_seconds', 1)[0]}_quantile_seconds"
+        lines += [f"# HELP {quantile_name} {description} (p50/p95/p99 over recent requests)",
+                  f"# TYPE {quantile_name} gauge"]
+        for key in sorted(histograms):
+            for quantile, value in histograms[key].quantiles().items():
+                lines.append(f'{quantile_name}{{{_labels(**labels[key])},quantile="{quantile}"}} {value:.6f}')
+
+
+metrics = MetricsRegistry()
+
+
+# ==================== TRACING ====================
+
+@contextmanager
+def start_trace() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the spans of one request (used by the HTTP middleware)"""
+    spans: List[Dict[str, Any]] = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    """Time a block: feeds the span histogram and, inside a request, the request's trace"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        metrics.observe_span(kind, name, duration)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append({"kind": kind, "name": name, "started": started, "duration_ms": round(duration * 1000, 2)})
+
+
+class TracedService:
+    """
+    Transparent proxy that wraps every coroutine / async-generator method of a service in a span
+    e.g. TracedService(DatabaseService(...), "db") records db.get_all_events, db.stream_events...
+    on_call(name, succeeded), if given, is awaited after every call (e.g. to count agent calls)
+    """
+
+    def __init__(self, target: Any, kind: str,
+                 on_call: Optional[Callable[[str, bool], Awaitable[None]]] = None):
+        self._target = target
+        self._kind = kind
+        self._on_call = on_call
+        self._wrapped: Dict[str, Any] = {}
+
+    def __getattr__(self, attribute: str) -> Any:
+        if attribute in self._wrapped:
+            return self._wrapped[attribute]
+        value = getattr(self._target, attribute)
+        if inspect.iscoroutinefunction(value):
+            wrapped = self._wrap_coroutine(attribute, value)
+        elif inspect.isasyncgenfunction(value):
+            wrapped = self._wrap_generator(attribute, value)
+        else:
+            return value
+        self._wrapped[attribute] = wrapped
+        return wrapped
+
+    def _wrap_coroutine(self, name: str, method):
+        @functools.wraps(method)
+        async def traced(*args, **kwargs):
+            succeeded = False
+            try:
+                with span(self._kind, name):
+                    result = await method(*args, **kwargs)
+                succeeded = True
+                return result
+            finally:
+                if self._on_call is not None:
+                    await self._on_call(name, succeeded)
+        return traced
+
+    def _wrap_generator(self, name: str, method):
+        @functools.wraps(method)
+        async def traced(*args, **kwargs):
+            # Spans the whole iteration, i.e. the full cursor read for stream_* methods
+            succeeded = False
+            try:
+                with span(self._kind, name):
+                    async for item in method(*args, **kwargs):
+                        yield item
+                succeeded = True
+            finally:
+                if self._on_call is not None:
+                    await self._on_call(name, succeeded)
+        return traced
+
+
+def span_breakdown(spans: List[Dict[str, Any]], request_started: float, total_ms: float) -> Dict[str, Any]:
+    """Summarize a request's spans for the slow-request log"""
+    by_kind: Dict[str, float] = {}
+    for recorded in spans:
+        by_kind[recorded["kind"]] = by_kind.get(recorded["kind"], 0.0) + recorded["duration_ms"]
+    return {
+        "total_ms": round(total_ms, 2),
+        "by_kind_ms": {kind: round(value, 2) for kind, value in by_kind.items()},
+        # Time outside db/agent calls: validation, serialization, framework overhead
+        # (agent spans can contain nested db spans, so this is a lower bound)
+        "other_ms": round(max(total_ms - sum(by_kind.values()), 0.0), 2),
+        "spans": [
+            {
+                "kind": recorded["kind"],
+                "name": recorded["name"],
+                "offset_ms": round((recorded["started"] - request_started) * 1000, 2),
+                "duration_ms": recorded["duration_ms"],
+            }
+            for recorded in spans
+        ],
+    }
@@ -0,0 +1,112 @@
+"""
+🔗 Relation Loader - DataLoader-style batching for nested relations in list responses
+Purpose: Fill EventResponse.groups, MemberResponse.tasks_*, GroupResponse.members, TaskResponse.member...
+for a whole page with one IN (...) query per relation, instead of one query per row
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+BatchLoadFunction = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class DataLoader:
+    """
+    Collects every key requested in the same event-loop tick and resolves them with one batch call
+    batch_load(keys) returns {key: value}; keys missing from the result resolve to None.
+    Results are cached for the loader's lifetime, so create one loader per request.
+    """
+
+    def __init__(self, batch_load: BatchLoadFunction):
+        self._batch_load = batch_load
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._pending: List[Hashable] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self.batches = 0
+
+    def load(self, key: Hashable) -> "asyncio.Future":
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._pending.append(key)
+        if len(self._pending) == 1:
+            # First key of this tick: dispatch once everything else queued in the tick is in
+            loop.call_soon(self._schedule_dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def _schedule_dispatch(self) -> None:
+        self._dispatch_task = asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        self.batches += 1
+        try:
+            values = await self._batch_load(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class Relation:
+    """
+    How one response field is filled
+    field: the response field; loader: name of the DataLoader that fetches it;
+    key: row column holding the related id; select: pick the field's value out of the loaded value
+    """
+
+    def __init__(self, field: str, loader: str, key: str = "id",
+                 select: Optional[Callable[[Any], Any]] = None, default: Any = None):
+        self.field = field
+        self.loader = loader
+        self.key = key
+        self.select = select
+        self.default = default
+
+    def value(self, loaded: Any) -> Any:
+        if loaded is None:
+            # Copy mutable defaults so rows never share one list
+            return list(self.default) if isinstance(self.default, list) else self.default
+        return self.select(loaded) if self.select else loaded
+
+
+def relation_columns(fields: Optional[Set[str]], relations: List[Relation]) -> Optional[Set[str]]:
+    """
+    Columns the list query must select for a ?fields= projection
+    A requested relation needs its key column (e.g. leader_id for leader) even when the client
+    did not ask for it; the response projection drops it again
+    """
+    if fields is None:
+        return None
+    return fields | {relation.key for relation in relations if relation.field in fields}
+
+
+async def attach_relations(rows: List[Dict[str, Any]], relations: List[Relation],
+                           loaders: Dict[str, DataLoader], fields: Optional[Set[str]] = None) -> None:
+    """
+    Fill the requested relation fields of every row in place
+    Only relations in the ?fields= projection (or all, without one) are loaded; relations that
+    share a loader share its batch, so e.g. tasks_completed and tasks_pending cost one query
+    """
+    wanted = [relation for relation in relations if fields is None or relation.field in fields]
+
+    async def fill(relation: Relation) -> None:
+        keys = [row.get(relation.key) for row in rows]
+        loader = loaders[relation.loader]
+        unique_keys = [key for key in dict.fromkeys(keys) if key is not None]
+        by_key = dict(zip(unique_keys, await loader.load_many(unique_keys)))
+        for row, key in zip(rows, keys):
+            row[relation.field] = relation.value(by_key.get(key))
+
+    await asyncio.gather(*(fill(relation) for relation in wanted))
@@ -0,0 +1,463 @@
+"""
+🔗 Shared State - State every API worker must agree on, behind a pluggable backend
+Purpose: With several uvicorn workers, anything kept in process memory (agent call counters,
+job progress, rate limits, the in-memory aggregates and caches) would differ per worker.
+Counters, short-lived values, token buckets and a change feed live here instead:
+    memory://                    single process (development, tests)
+    sqlite:///path/to/state.db   every worker on one host (WAL mode, no extra service)
+    redis://host:6379/0          workers on several hosts (needs the optional redis package)
+"""
+import abc
+import asyncio
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Change-feed messages older than this are pruned; a worker that falls further behind should rebuild
+CHANGE_RETENTION_SECONDS = 3600
+MAX_CHANGES = 100000
+
+Cursor = Any  # Opaque position in a change channel (an int for SQLite/memory, a stream id for Redis)
+
+
+# ==================== ENCODING ====================
+
+def _tag(value: Any) -> Any:
+    """Keep datetimes as datetimes across the round trip; the in-memory aggregates compare them"""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def encode(value: Any) -> str:
+    return json.dumps(value, default=_tag, separators=(",", ":"))
+
+
+def decode(text: Optional[str]) -> Any:
+    return None if text is None else json.loads(text, object_hook=_untag)
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated_at) * rate)
+
+
+# ==================== BACKENDS ====================
+
+class SharedState(abc.ABC):
+    """
+    Operations every backend provides (all safe to call concurrently from several processes)
+
+    incr/counters    monotonically increasing counters, read back by key prefix
+    get/set          JSON values with an optional time-to-live (e.g. job progress snapshots)
+    take_token       token-bucket rate limiting; returns 0 when allowed, else seconds to wait
+    publish/read     an append-only change channel that every worker reads from its own cursor
+    """
+
+    name = "base"
+    shared = True  # False when only this process can see the state, so there is nobody to publish to
+
+    @abc.abstractmethod
+    async def incr(self, key: str, amount: int = 1) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def counters(self, prefix: str) -> Dict[str, int]:
+        ...
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Any:
+        ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def take_token(self, key: str, rate: float, burst: float, tokens: float = 1.0) -> float:
+        ...
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, message: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def cursor(self, channel: str) -> Cursor:
+        """Position just after the newest message, i.e. where a new reader starts"""
+
+    @abc.abstractmethod
+    async def read(self, channel: str, after: Cursor, limit: int = 500) -> Tuple[List[Any], Cursor]:
+        """Messages published after the cursor (oldest first) and the cursor to continue from"""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemorySharedState(SharedState):
+    """One process only; the default when a single worker runs"""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+        self._values: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._channels: Dict[str, Deque[Tuple[int, Any]]] = {}
+        self._sequence = 0
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        self._counters[key] = self._counters.get(key, 0) + amount
+        return self._counters[key]
+
+    async def counters(self, prefix: str) -> Dict[str, int]:
+        return {key: value for key, value in self._counters.items() if key.startswith(prefix)}
+
+    async def get(self, key: str) -> Any:
+        expires_at, value = self._values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._values[key] = (time.time() + ttl if ttl else None, value)
+
+    async def take_token(self, key: str, rate: float, burst: float, tokens: float = 1.0) -> float:
+        now = time.monotonic()
+        available, updated_at = self._buckets.get(key, (burst, now))
+        available = _refill(available, updated_at, now, rate, burst)
+        wait = 0.0 if available >= tokens else (tokens - available) / rate
+        self._buckets[key] = (available - tokens if not wait else available, now)
+        return wait
+
+    async def publish(self, channel: str, message: Any) -> None:
+        self._sequence += 1
+        self._channels.setdefault(channel, deque(maxlen=MAX_CHANGES)).append((self._sequence, message))
+
+    async def cursor(self, channel: str) -> Cursor:
+        return self._sequence
+
+    async def read(self, channel: str, after: Cursor, limit: int = 500) -> Tuple[List[Any], Cursor]:
+        messages = [(sequence, message) for sequence, message in self._channels.get(channel, ()) if sequence > after]
+        messages = messages[:limit]
+        return [message for _, message in messages], messages[-1][0] if messages else after
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL);
+CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, message TEXT NOT NULL, created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_channel_seq ON changes (channel, seq);
+"""
+
+
+class SQLiteSharedState(SharedState):
+    """
+    Every worker on one host shares a SQLite file in WAL mode
+    Each process keeps one connection; calls run in a thread so the event loop never blocks on a lock
+    """
+
+    name = "sqlite"
+    PRUNE_EVERY = 1000  # Publishes between pruning old change-feed rows
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._published = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SQLITE_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, function: Callable[[sqlite3.Connection], Any]) -> Any:
+        def call():
+            with self._lock:
+                return function(self._connect())
+        return await asyncio.to_thread(call)
+
+    async def _transaction(self, function: Callable[[sqlite3.Connection], Any]) -> Any:
+        """BEGIN IMMEDIATE takes the write lock up front, so read-modify-write is atomic across processes"""
+        def run(connection: sqlite3.Connection):
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = function(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+        return await self._run(run)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        def run(connection):
+            connection.execute(
+                "INSERT INTO counters (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                (key, amount),
+            )
+            return connection.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+        return await self._transaction(run)
+
+    async def counters(self, prefix: str) -> Dict[str, int]:
+        # Range scan on the primary key instead of LIKE, which would treat _ and % in keys as wildcards
+        rows = await self._run(lambda connection: connection.execute(
+            "SELECT key, value FROM counters WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff"),
+        ).fetchall())
+        return dict(rows)
+
+    async def get(self, key: str) -> Any:
+        row = await self._run(lambda connection: connection.execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time()),
+        ).fetchone())
+        return decode(row[0]) if row else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        text = encode(value)
+        await self._run(lambda connection: connection.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, text, time.time() + ttl if ttl else None),
+        ))
+
+    async def take_token(self, key: str, rate: float, burst: float, tokens: float = 1.0) -> float:
+        def run(connection):
+            now = time.time()
+            row = connection.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            available = _refill(*row, now, rate, burst) if row else burst
+            wait = 0.0 if available >= tokens else (tokens - available) / rate
+            connection.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, available - tokens if not wait else available, now),
+            )
+            return wait
+        return await self._transaction(run)
+
+    async def publish(self, channel: str, message: Any) -> None:
+        text = encode(message)
+        self._published += 1
+        prune = self._published % self.PRUNE_EVERY == 0
+
+        def run(connection):
+            now = time.time()
+            connection.execute(
+                "INSERT INTO changes (channel, message, created_at) VALUES (?, ?, ?)", (channel, text, now),
+            )
+            if prune:
+                connection.execute("DELETE FROM changes WHERE created_at < ?", (now - CHANGE_RETENTION_SECONDS,))
+                connection.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        await self._run(run)
+
+    async def cursor(self, channel: str) -> Cursor:
+        row = await self._run(lambda connection: connection.execute(
+            "SELECT MAX(seq) FROM changes WHERE channel = ?", (channel,),
+        ).fetchone())
+        return row[0] or 0
+
+    async def read(self, channel: str, after: Cursor, limit: int = 500) -> Tuple[List[Any], Cursor]:
+        rows = await self._run(lambda connection: connection.execute(
+            "SELECT seq, message FROM changes WHERE channel = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (channel, after, limit),
+        ).fetchall())
+        return [decode(message) for _, message in rows], rows[-1][0] if rows else after
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._run(lambda connection: connection.close())
+            self._connection = None
+
+
+# Atomic token bucket; uses the Redis clock so workers on different hosts agree on the refill
+_REDIS_TAKE_TOKEN = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate, burst, wanted = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= wanted then tokens = tokens - wanted else wait = (wanted - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisSharedState(SharedState):
+    """Workers on several hosts; change channels are Redis streams capped at MAX_CHANGES entries"""
+
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str = "ecclesiaflow"):
+        import redis.asyncio as redis  # Optional dependency, only needed for redis:// URLs
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._namespace = namespace
+        self._take_token = self._redis.register_script(_REDIS_TAKE_TOKEN)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self._namespace,) + parts)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self._redis.hincrby(self._key("counters"), key, amount)
+
+    async def counters(self, prefix: str) -> Dict[str, int]:
+        values = await self._redis.hgetall(self._key("counters"))
+        return {key: int(value) for key, value in values.items() if key.startswith(prefix)}
+
+    async def get(self, key: str) -> Any:
+        return decode(await self._redis.get(self._key("kv", key)))
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._redis.set(self._key("kv", key), encode(value), px=math.ceil(ttl * 1000) if ttl else None)
+
+    async def take_token(self, key: str, rate: float, burst: float, tokens: float = 1.0) -> float:
+        return float(await self._take_token(keys=[self._key("bucket", key)], args=[rate, burst, tokens]))
+
+    async def publish(self, channel: str, message: Any) -> None:
+        await self._redis.xadd(self._key("stream", channel), {"m": encode(message)}, maxlen=MAX_CHANGES, approximate=True)
+
+    async def cursor(self, channel: str) -> Cursor:
+        newest = await self._redis.xrevrange(self._key("stream", channel), count=1)
+        return newest[0][0] if newest else "0-0"
+
+    async def read(self, channel: str, after: Cursor, limit: int = 500) -> Tuple[List[Any], Cursor]:
+        entries = await self._redis.xrange(self._key("stream", channel), min=f"({after}", count=limit)
+        return [decode(fields["m"]) for _, fields in entries], entries[-1][0] if entries else after
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+def shared_state_from_url(url: str) -> SharedState:
+    """Pick the backend from SHARED_STATE_URL (see module docstring)"""
+    if url.startswith("memory://"):
+        return MemorySharedState()
+    if url.startswith("sqlite:///"):
+        return SQLiteSharedState(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisSharedState(url)
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
+
+
+# ==================== CHANGE FEED ====================
+
+class ChangeFeed:
+    """
+    Keeps each worker's in-memory state (aggregates, indexes, caches) in step with the others
+
+    A worker applies its own writes locally and publishes them; every other worker polls the
+    channel and passes each change to apply(kind, payload). Over a backend that is not shared
+    (memory) the worker is alone, so the feed neither publishes nor polls.
+    """
+
+    def __init__(self, state: SharedState, apply: Callable[[str, Any], Awaitable[None]],
+                 channel: str = "changes", poll_interval: float = 0.5, batch_size: int = 500):
+        self.state = state
+        self.apply = apply
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.worker_id = uuid.uuid4().hex
+        self._cursor: Cursor = None
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.applied = 0
+        self.failed = 0
+
+    async def start(self, ready: Optional[Callable[[], Awaitable[Any]]] = None) -> None:
+        """
+        Remember the current position, then start applying changes once ready() returns
+        (i.e. after this worker has loaded its own copy of the data)
+        """
+        if self._task is None and self.state.shared:
+            self._cursor = await self.state.cursor(self.channel)
+            self._task = asyncio.create_task(self._poll(ready), name="change-feed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def publish(self, kind: str, payload: Any) -> None:
+        """Tell the other workers about a change this worker has already applied"""
+        if not self.state.shared:
+            return
+        try:
+            await self.state.publish(self.channel, {"origin": self.worker_id, "kind": kind, "payload": payload})
+            self.published += 1
+        except Exception:
+            # The write itself succeeded; other workers catch up on their next rebuild
+            logger.exception("Failed to publish %s change", kind)
+
+    async def _poll(self, ready: Optional[Callable[[], Awaitable[Any]]]) -> None:
+        if ready is not None:
+            await ready()
+        while True:
+            try:
+                messages, self._cursor = await self.state.read(self.channel, self._cursor, self.batch_size)
+            except Exception:
+                logger.exception("Failed to read the change feed")
+                messages = []
+            for message in messages:
+                if message["origin"] == self.worker_id:
+                    continue
+                try:
+                    await self.apply(message["kind"], message["payload"])
+                    self.applied += 1
+                except Exception:
+                    self.failed += 1
+                    logger.exception("Failed to apply %s change", message["kind"])
+            if len(messages) < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.state.name,
+            "active": self.state.shared,
+            "worker_id": self.worker_id,
+            "published": self.published,
+            "applied": self.applied,
+            "failed": self.failed,
+        }
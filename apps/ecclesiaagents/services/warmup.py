@@ -0,0 +1,145 @@
+"""
+🔥 Warm-up - Lazy services and background startup for fast, safe worker restarts
+Purpose: A new worker should answer liveness probes as soon as it is imported, and only take
+traffic (readiness) once its connection pools, caches and indexes are loaded. The agents and
+their LLM clients are built on first use, or ahead of time by an optional warm-up step
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.dag_executor import DagExecutor, WorkflowStep, WorkflowStepError
+
+logger = logging.getLogger(__name__)
+
+
+class LazyService:
+    """
+    Proxy that builds its target on first attribute access
+    e.g. LazyService(lambda: AgentManager(db), "agents") imports and constructs nothing until a
+    request (or load() from a warm-up step) needs an agent
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str):
+        self._factory = factory
+        self._name = name
+        self._target: Any = None
+        # load() may run in a worker thread while a request touches the proxy on the event loop
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def load(self) -> Any:
+        """Build the target now (idempotent); returns it"""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    started = time.perf_counter()
+                    target = self._factory()
+                    self.load_seconds = round(time.perf_counter() - started, 3)
+                    logger.info("Loaded %s in %.3fs", self._name, self.load_seconds)
+                    self._target = target
+        return self._target
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.load(), attribute)
+
+
+class StartupWarmUp:
+    """
+    Runs the startup steps as a DagExecutor workflow in a background task
+
+    The worker is ready once every required step has completed; optional steps (e.g. building
+    the agents) may fail or still be running. A failed required step leaves the worker live but
+    not ready, so the orchestrator restarts or stops routing to it instead of serving bad data.
+    """
+
+    def __init__(self, steps: List[WorkflowStep], step_timeout: float):
+        self.executor = DagExecutor(steps, default_timeout=step_timeout)
+        self.required = [name for name, step in self.executor.steps.items() if step.required]
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.ready_at: Optional[datetime] = None
+        self.duration_ms: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self) -> None:
+        """Start warming up in the background (called from the FastAPI lifespan)"""
+        if self._task is None:
+            self.state = "running"
+            self.started_at = datetime.now()
+            self._task = asyncio.create_task(self._run(), name="startup-warmup")
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the worker is ready or the warm-up has ended; returns whether the worker is ready"""
+        if self._task is not None and not self.ready:
+            # Optional steps (the agents) may still be running after the worker is ready
+            ready = asyncio.ensure_future(self._ready.wait())
+            await asyncio.wait({self._task, ready}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            ready.cancel()
+        return self.ready
+
+    async def until_ready(self) -> None:
+        """Block until the required steps are done (forever if warm-up fails)"""
+        await self._ready.wait()
+
+    async def stop(self) -> None:
+        """Cancel a warm-up still in progress (shutdown before the worker became ready)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            if not self.ready:  # A ready worker only loses its optional steps
+                self.state = "cancelled"
+
+    async def _run(self) -> None:
+        def on_step(name: str, timing: Dict[str, Any]) -> None:
+            self.steps[name] = timing
+            if timing["status"] != "completed":
+                logger.warning("Warm-up step %s %s: %s", name, timing["status"], timing.get("error"))
+            # Ready as soon as the required steps are done; optional ones may still be running
+            if self.state == "running" and all(
+                self.steps.get(step, {}).get("status") == "completed" for step in self.required
+            ):
+                self._mark_ready()
+
+        try:
+            await self.executor.run(on_step=on_step)
+        except WorkflowStepError as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error("Warm-up failed; worker will not report ready: %s", e)
+            return
+        if self.state == "running":  # No required steps at all
+            self._mark_ready()
+
+    def _mark_ready(self) -> None:
+        self.state = "ready"
+        self._ready.set()
+        self.ready_at = datetime.now()
+        self.duration_ms = round((self.ready_at - self.started_at).total_seconds() * 1000, 2)
+        logger.info("Worker ready after %.0f ms", self.duration_ms)
+
+    def status(self) -> Dict[str, Any]:
+        """Reported on /health/ready"""
+        return {
+            "state": self.state,
+            "required_steps": self.required,
+            "steps": self.steps,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "ready_at": self.ready_at.isoformat() if self.ready_at else None,
+            "duration_ms": self.duration_ms,
+        }
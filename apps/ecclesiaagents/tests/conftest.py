@@ -0,0 +1,29 @@
+"""
+🧪 Test setup - Run from apps/ecclesiaagents with `python -m pytest tests`
+The in-memory DatabaseService and AgentManager in tests/fakes.py stand in for Postgres
+and the LLM agents, so API tests exercise the real app without credentials
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep generated-content files out of the working tree
+os.environ.setdefault("CONTENT_CACHE_DIR", tempfile.mkdtemp(prefix="ecclesia-content-cache-"))
+
+from tests.fakes import install_fakes  # noqa: E402
+
+install_fakes(scale=0.01)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app, started and shut down once for the whole session"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,435 @@
+"""
+🧪 Fakes - In-memory DatabaseService and AgentManager
+Purpose: Let the tests and the benchmark suite run the real FastAPI app without Postgres or LLM
+credentials. The fakes follow the DatabaseService contract main.py relies on (pinned by
+tests/test_database_contract.py), so results measure our own code rather than the network
+Latency of the database and of the agents can be simulated with fixed per-call delays
+"""
+import asyncio
+import operator
+import random
+import sys
+import types
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from services.datetimes import as_naive_local
+
+# Shape of the seeded data; scale it with install_fakes(scale=...)
+DEFAULT_SEED = {"events": 2000, "members": 5000, "groups": 40, "tasks": 10000, "attendance": 50000}
+GROUP_TYPES = ("worship", "ushers", "youth", "choir", "outreach")
+# Values of the Prisma TaskStatus enum the agent_tasks.status column accepts
+TASK_STATUSES = ("PENDING", "IN_PROGRESS", "COMPLETED", "SKIPPED", "FAILED")
+# Range filters the DatabaseService pushes into WHERE: filter -> (column, comparison)
+RANGE_FILTERS = {
+    "start_from": ("start_date", operator.ge),
+    "start_to": ("start_date", operator.lt),
+    "joined_from": ("created_at", operator.ge),
+    "joined_to": ("created_at", operator.lt),
+    "due_from": ("due_date", operator.ge),
+    "due_to": ("due_date", operator.lt),
+    "updated_since": ("updated_at", operator.gt),
+    "attended_from": ("attended_at", operator.ge),
+}
+
+
+def _seed(scale: float, seed: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Deterministic rows shaped like the DatabaseService dicts used by main.py"""
+    rng = random.Random(seed)
+    counts = {table: max(1, int(count * scale)) for table, count in DEFAULT_SEED.items()}
+    epoch = datetime.now().replace(microsecond=0) - timedelta(days=365)
+
+    groups = [
+        {
+            "id": group_id, "name": f"Group {group_id}", "description": None,
+            "group_type": GROUP_TYPES[group_id % len(GROUP_TYPES)],
+            "leader_id": rng.randint(1, counts["members"]), "created_at": epoch, "updated_at": epoch,
+        }
+        for group_id in range(1, counts["groups"] + 1)
+    ]
+    events = []
+    for event_id in range(1, counts["events"] + 1):
+        # Spread over two years so about half the events are upcoming
+        start = epoch + timedelta(hours=rng.randint(0, 2 * 365 * 24))
+        events.append({
+            "id": event_id, "title": f"Service {event_id}", "description": "Weekly gathering",
+            "start_date": start, "end_date": start + timedelta(hours=2),
+            "location": f"Hall {rng.randint(1, 8)}", "status": rng.choice(("draft", "published", "completed")),
+            "max_attendees": 300, "created_at": epoch, "updated_at": epoch,
+            "group_ids": rng.sample(range(1, counts["groups"] + 1), k=min(2, counts["groups"])),
+        })
+    members = [
+        {
+            "id": member_id, "name": f"Member {member_id}", "email": f"member{member_id}@example.org",
+            "phone": None, "role": "member", "created_at": epoch + timedelta(days=rng.randint(0, 365)),
+            "updated_at": epoch, "group_ids": [rng.randint(1, counts["groups"])],
+        }
+        for member_id in range(1, counts["members"] + 1)
+    ]
+    tasks = [
+        {
+            "id": task_id, "title": f"Task {task_id}", "description": None,
+            "status": rng.choice(("pending", "in_progress", "completed")), "priority": "medium",
+            "due_date": epoch + timedelta(days=rng.randint(0, 500)), "completed_at": None,
+            "created_at": epoch, "updated_at": epoch, "member_id": rng.randint(1, counts["members"]),
+        }
+        for task_id in range(1, counts["tasks"] + 1)
+    ]
+    attendance = []
+    for record_id in range(1, counts["attendance"] + 1):
+        event = events[rng.randrange(len(events))]
+        attendance.append({
+            "id": record_id, "event_id": event["id"], "user_id": rng.randint(1, counts["members"]),
+            "attended_at": event["start_date"], "checked_in": True,
+        })
+    return {"events": events, "members": members, "groups": groups, "tasks": tasks, "attendance": attendance}
+
+
+class InMemoryDatabaseService:
+    """Implements every DatabaseService method main.py and the services call, over seeded lists"""
+
+    # Set by install_fakes(); shared so main.py's primary and replica instances see the same data
+    seed_scale = 0.1
+    latency = 0.0
+    _tables: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    _by_id: Optional[Dict[str, Dict[int, Dict[str, Any]]]] = None
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        if InMemoryDatabaseService._tables is None:
+            InMemoryDatabaseService._tables = _seed(self.seed_scale, seed=42)
+            InMemoryDatabaseService._by_id = {
+                table: {row["id"]: row for row in rows} for table, rows in InMemoryDatabaseService._tables.items()
+            }
+        self.tables = InMemoryDatabaseService._tables
+        self.by_id = InMemoryDatabaseService._by_id
+        self.ai_agents: Dict[str, Dict[str, Any]] = {}
+        self.agent_tasks: Dict[str, Dict[str, Any]] = {}
+        self.queries = 0
+
+    async def _query(self) -> None:
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+
+    def _group_ids(self, row: Dict[str, Any]) -> Iterable[int]:
+        """Groups of a row; tasks belong to the groups of their member"""
+        if "group_ids" in row:
+            return row["group_ids"]
+        member = self.by_id["members"].get(row.get("member_id"))
+        return member["group_ids"] if member else ()
+
+    def _matches(self, row: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == "group_id":
+                if value not in self._group_ids(row):
+                    return False
+            elif column in RANGE_FILTERS:
+                name, compare = RANGE_FILTERS[column]
+                if row.get(name) is None or not compare(row[name], as_naive_local(value)):
+                    return False
+            elif column in row and row[column] != getattr(value, "value", value):
+                return False
+        return True
+
+    async def _page(self, table: str, after: Optional[int] = None, limit: Optional[int] = None,
+                    fields=None, include_relations: bool = True, **filters) -> List[Dict[str, Any]]:
+        await self._query()
+        page = []
+        for row in self.tables[table]:
+            if (after is None or row["id"] > after) and self._matches(row, filters):
+                # Like the real query, a projection selects only the requested columns
+                page.append({key: value for key, value in row.items() if fields is None or key in fields})
+                if limit and len(page) == limit:
+                    break
+        return page
+
+    async def _stream(self, table: str, **filters) -> AsyncIterator[Dict[str, Any]]:
+        await self._query()
+        for row in self.tables[table]:
+            if self._matches(row, filters):
+                yield dict(row)
+
+    # ==================== READS ====================
+
+    async def get_all_events(self, after: Optional[int] = None, limit: Optional[int] = None, fields=None,
+                             include_relations: bool = True, start_from: Optional[datetime] = None,
+                             start_to: Optional[datetime] = None, status=None, group_id: Optional[int] = None):
+        return await self._page("events", after, limit, fields, include_relations, start_from=start_from,
+                                start_to=start_to, status=status, group_id=group_id)
+
+    async def get_all_members(self, after: Optional[int] = None, limit: Optional[int] = None, fields=None,
+                              include_relations: bool = True, role=None, group_id: Optional[int] = None,
+                              joined_from: Optional[datetime] = None, joined_to: Optional[datetime] = None):
+        return await self._page("members", after, limit, fields, include_relations, role=role, group_id=group_id,
+                                joined_from=joined_from, joined_to=joined_to)
+
+    async def get_all_groups(self, after: Optional[int] = None, limit: Optional[int] = None, fields=None,
+                             include_relations: bool = True, group_type=None, leader_id: Optional[int] = None):
+        return await self._page("groups", after, limit, fields, include_relations, group_type=group_type,
+                                leader_id=leader_id)
+
+    async def get_all_tasks(self, after: Optional[int] = None, limit: Optional[int] = None, fields=None,
+                            include_relations: bool = True, status=None, member_id: Optional[int] = None,
+                            group_id: Optional[int] = None, due_from: Optional[datetime] = None,
+                            due_to: Optional[datetime] = None):
+        return await self._page("tasks", after, limit, fields, include_relations, status=status, member_id=member_id,
+                                group_id=group_id, due_from=due_from, due_to=due_to)
+
+    async def get_event_by_id(self, event_id: int):
+        await self._query()
+        row = self.by_id["events"].get(event_id)
+        return dict(row) if row else None
+
+    async def get_member_by_id(self, member_id: int):
+        await self._query()
+        row = self.by_id["members"].get(member_id)
+        return dict(row) if row else None
+
+    async def get_member_tasks(self, member_id: int):
+        await self._query()
+        return [dict(task) for task in self.tables["tasks"] if task["member_id"] == member_id]
+
+    async def get_existing_emails(self, emails: Iterable[str]):
+        await self._query()
+        wanted = set(emails)
+        return [member["email"] for member in self.tables["members"] if member["email"] in wanted]
+
+    def stream_events(self, updated_since: Optional[datetime] = None):
+        return self._stream("events", updated_since=updated_since)
+
+    def stream_members(self, updated_since: Optional[datetime] = None):
+        return self._stream("members", updated_since=updated_since)
+
+    def stream_tasks(self, updated_since: Optional[datetime] = None):
+        return self._stream("tasks", updated_since=updated_since)
+
+    def stream_attendance(self, event_id: Optional[int] = None, attended_from: Optional[datetime] = None):
+        return self._stream("attendance", event_id=event_id, attended_from=attended_from)
+
+    # ==================== RELATION BATCHES ====================
+
+    def _group_refs(self, group_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Inner join semantics: ids of groups that do not exist (e.g. from an import) are dropped"""
+        groups = self.by_id["groups"]
+        return [{"id": group_id, "name": groups[group_id]["name"]} for group_id in group_ids if group_id in groups]
+
+    async def get_groups_for_events(self, event_ids):
+        await self._query()
+        return {
+            event_id: self._group_refs(self.by_id["events"][event_id]["group_ids"])
+            for event_id in event_ids if event_id in self.by_id["events"]
+        }
+
+    async def count_attendance_by_event(self, event_ids):
+        await self._query()
+        wanted, counts = set(event_ids), {}
+        for record in self.tables["attendance"]:
+            if record["event_id"] in wanted:
+                counts[record["event_id"]] = counts.get(record["event_id"], 0) + 1
+        return counts
+
+    async def get_groups_for_members(self, member_ids):
+        await self._query()
+        return {
+            member_id: self._group_refs(self.by_id["members"][member_id]["group_ids"])
+            for member_id in member_ids if member_id in self.by_id["members"]
+        }
+
+    async def count_tasks_by_member(self, member_ids):
+        await self._query()
+        wanted, counts = set(member_ids), {}
+        for task in self.tables["tasks"]:
+            if task["member_id"] in wanted:
+                bucket = counts.setdefault(task["member_id"], {"completed": 0, "pending": 0})
+                bucket["completed" if task["status"] == "completed" else "pending"] += 1
+        return counts
+
+    async def get_members_by_ids(self, member_ids):
+        await self._query()
+        members = self.by_id["members"]
+        return {
+            member_id: {"id": member_id, "name": members[member_id]["name"], "email": members[member_id]["email"]}
+            for member_id in member_ids if member_id in members
+        }
+
+    async def get_members_for_groups(self, group_ids):
+        await self._query()
+        wanted, found = set(group_ids), {}
+        for member in self.tables["members"]:
+            for group_id in member["group_ids"]:
+                if group_id in wanted:
+                    found.setdefault(group_id, []).append({"id": member["id"], "name": member["name"]})
+        return found
+
+    async def count_members_by_group(self, group_ids):
+        members = await self.get_members_for_groups(group_ids)
+        return {group_id: len(rows) for group_id, rows in members.items()}
+
+    # ==================== WRITES ====================
+
+    def _insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now()
+        row = {**row, "id": len(self.tables[table]) + 1, "created_at": now, "updated_at": now}
+        self.tables[table].append(row)
+        self.by_id[table][row["id"]] = row
+        return dict(row)
+
+    async def create_event(self, event_data: Dict[str, Any]):
+        await self._query()
+        return self._insert("events", {**event_data, "status": "draft", "group_ids": event_data.get("group_ids") or []})
+
+    async def create_member(self, member_data: Dict[str, Any]):
+        await self._query()
+        return self._insert("members", {**member_data, "group_ids": member_data.get("group_ids") or []})
+
+    async def create_members_bulk(self, rows: List[Dict[str, Any]]):
+        await self._query()
+        return [self._insert("members", {**row, "group_ids": row.get("group_ids") or []}) for row in rows]
+
+    async def add_group_members_bulk(self, pairs):
+        await self._query()
+
+    async def create_onboarding_tasks_bulk(self, member_ids):
+        await self._query()
+        return [
+            self._insert("tasks", {"title": "Welcome call", "description": None, "status": "pending",
+                                   "priority": "medium", "due_date": None, "completed_at": None, "member_id": member_id})
+            for member_id in member_ids
+        ]
+
+    async def create_group(self, group_data: Dict[str, Any]):
+        await self._query()
+        return self._insert("groups", group_data)
+
+    async def complete_task(self, task_id: int):
+        await self._query()
+        task = self.by_id["tasks"].get(task_id)
+        if task is None:
+            return None
+        task.update(status="completed", completed_at=datetime.now())
+        return dict(task)
+
+    async def upsert_attendance_bulk(self, records: List[Dict[str, Any]]):
+        await self._query()
+        existing = {(row["event_id"], row["user_id"]) for row in self.tables["attendance"]}
+        inserted = []
+        for record in records:
+            if (record["event_id"], record["user_id"]) not in existing:
+                existing.add((record["event_id"], record["user_id"]))
+                inserted.append(self._insert("attendance", record))
+        return inserted
+
+    # ==================== AGENT TASKS ====================
+
+    async def get_ai_agent_by_type(self, agent_type: str):
+        await self._query()
+        agent = next((agent for agent in self.ai_agents.values() if agent["type"] == agent_type), None)
+        return dict(agent) if agent else None
+
+    async def create_ai_agent(self, agent_data: Dict[str, Any]):
+        await self._query()
+        agent = {**agent_data, "id": str(uuid.uuid4()), "status": "IDLE", "created_at": datetime.now()}
+        self.ai_agents[agent["id"]] = agent
+        return dict(agent)
+
+    @staticmethod
+    def _check_task_status(status: Any) -> None:
+        if status not in TASK_STATUSES:
+            raise ValueError(f'invalid input value for enum "TaskStatus": "{status}"')
+
+    async def create_agent_task(self, task_data: Dict[str, Any]):
+        await self._query()
+        if task_data["agent_id"] not in self.ai_agents:
+            raise ValueError('insert on table "agent_tasks" violates foreign key constraint "agent_tasks_agentId_fkey"')
+        self._check_task_status(task_data["status"])
+        task = {**task_data, "id": str(uuid.uuid4()), "result": None, "created_at": datetime.now(), "completed_at": None}
+        self.agent_tasks[task["id"]] = task
+        return dict(task)
+
+    async def update_agent_task(self, task_id: str, changes: Dict[str, Any]):
+        await self._query()
+        if "status" in changes:
+            self._check_task_status(changes["status"])
+        self.agent_tasks[task_id].update(changes)
+
+    async def get_agent_task(self, task_id: str):
+        """The AgentTask row with its agent"""
+        await self._query()
+        task = self.agent_tasks.get(task_id)
+        return {**task, "agent": dict(self.ai_agents[task["agent_id"]])} if task else None
+
+
+class InMemoryAgentManager:
+    """Stands in for the LLM-backed agents: fixed latency, canned content, real database writes"""
+
+    latency = 0.0  # Set by install_fakes(); per agent call
+
+    def __init__(self, database_service):
+        self.database_service = database_service
+        self.calls = 0
+
+    async def _think(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    def get_available_agents(self) -> List[str]:
+        return ["calendar", "content", "onboarding", "insights"]
+
+    async def create_event_with_agents(self, event_data: Dict[str, Any]):
+        await self._think()
+        return await self.database_service.create_event(event_data)
+
+    async def onboard_new_member(self, member_data: Dict[str, Any]):
+        await self._think()
+        return await self.database_service.create_member(member_data)
+
+    async def generate_content(self, content_type: str, params: Dict[str, Any]):
+        await self._think()
+        return {
+            "id": str(uuid.uuid4()), "content_type": content_type, "title": f"Generated {content_type}",
+            "content": f"Join us! {params}", "metadata": {"model": "benchmark-fake"},
+        }
+
+    async def stream_content(self, content_type: str, params: Dict[str, Any]):
+        await self._think()
+        for word in f"Join us this Sunday for {content_type}".split():
+            await asyncio.sleep(0)
+            yield word + " "
+
+    async def generate_insights(self, insight_type: str, *args, **kwargs):
+        await self._think()
+        if insight_type == "dashboard":
+            return {"total_members": 0, "total_events": 0, "upcoming_events": 0, "active_tasks": 0,
+                    "recent_activity": [], "attendance_trend": {}, "engagement_score": 0.0}
+        if insight_type == "attendance":
+            return {"total_events_analyzed": 0, "average_attendance": 0.0, "attendance_by_month": {},
+                    "top_attended_events": [], "attendance_trends": {}}
+        return {"total_members_analyzed": 0, "engagement_score": 0.0, "active_members": 0, "inactive_members": 0,
+                "engagement_by_group": {}, "member_activity": [], "recommendations": []}
+
+    async def get_agent_status(self):
+        return {"agents": [], "system_health": "healthy", "total_tasks_today": self.calls,
+                "success_rate": 1.0, "uptime": "benchmark"}
+
+
+def install_fakes(database: bool = True, agents: bool = True, scale: float = 0.1,
+                  db_latency: float = 0.0, agent_latency: float = 0.0) -> None:
+    """
+    Register the fakes as services.database_service / agents.agent_manager
+    Must run before main is imported; anything not faked is imported for real
+    """
+    InMemoryDatabaseService.seed_scale = scale
+    InMemoryDatabaseService.latency = db_latency
+    InMemoryDatabaseService._tables = None
+    InMemoryAgentManager.latency = agent_latency
+    if database:
+        module = types.ModuleType("services.database_service")
+        module.DatabaseService = InMemoryDatabaseService
+        sys.modules["services.database_service"] = module
+    if agents:
+        module = types.ModuleType("agents.agent_manager")
+        module.AgentManager = InMemoryAgentManager
+        sys.modules["agents.agent_manager"] = module
@@ -0,0 +1,200 @@
+import asyncio
+import json
+
+import pytest
+
+from services.admission_control import AdmissionController, AdmissionRejected, AgentLimit, Priority
+
+
+def controller(**limit):
+    return AdmissionController({"content": AgentLimit(**limit)})
+
+
+def gate_stats(admission):
+    return admission.stats()["content"]
+
+
+def test_interactive_caller_displaces_newest_batch_waiter():
+    async def scenario():
+        admission = controller(max_concurrency=1, max_queue=2, max_wait=5.0)
+        holder = await admission.acquire("content")
+        older = asyncio.ensure_future(admission.acquire("content", Priority.BATCH))
+        newer = asyncio.ensure_future(admission.acquire("content", Priority.BATCH))
+        await asyncio.sleep(0)
+        assert gate_stats(admission)["queued_batch"] == 2
+
+        interactive = asyncio.ensure_future(admission.acquire("content", Priority.INTERACTIVE))
+        with pytest.raises(AdmissionRejected, match="displaced"):
+            await newer
+        assert gate_stats(admission)["displaced"] == 1
+
+        # Another batch caller meets a full queue of equal or higher priority and is turned away
+        with pytest.raises(AdmissionRejected, match="queue full"):
+            await admission.acquire("content", Priority.BATCH)
+
+        # The interactive caller is served first despite arriving last
+        holder.release()
+        (await interactive).release()
+        (await older).release()
+        stats = gate_stats(admission)
+        assert (stats["in_flight"], stats["queued"], stats["rejected_queue_full"]) == (0, 0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_queued_caller_is_rejected_at_the_deadline():
+    async def scenario():
+        admission = controller(max_concurrency=1, max_queue=4, max_wait=0.05)
+        holder = await admission.acquire("content")
+        with pytest.raises(AdmissionRejected, match="deadline") as rejected:
+            await admission.acquire("content")
+        assert rejected.value.retry_after >= 1.0
+        stats = gate_stats(admission)
+        assert (stats["queued"], stats["rejected_timeout"]) == (0, 1)
+        holder.release()
+        assert gate_stats(admission)["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_rate_limit_rejection_gives_back_the_slot():
+    async def scenario():
+        admission = controller(max_concurrency=2, max_wait=0.5, rate_per_minute=6, burst=1)
+        (await admission.acquire("content")).release()
+        with pytest.raises(AdmissionRejected, match="rate limit") as rejected:
+            await admission.acquire("content")
+        assert rejected.value.retry_after > 0.5
+        assert gate_stats(admission)["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_ticket_release_is_idempotent():
+    async def scenario():
+        admission = controller(max_concurrency=2)
+        first = await admission.acquire("content")
+        second = await admission.acquire("content")
+        first.release()
+        first.release()  # e.g. the stream's finally and the response's background task
+        assert gate_stats(admission)["in_flight"] == 1
+        second.release()
+        assert gate_stats(admission)["in_flight"] == 0
+        (await admission.acquire("unlimited")).release()  # Agents without a limit pass through
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        admission = controller(max_concurrency=1, max_wait=5.0)
+        holder = await admission.acquire("content")
+        waiter = asyncio.ensure_future(admission.acquire("content"))
+        await asyncio.sleep(0)
+        waiter.cancel()  # Client disconnected while queued
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert gate_stats(admission)["queued"] == 0
+        holder.release()
+        assert gate_stats(admission)["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_as_it_is_handed_a_slot_passes_it_on():
+    async def scenario():
+        admission = controller(max_concurrency=1, max_wait=5.0)
+        holder = await admission.acquire("content")
+        first = asyncio.ensure_future(admission.acquire("content"))
+        second = asyncio.ensure_future(admission.acquire("content"))
+        await asyncio.sleep(0)
+        holder.release()  # Hands the slot to the first waiter...
+        first.cancel()  # ...which goes away before it runs
+        await asyncio.gather(first, return_exceptions=True)
+        (await second).release()
+        assert gate_stats(admission)["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_admit_releases_when_the_call_fails():
+    async def scenario():
+        admission = controller(max_concurrency=1)
+        with pytest.raises(RuntimeError):
+            async with admission.admit("content"):
+                raise RuntimeError("provider error")
+        assert gate_stats(admission)["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+# ==================== STREAMING ENDPOINT ====================
+
+def stream_request(custom_message):
+    return {"platform": "facebook", "content_type": "announcement", "custom_message": custom_message}
+
+
+def content_in_flight():
+    import main
+
+    return main.admission.stats()["content"]["in_flight"]
+
+
+def test_stream_error_releases_the_slot(client, monkeypatch):
+    import main
+
+    async def failing_stream(content_type, params):
+        yield "Join"
+        raise ConnectionError("provider dropped the stream")
+
+    monkeypatch.setattr(main.agent_manager, "stream_content", failing_stream)
+    response = client.post("/api/v1/content/generate-social/stream", json=stream_request("stream error"))
+    assert response.status_code == 200
+    assert "event: error" in response.text
+    assert content_in_flight() == 0
+
+
+def test_client_disconnect_releases_the_slot(client, monkeypatch):
+    import main
+
+    first_token = asyncio.Event()
+
+    async def endless_stream(content_type, params):
+        yield "Join"
+        first_token.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(main.agent_manager, "stream_content", endless_stream)
+
+    async def disconnect(when):
+        """Drive the app directly so the client can go away mid-response"""
+        body = json.dumps(stream_request(f"disconnect {when}")).encode()
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+        in_flight = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            if when == "mid-stream":
+                await first_token.wait()
+                in_flight.append(content_in_flight())
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/api/v1/content/generate-social/stream", "raw_path": b"",
+            "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        await asyncio.wait_for(main.app(scope, receive, send), 5.0)
+        return sent, in_flight
+
+    sent, in_flight = client.portal.call(disconnect, "mid-stream")
+    assert sent[0]["status"] == 200
+    assert in_flight and set(in_flight) == {1}  # Each middleware layer listens for the disconnect
+    assert content_in_flight() == 0
+
+    client.portal.call(disconnect, "before the first byte")
+    assert content_in_flight() == 0
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from tests.fakes import InMemoryDatabaseService
+from services.aggregate_service import InsightAggregates
+from services.datetimes import as_naive_local
+
+
+def test_as_naive_local_converts_aware_values_to_local_time():
+    aware = datetime(2027, 1, 1, 10, 0, tzinfo=timezone.utc)
+    assert as_naive_local("2027-01-01T10:00:00Z") == aware.astimezone().replace(tzinfo=None)
+    assert as_naive_local(aware).tzinfo is None
+    assert as_naive_local(datetime(2027, 1, 1, 10, 0)) == datetime(2027, 1, 1, 10, 0)
+    assert as_naive_local(None) is None
+
+
+def test_record_event_accepts_aware_and_naive_start_dates():
+    aggregates = InsightAggregates()
+    future = datetime.now() + timedelta(days=30)
+    aggregates.record_event({"id": 1, "title": "Naive", "start_date": future})
+    aggregates.record_event({"id": 2, "title": "Aware", "start_date": datetime.now(timezone.utc) + timedelta(days=7)})
+    aggregates.record_event({"id": 3, "title": "ISO", "start_date": "2020-01-01T10:00:00Z"})
+    assert aggregates.total_events == 3
+    assert aggregates.upcoming_events == 2
+
+
+def test_record_attendance_accepts_aware_timestamps():
+    aggregates = InsightAggregates()
+    aggregates.record_attendance({"event_id": 1, "user_id": 1, "attended_at": "2027-01-15T10:00:00+00:00"})
+    assert sum(aggregates.attendance_by_month.values()) == 1
+    assert aggregates.attendance_by_event[1] == 1
+
+
+def test_rebuild_with_aware_start_dates():
+    database = InMemoryDatabaseService()
+    database.tables = {**database.tables, "events": [
+        {"id": 1, "title": "Aware", "start_date": datetime.now(timezone.utc) + timedelta(days=7)},
+        {"id": 2, "title": "Naive", "start_date": datetime.now() + timedelta(days=7)},
+        {"id": 3, "title": "Past", "start_date": datetime(2020, 1, 1, tzinfo=timezone.utc)},
+    ]}
+    aggregates = InsightAggregates()
+    asyncio.run(aggregates.rebuild(database))
+    assert aggregates.total_events == 3
+    assert aggregates.upcoming_events == 2
+    assert aggregates.total_members == len(database.tables["members"])
+
+
+def test_analytics_engine_accepts_aware_start_dates():
+    from services.analytics_engine import AnalyticsEngine, _day
+
+    engine = AnalyticsEngine()
+    engine.record_event({"id": 1, "title": "Aware", "start_date": "2020-01-01T10:00:00Z"})
+    engine.record_event({"id": 2, "title": "Naive", "start_date": datetime(2020, 1, 1, 10, 0)})
+    engine.record_attendance({"event_id": 1, "user_id": 1, "attended_at": datetime(2020, 1, 1, 10, 0, tzinfo=timezone.utc)})
+    assert engine.event_titles[1][1].tzinfo is None
+    insights = asyncio.run(engine.attendance_insights())
+    assert insights["total_events_analyzed"] == 2
+    assert _day(datetime(2027, 1, 1, 10, 0)) == _day("2027-01-01")
+
+
+def test_write_hooks_update_the_counters():
+    aggregates = InsightAggregates()
+    for member_id in (1, 2, 3, 4):
+        aggregates.record_member({"id": member_id, "name": f"Member {member_id}"})
+    aggregates.record_member({"id": 5, "name": "Onboarded", "tasks_pending": 2})
+    aggregates.record_task({"id": 1, "status": "pending", "member_id": 1})
+    aggregates.record_task({"id": 2, "status": "completed", "member_id": 2})
+    aggregates.record_attendance({"event_id": 7, "user_id": 3, "attended_at": datetime(2027, 1, 15, 10, 0)})
+
+    assert (aggregates.total_members, aggregates.active_tasks, aggregates.completed_tasks) == (5, 3, 1)
+    assert aggregates.attendance_by_event == {7: 1}
+    assert aggregates.engagement_score == 40.0  # Members 2 (task) and 3 (attendance) of 5
+
+
+def test_record_task_completed_counts_each_task_once_whatever_its_shape():
+    aggregates = InsightAggregates()
+    aggregates.record_member({"id": 1, "name": "Ada"})
+    aggregates.record_member({"id": 2, "name": "Ben"})
+    aggregates.record_task({"id": 10, "status": "pending", "member_id": 1})
+    aggregates.record_task({"id": 11, "status": "in_progress", "member_id": 2})
+
+    aggregates.record_task_completed({"id": 10, "title": "Welcome call", "member_id": 1})
+    aggregates.record_task_completed({"id": 10, "title": "Welcome call", "member_id": 1})
+    assert (aggregates.active_tasks, aggregates.completed_tasks, aggregates.engagement_score) == (1, 1, 50.0)
+
+    aggregates.record_task_completed({"id": 11, "title": "Tour", "member": {"id": 2}})
+    assert (aggregates.active_tasks, aggregates.completed_tasks, aggregates.engagement_score) == (0, 2, 100.0)
+    assert [activity["id"] for activity in aggregates.recent_activity][:2] == [11, 10]
+
+
+def test_dashboard_after_rebuild_and_increments():
+    now = datetime.now()
+    database = InMemoryDatabaseService()
+    database.tables = {
+        "events": [
+            {"id": 1, "title": "Past", "start_date": datetime(2020, 1, 1, 10, 0)},
+            {"id": 2, "title": "Next", "start_date": now + timedelta(days=3)},
+        ],
+        "members": [{"id": member_id, "name": f"Member {member_id}"} for member_id in range(1, 5)],
+        "tasks": [
+            {"id": 1, "status": "pending", "member_id": 1},
+            {"id": 2, "status": "completed", "member_id": 2},
+            {"id": 3, "status": "in_progress", "member_id": 3},
+        ],
+        "attendance": [
+            {"id": 1, "event_id": 1, "user_id": 1, "attended_at": datetime(2026, 1, 10, 10, 0)},
+            {"id": 2, "event_id": 1, "user_id": 2, "attended_at": datetime(2026, 2, 10, 10, 0)},
+            {"id": 3, "event_id": 1, "user_id": 4, "attended_at": datetime(2026, 2, 17, 10, 0)},
+        ],
+    }
+    aggregates = InsightAggregates()
+    aggregates.record_event({"id": 99, "title": "Before the rebuild"})
+    asyncio.run(aggregates.rebuild(database))
+
+    dashboard = aggregates.dashboard()
+    assert (dashboard["total_members"], dashboard["total_events"], dashboard["upcoming_events"]) == (4, 2, 1)
+    assert (dashboard["active_tasks"], dashboard["engagement_score"]) == (2, 75.0)  # Members 1, 2 and 4
+    assert dashboard["attendance_trend"] == {"months": {"2026-01": 1, "2026-02": 2}, "month_over_month_change": 100.0}
+    assert dashboard["recent_activity"][0]["id"] == 99  # Kept across the rebuild
+
+    aggregates.record_event({"id": 3, "title": "Added", "start_date": now + timedelta(days=10)})
+    aggregates.record_member({"id": 5, "name": "Member 5"})
+    aggregates.record_task_completed({"id": 3, "member_id": 3})
+    aggregates.record_attendance({"event_id": 2, "user_id": 5, "attended_at": datetime(2026, 3, 1, 10, 0)})
+
+    dashboard = aggregates.dashboard()
+    assert (dashboard["total_members"], dashboard["total_events"], dashboard["upcoming_events"]) == (5, 3, 2)
+    assert (dashboard["active_tasks"], dashboard["engagement_score"]) == (1, 100.0)
+    assert dashboard["attendance_trend"]["months"] == {"2026-01": 1, "2026-02": 2, "2026-03": 1}
+    assert dashboard["attendance_trend"]["month_over_month_change"] == -50.0
+    assert [activity["type"] for activity in dashboard["recent_activity"][:3]] == [
+        "task_completed", "member_joined", "event_created",
+    ]
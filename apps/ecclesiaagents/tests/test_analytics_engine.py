@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from tests.fakes import InMemoryDatabaseService
+from services.analytics_engine import (
+    AnalyticsEngine,
+    _Columns,
+    _day,
+    compute_attendance_insights,
+    compute_engagement_insights,
+)
+
+
+def test_out_of_order_appends_are_folded_sorted_without_losing_rows():
+    columns = _Columns(sort_by="day", event_id=np.int64, day=np.int64)
+    for day in (5, 3, 9):
+        columns.append(event_id=day, day=day)
+    assert list(columns.arrays()["day"]) == [3, 5, 9]
+    columns.append(event_id=1, day=1)
+    columns.append(event_id=10, day=10)
+    assert len(columns) == 5
+    folded = columns.arrays()
+    assert list(folded["day"]) == [1, 3, 5, 9, 10]
+    assert list(folded["event_id"]) == [1, 3, 5, 9, 10]
+
+
+def test_appends_during_folds_in_other_threads_are_kept():
+    columns = _Columns(sort_by="day", event_id=np.int64, day=np.int64)
+    stop = threading.Event()
+
+    def fold():
+        while not stop.is_set():
+            columns.arrays()
+
+    folder = threading.Thread(target=fold)
+    folder.start()
+    for index in range(20000):
+        columns.append(event_id=index, day=20000 - index)
+    stop.set()
+    folder.join()
+    assert len(columns) == 20000
+    assert sorted(columns.arrays()["event_id"]) == list(range(20000))
+
+
+def test_load_folds_rows_and_insights_fold_off_the_event_loop(monkeypatch):
+    folded_on = []
+    arrays = _Columns.arrays
+
+    def recording_arrays(self):
+        folded_on.append(threading.get_ident())
+        return arrays(self)
+
+    monkeypatch.setattr(_Columns, "arrays", recording_arrays)
+    engine = AnalyticsEngine()
+
+    async def scenario():
+        await engine.load(InMemoryDatabaseService())
+        assert not engine.attendance._pending["day"]  # Merged at the end of load()
+        engine.record_attendance({"event_id": 1, "user_id": 1, "attended_at": datetime.now() - timedelta(days=400)})
+        insights = await engine.attendance_insights()
+        await engine.engagement_insights()
+        return threading.get_ident(), insights
+
+    loop_thread, insights = asyncio.run(scenario())
+    assert folded_on and loop_thread not in folded_on
+    assert insights["total_events_analyzed"] > 0
+
+
+# ==================== KNOWN DATASET ====================
+
+# Wednesday; the current week starts on Monday 2026-06-15 and the current month is June
+TODAY = date(2026, 6, 17)
+# Sunday services: event id -> (date, members who checked in); event 6 has not happened yet
+SERVICES = {
+    1: (date(2026, 4, 26), [1, 2, 3, 4]),
+    2: (date(2026, 5, 3), [1, 2, 3]),
+    3: (date(2026, 5, 10), [1, 2, 3, 4, 5]),
+    4: (date(2026, 5, 17), [1, 2]),
+    5: (date(2026, 6, 7), [1, 2, 3, 4, 5, 6]),
+    6: (date(2026, 7, 1), []),
+}
+GROUPS = {1: ("Choir", [1, 2, 7, 9]), 2: ("Youth", [5, 6, 8, 10])}
+
+
+def known_snapshot():
+    engine = AnalyticsEngine()
+    for event_id, (day, attendees) in SERVICES.items():
+        start = datetime.combine(day, time(10, 0))
+        engine.record_event({"id": event_id, "title": f"Service {event_id}", "start_date": start})
+        for user_id in attendees:
+            engine.record_attendance({"event_id": event_id, "user_id": user_id, "attended_at": start})
+    for member_id in range(1, 11):
+        group_ids = [group_id for group_id, (_, members) in GROUPS.items() if member_id in members]
+        engine.record_member({"id": member_id, "name": f"Member {member_id}"}, group_ids=group_ids)
+    # Member 7 was last active in the window before the current 90 days; member 8 only completed a task
+    engine.record_task_completed({"id": 100, "member_id": 7, "completed_at": datetime(2026, 2, 1, 9, 0)})
+    engine.record_task_completed({"id": 101, "member_id": 8, "completed_at": datetime(2026, 6, 1, 9, 0)})
+    return {
+        **engine._fold(),
+        "event_titles": dict(engine.event_titles),
+        "member_names": dict(engine.member_names),
+        "group_names": {group_id: name for group_id, (name, _) in GROUPS.items()},
+        "today": _day(TODAY),
+    }
+
+
+def test_attendance_insights_on_a_known_dataset():
+    insights = compute_attendance_insights(known_snapshot())
+
+    assert insights["total_events_analyzed"] == 5  # Event 6 is still to come
+    assert insights["average_attendance"] == 4.0  # 20 check-ins over 5 services
+    assert insights["attendance_by_month"] == {"2026-04": 4, "2026-05": 10, "2026-06": 6}
+    assert [(event["event_id"], event["attendance"]) for event in insights["top_attended_events"]] == [
+        (5, 6), (3, 5), (1, 4), (2, 3), (4, 2),
+    ]
+    assert insights["top_attended_events"][0]["title"] == "Service 5"
+
+    trends = insights["attendance_trends"]
+    # Complete weeks from Monday 2026-04-20 to Monday 2026-06-08
+    assert list(trends["weekly_totals"].values()) == [4, 3, 5, 2, 0, 0, 6, 0]
+    assert next(iter(trends["weekly_totals"])) == "2026-04-20"
+    assert trends["rolling_4_week_average"] == 1.5
+    assert trends["rolling_12_week_average"] is None
+    assert trends["month_over_month_change"] == 150.0  # May (10) against April (4)
+    assert (trends["weekly_slope"], trends["direction"]) == (-0.36, "declining")  # Least squares: -15/42
+
+    forecast = insights["predictions"]
+    assert forecast["method"] == "linear trend over the last 8 complete weeks"
+    assert [week["week_start"] for week in forecast["next_weeks"]] == [
+        "2026-06-15", "2026-06-22", "2026-06-29", "2026-07-06",
+    ]
+    # 3.75 - 15/42 * x for x = 8..11, clipped at zero
+    assert [week["expected_attendance"] for week in forecast["next_weeks"]] == [0.9, 0.5, 0.2, 0.0]
+    assert all(week["low"] <= week["expected_attendance"] <= week["high"] for week in forecast["next_weeks"])
+    assert forecast["expected_per_event"] == 4.0
+
+
+def test_engagement_insights_on_a_known_dataset():
+    insights = compute_engagement_insights(known_snapshot())
+
+    # Members 1-6 attended and member 8 completed a task in the last 90 days; 7, 9 and 10 did not
+    assert (insights["total_members_analyzed"], insights["active_members"], insights["inactive_members"]) == (10, 7, 3)
+    assert insights["engagement_score"] == 70.0
+    assert insights["engagement_by_group"] == {"Choir": 50.0, "Youth": 75.0}
+    assert [
+        (member["member_id"], member["attendance_last_90_days"], member["tasks_completed_last_90_days"])
+        for member in insights["member_activity"]
+    ] == [(1, 5, 0), (2, 5, 0), (3, 4, 0), (4, 3, 0), (5, 2, 0), (6, 1, 0), (8, 0, 1)]
+
+    advice = insights["recommendations"]
+    assert len(advice) == 3  # Groups are below MIN_GROUP_SIZE, so neither is flagged
+    assert advice[0].startswith("3 of 10 members (30%)")
+    assert advice[1].startswith("1 members who were active")  # Member 7
+    assert "declining" in advice[2]
@@ -0,0 +1,71 @@
+import httpx
+
+import main
+from benchmarks.load_test import SCENARIOS, ScenarioContext, discover_ids, run_scenario, summarize, uncovered_routes
+from benchmarks.model_benchmarks import run_model_benchmarks
+from benchmarks.run import compare, parse_args
+
+
+def scenario_result(throughput, p95):
+    return {"throughput_rps": throughput, "latency_ms": {"p95": p95}}
+
+
+def test_compare_flags_changes_over_the_threshold():
+    previous = {
+        "load": {"scenarios": {"list_events": scenario_result(100.0, 10.0), "get_event": scenario_result(100.0, 10.0),
+                               "removed": scenario_result(1.0, 1.0)}},
+        "models": {"models": {"EventResponse": {"100": {"dict": {"seconds": 0.010}, "parse_obj": {"seconds": 0.010}}}}},
+        "import_time": {"median_ms": 500.0},
+    }
+    current = {
+        "load": {"scenarios": {"list_events": scenario_result(85.0, 10.5), "get_event": scenario_result(120.0, 12.0),
+                               "added": scenario_result(1.0, 1.0)}},
+        "models": {"models": {"EventResponse": {"100": {"dict": {"seconds": 0.012}, "parse_obj": {"seconds": 0.009}}}}},
+        "import_time": {"median_ms": 520.0},
+    }
+    changes = compare(previous, current)
+    assert changes["load"] == {
+        "list_events": {"throughput_rps": -0.15, "p95_ms": 0.05},
+        "get_event": {"throughput_rps": 0.2, "p95_ms": 0.2},
+    }
+    assert changes["models"] == {"EventResponse/100/dict": 0.2, "EventResponse/100/parse_obj": -0.1}
+    assert changes["import_time"] == 0.04
+    assert changes["regressions"] == ["load:list_events", "load:get_event", "models:EventResponse/100/dict"]
+
+
+def test_summarize_reports_percentiles_in_milliseconds():
+    summary = summarize([index / 1000 for index in range(1, 101)], elapsed=2.0, statuses={200: 99, 503: 1}, errors=1)
+    assert (summary["requests"], summary["throughput_rps"], summary["status_codes"]) == (100, 50.0, {"200": 99, "503": 1})
+    assert (summary["latency_ms"]["p50"], summary["latency_ms"]["p99"], summary["latency_ms"]["max"]) == (51.0, 100.0, 100.0)
+    assert summarize([], 1.0, {}, 0)["throughput_rps"] == 0.0
+
+
+def test_every_route_has_a_load_scenario():
+    assert uncovered_routes(main.app, SCENARIOS) == []
+
+
+def test_every_scenario_runs_against_the_fakes(client):
+    async def smoke():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=30) as http:
+            context = ScenarioContext()
+            await discover_ids(http, context)
+            results = {scenario.name: await run_scenario(http, scenario, context, 2, 1) for scenario in SCENARIOS}
+        # Land the buffered check-ins now rather than in the middle of a later test
+        await main.checkin_buffer.flush()
+        return results
+
+    results = client.portal.call(smoke)
+    failed = {name: result["status_codes"] for name, result in results.items() if result["errors"]}
+    assert failed == {}
+    assert all(result["requests"] == 2 for result in results.values())
+
+
+def test_model_benchmarks_and_defaults():
+    results = run_model_benchmarks((5,))
+    assert results["sizes"] == [5]
+    steps = results["models"]["EventResponse"]["5"]
+    assert {"parse_obj", "dict", "json_per_row"} <= set(steps)
+    assert all(step["seconds"] >= 0 for step in steps.values())
+    args = parse_args([])
+    assert (args.database, args.agents, args.compare) == ("fake", "fake", None)
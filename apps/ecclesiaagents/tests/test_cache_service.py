@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from services.cache_service import TTLCache
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = TTLCache("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute(("insights", 1), compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+    assert cache.get(("insights", 1)) == (True, "value")
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    cache = TTLCache("test")
+    release = None
+
+    async def compute():
+        await release.wait()
+        return "value"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.ensure_future(cache.get_or_compute(("insights", 1), compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_compute(("insights", 1), compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "value"
+    assert cache.get(("insights", 1)) == (True, "value")
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    cache = TTLCache("test")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_compute(("insights", 1), compute) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get(("insights", 1)) == (False, None)
+
+
+def test_invalidate_detaches_inflight_computation():
+    cache = TTLCache("test")
+    version = {"value": "old"}
+    started = None
+
+    async def compute():
+        value = version["value"]
+        started.set()
+        await asyncio.sleep(0.01)
+        return value
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.Event()
+        stale = asyncio.ensure_future(cache.get_or_compute(("insights", 1), compute))
+        await started.wait()
+        version["value"] = "new"
+        cache.invalidate("insights")
+        fresh = await cache.get_or_compute(("insights", 1), compute)
+        return await stale, fresh
+
+    assert asyncio.run(scenario()) == ("old", "new")
+    assert cache.get(("insights", 1)) == (True, "new")
+
+
+def test_lru_eviction_and_namespace_invalidation():
+    cache = TTLCache("test", max_entries=2)
+    cache.set(("a", 1), 1)
+    cache.set(("b", 1), 2)
+    cache.get(("a", 1))
+    cache.set(("b", 2), 3)
+    assert cache.get(("b", 1)) == (False, None)
+    cache.invalidate("b")
+    assert cache.get(("a", 1)) == (True, 1)
+    assert cache.get(("b", 2)) == (False, None)
@@ -0,0 +1,148 @@
+import asyncio
+
+import main
+from services.checkin_buffer import CheckInBuffer
+
+
+class FlakyAttendanceStore:
+    """upsert_attendance_bulk that fails the first `failures` calls"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.rows = []
+
+    async def upsert_attendance_bulk(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.rows.extend(records)
+        return list(records)
+
+
+async def wait_until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_duplicates_are_absorbed_and_batches_written():
+    store, flushed = FlakyAttendanceStore(), []
+
+    async def on_flush(records):
+        flushed.extend(records)
+
+    async def scenario():
+        buffer = CheckInBuffer(store, on_flush=on_flush, batch_size=2, flush_interval=0.01)
+        await buffer.start()
+        assert (await buffer.check_in(1, 10))[1]
+        assert not (await buffer.check_in(1, 10))[1]
+        await buffer.check_in(1, 11)
+        await buffer.check_in(1, 12)
+        await wait_until(lambda: len(store.rows) == 3)
+        assert not (await buffer.check_in(1, 11))[1]  # Already written
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert buffer.stats()["duplicates"] == 2
+    assert len(flushed) == 3
+
+
+def test_database_failure_keeps_the_batch_and_the_flusher_alive():
+    store = FlakyAttendanceStore(failures=2)
+
+    async def scenario():
+        buffer = CheckInBuffer(store, batch_size=10, flush_interval=0.01)
+        await buffer.start()
+        await buffer.check_in(1, 10)
+        await buffer.check_in(1, 11)
+        await wait_until(lambda: len(store.rows) == 2)
+        await buffer.check_in(1, 12)  # The flusher still runs after the failures
+        await wait_until(lambda: len(store.rows) == 3)
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert buffer.failed_flushes == 2
+    assert buffer.stats()["pending"] == 0
+
+
+def test_failing_counter_update_does_not_stop_the_flusher_or_rewrite_the_batch():
+    store, flushed = FlakyAttendanceStore(), []
+
+    async def on_flush(records):
+        if not flushed:
+            flushed.append(None)
+            raise ValueError("counter update failed")
+        flushed.extend(records)
+
+    async def scenario():
+        buffer = CheckInBuffer(store, on_flush=on_flush, batch_size=10, flush_interval=0.01)
+        await buffer.start()
+        await buffer.check_in(1, 10)
+        await wait_until(lambda: buffer.failed_updates == 1)
+        await buffer.check_in(1, 11)
+        await wait_until(lambda: len(flushed) == 2)
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert [row["user_id"] for row in store.rows] == [10, 11]  # The first batch was written once
+    assert buffer.stats()["failed_updates"] == 1
+    assert buffer.failed_flushes == 0
+
+
+def test_stop_flushes_pending_check_ins():
+    store = FlakyAttendanceStore()
+
+    async def scenario():
+        buffer = CheckInBuffer(store, batch_size=100, flush_interval=60)
+        await buffer.start()
+        for user_id in range(5):
+            await buffer.check_in(1, user_id)
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert len(store.rows) == 5
+
+
+class RejectingAttendanceStore(FlakyAttendanceStore):
+    """Fails every batch holding user 13, like a foreign key violation would"""
+
+    async def upsert_attendance_bulk(self, records):
+        if any(record["user_id"] == 13 for record in records):
+            raise ValueError('insert violates foreign key constraint "attendance_userId_fkey"')
+        return await super().upsert_attendance_bulk(records)
+
+
+def test_row_that_always_fails_is_quarantined_without_holding_up_the_rest():
+    store = RejectingAttendanceStore()
+
+    async def scenario():
+        buffer = CheckInBuffer(store, batch_size=4, flush_interval=0.001)
+        await buffer.start()
+        for user_id in range(10, 18):
+            await buffer.check_in(1, user_id)
+        await wait_until(lambda: len(store.rows) == 7)
+        await wait_until(lambda: buffer.quarantined == 1)
+        await asyncio.wait_for(buffer.stop(), 1.0)
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert sorted(row["user_id"] for row in store.rows) == [10, 11, 12, 14, 15, 16, 17]
+    stats = buffer.stats()
+    assert (stats["pending"], stats["retrying_rows"], stats["quarantined"]) == (0, 0, 1)
+
+
+def test_check_in_endpoint_validates_the_member(client):
+    event_id = client.get("/api/v1/events", params={"limit": 1}).json()[0]["id"]
+    member_id = client.get("/api/v1/members", params={"limit": 1}).json()[0]["id"]
+    response = client.post(f"/api/v1/events/{event_id}/check-in", json={"user_id": member_id})
+    assert response.status_code == 202
+    assert response.json()["status"] in ("accepted", "duplicate")
+    client.portal.call(main.checkin_buffer.flush)  # Written now, not during a later test that reads attendance
+
+    response = client.post(f"/api/v1/events/{event_id}/check-in", json={"user_id": 10 ** 9})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Member not found"
@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+
+import main
+
+
+def social(message):
+    return {"content_type": "social_post", "params": {"platform": "facebook", "content_type": "announcement",
+                                                      "custom_message": message}}
+
+
+def flyer(event_id, style):
+    return {"content_type": "flyer", "params": {"event_id": event_id, "style": style}}
+
+
+def test_batch_dedupes_bounds_concurrency_and_reports_per_item(client, monkeypatch):
+    run = uuid.uuid4().hex  # Keeps these requests out of the content cache of earlier tests
+    running, peak, generated, looked_up = [0], [0], [], []
+
+    async def generate_content(content_type, params):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.02)
+        running[0] -= 1
+        generated.append((content_type, params.get("custom_message") or params.get("style")))
+        return {"id": str(len(generated)), "content_type": content_type, "content": "Join us!"}
+
+    get_event_by_id = main.database_service.get_event_by_id
+
+    async def counting_get_event_by_id(event_id):
+        looked_up.append(event_id)
+        return await get_event_by_id(event_id)
+
+    monkeypatch.setattr(main.agent_manager, "generate_content", generate_content)
+    monkeypatch.setattr(main.database_service, "get_event_by_id", counting_get_event_by_id)
+    monkeypatch.setattr(main, "CONTENT_BATCH_CONCURRENCY", 2)
+
+    items = [social(f"{run} {number}") for number in range(5)]
+    items += [
+        social(f"{run} 0"),  # Same request as item 0
+        flyer(1, f"modern {run}"),
+        flyer(1, f"classic {run}"),  # Same event: looked up once
+        flyer(10 ** 9, run),  # Unknown event
+        {"content_type": "podcast", "params": {}},
+        {"content_type": "social_post", "params": {"platform": "myspace", "content_type": "announcement"}},
+    ]
+    response = client.post("/api/v1/content/batch", json={"items": items})
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert (body["total"], body["succeeded"], body["failed"], body["unique_requests"]) == (11, 8, 3, 8)
+    assert len(generated) == 7  # Five posts and two flyers; the duplicate and the failures never reach the agent
+    assert peak[0] == 2
+    assert sorted(looked_up) == [1, 10 ** 9]
+
+    results = body["results"]
+    assert [result["index"] for result in results] == list(range(11))
+    assert results[5]["success"] and results[5]["content"]["id"] == results[0]["content"]["id"]
+    assert results[8]["error"] == "Event not found"
+    assert "Unknown content_type" in results[9]["error"]
+    assert "platform" in results[10]["error"]
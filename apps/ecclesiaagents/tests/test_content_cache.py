@@ -0,0 +1,91 @@
+import asyncio
+import os
+import time
+
+from services.content_cache import ContentCache
+
+
+def entry_paths(cache):
+    return sorted(
+        os.path.join(directory, name)
+        for directory, _, files in os.walk(cache.disk_dir) for name in files
+    )
+
+
+def age(path, seconds):
+    moment = time.time() - seconds
+    os.utime(path, (moment, moment))
+
+
+def test_identical_requests_generate_once_and_survive_a_restart(tmp_path):
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return {"id": "1", "content": "Welcome!"}
+
+    key = ContentCache.make_key("welcome_material", {"member_id": 1, "material_type": " email "}, "member:1:v1")
+    assert key == ContentCache.make_key("welcome_material", {"member_id": 1, "material_type": "email"}, "member:1:v1")
+
+    cache = ContentCache(str(tmp_path))
+    assert asyncio.run(cache.get_or_generate(key, generate)) == ({"id": "1", "content": "Welcome!"}, "miss")
+    assert asyncio.run(cache.get_or_generate(key, generate))[1] == "memory"
+    restarted = ContentCache(str(tmp_path))
+    assert asyncio.run(restarted.get_or_generate(key, generate))[1] == "disk"
+    assert len(calls) == 1
+
+
+def test_prune_removes_expired_entries_and_orphaned_temp_files(tmp_path):
+    cache = ContentCache(str(tmp_path), disk_ttl_seconds=60)
+    cache._write_disk("aa" + "0" * 62, {"content": "old"})
+    cache._write_disk("bb" + "0" * 62, {"content": "new"})
+    old, new = entry_paths(cache)
+    age(old, 120)
+    orphan = os.path.join(str(tmp_path), "aa", "leftover.json.123.tmp")
+    open(orphan, "w").close()
+    age(orphan, 2 * 60 * 60)
+
+    assert cache.prune()["expired"] == 2
+    assert entry_paths(cache) == [new]
+
+
+def test_prune_evicts_oldest_entries_down_to_the_size_cap(tmp_path):
+    cache = ContentCache(str(tmp_path), max_disk_bytes=10_000)
+    for index in range(10):
+        cache._write_disk(f"{index:02d}" + "0" * 62, {"content": "x" * 1000})
+    paths = entry_paths(cache)
+    for offset, path in enumerate(paths):
+        age(path, 1000 - offset)  # The lowest index is the oldest
+
+    result = cache.prune()
+    remaining = entry_paths(cache)
+    assert result["evicted"] >= 1
+    assert sum(os.path.getsize(path) for path in remaining) <= 10_000 * 0.9
+    assert remaining == paths[-len(remaining):]
+
+
+def test_writes_past_the_cap_trigger_a_prune(tmp_path):
+    cache = ContentCache(str(tmp_path), max_disk_bytes=5_000)
+    cache.prune()  # Measures the (empty) directory, as start() does
+    for index in range(20):
+        cache._write_disk(f"{index:02d}" + "0" * 62, {"content": "x" * 1000})
+    assert cache.disk_pruned > 0
+    assert sum(os.path.getsize(path) for path in entry_paths(cache)) <= 5_000
+
+
+def test_start_prunes_in_the_background(tmp_path):
+    cache = ContentCache(str(tmp_path), disk_ttl_seconds=60)
+    cache._write_disk("aa" + "0" * 62, {"content": "old"})
+    age(entry_paths(cache)[0], 120)
+
+    async def scenario():
+        await cache.start()
+        for _ in range(100):
+            if cache.last_prune_at is not None:
+                break
+            await asyncio.sleep(0.01)
+        await cache.stop()
+
+    asyncio.run(scenario())
+    assert entry_paths(cache) == []
+    assert cache.stats()["disk_pruned"] == 1
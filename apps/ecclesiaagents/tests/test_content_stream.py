@@ -0,0 +1,32 @@
+import json
+import uuid
+
+
+def sse_events(text):
+    """(event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_tokens_then_the_complete_content_and_caches_it(client):
+    request = {"platform": "instagram", "content_type": "reminder", "custom_message": uuid.uuid4().hex}
+
+    response = client.post("/api/v1/content/generate-social/stream", json=request)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(response.text)
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "complete" and set(kinds[:-1]) == {"token"}
+    complete = events[-1][1]
+    assert complete["content"] == "".join(data["text"] for _, data in events[:-1])
+    assert (complete["content_type"], complete["metadata"]["cache_hit"]) == ("social_post", False)
+
+    # The same request again is served from the cache as a single event, as is its non-streaming twin
+    events = sse_events(client.post("/api/v1/content/generate-social/stream", json=request).text)
+    assert [kind for kind, _ in events] == ["complete"]
+    assert (events[0][1]["id"], events[0][1]["metadata"]["cache_hit"]) == (complete["id"], True)
+    cached = client.post("/api/v1/content/generate-social", json=request).json()
+    assert (cached["id"], cached["metadata"]["cache_hit"]) == (complete["id"], True)
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+from agents.dag_executor import DagExecutor, WorkflowStep, WorkflowStepError
+
+
+def returning(value, delay=0.0):
+    async def run(context):
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+async def failing(context):
+    raise RuntimeError("agent unavailable")
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        DagExecutor([
+            WorkflowStep("a", returning(1), depends_on=["c"]),
+            WorkflowStep("b", returning(2), depends_on=["a"]),
+            WorkflowStep("c", returning(3), depends_on=["b"]),
+        ])
+
+
+def test_unknown_dependency_and_duplicate_names_are_rejected():
+    with pytest.raises(ValueError, match="unknown step"):
+        DagExecutor([WorkflowStep("a", returning(1), depends_on=["missing"])])
+    with pytest.raises(ValueError, match="unique"):
+        DagExecutor([WorkflowStep("a", returning(1)), WorkflowStep("a", returning(2))])
+
+
+def test_independent_steps_run_concurrently_and_see_dependency_results():
+    async def combine(context):
+        return context["left"] + context["right"] + context["base"]
+
+    executor = DagExecutor([
+        WorkflowStep("left", returning(1, delay=0.1)),
+        WorkflowStep("right", returning(2, delay=0.1)),
+        WorkflowStep("sum", combine, depends_on=["left", "right"]),
+    ])
+    started = time.perf_counter()
+    result = asyncio.run(executor.run({"base": 10}))
+    assert time.perf_counter() - started < 0.18  # Critical path, not the sum of both sleeps
+    assert result.results["sum"] == 13
+    assert executor.order.index("sum") > max(executor.order.index("left"), executor.order.index("right"))
+    assert set(result.timings) == {"left", "right", "sum"}
+    assert all(timing["status"] == "completed" for timing in result.timings.values())
+
+
+def test_per_step_timeout_fails_required_step():
+    executor = DagExecutor([
+        WorkflowStep("slow", returning(1, delay=1.0), timeout=0.05),
+        WorkflowStep("after", returning(2), depends_on=["slow"]),
+    ])
+    with pytest.raises(WorkflowStepError) as raised:
+        asyncio.run(executor.run())
+    assert raised.value.step == "slow"
+    assert raised.value.timings["slow"]["status"] == "timed_out"
+    assert raised.value.timings["after"] == {"status": "skipped", "blocked_by": ["slow"]}
+
+
+def test_failed_optional_step_skips_dependents_without_failing_the_workflow():
+    reported = []
+    executor = DagExecutor([
+        WorkflowStep("member", returning({"id": 1})),
+        WorkflowStep("welcome", failing, depends_on=["member"], required=False),
+        WorkflowStep("send_welcome", returning("sent"), depends_on=["welcome"], required=False),
+        WorkflowStep("record", returning(None), depends_on=["member"]),
+    ])
+    result = asyncio.run(executor.run(on_step=lambda name, timing: reported.append((name, timing["status"]))))
+    assert result.timings["welcome"]["status"] == "failed"
+    assert result.timings["welcome"]["error"] == "agent unavailable"
+    assert result.timings["send_welcome"] == {"status": "skipped", "blocked_by": ["welcome"]}
+    assert "welcome" not in result.results
+    assert sorted(reported) == [("member", "completed"), ("record", "completed"),
+                                ("send_welcome", "skipped"), ("welcome", "failed")]
+
+
+def test_failed_required_step_raises_with_its_cause():
+    executor = DagExecutor([WorkflowStep("member", failing), WorkflowStep("record", returning(None), depends_on=["member"])])
+    with pytest.raises(WorkflowStepError) as raised:
+        asyncio.run(executor.run())
+    assert raised.value.step == "member"
+    assert isinstance(raised.value.cause, RuntimeError)
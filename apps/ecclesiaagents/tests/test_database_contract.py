@@ -0,0 +1,192 @@
+"""
+Pins the DatabaseService contract main.py and the services rely on, against the in-memory fake
+A real implementation has to accept the same arguments and return the same shapes
+"""
+import asyncio
+import inspect
+from datetime import timedelta
+
+import pytest
+
+from tests.fakes import InMemoryDatabaseService
+
+PAGE_ARGUMENTS = ["after", "limit", "fields", "include_relations"]
+
+
+@pytest.fixture
+def database():
+    return InMemoryDatabaseService()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def parameters(method):
+    return list(inspect.signature(method).parameters)
+
+
+def middle(values):
+    values = sorted(value for value in values if value is not None)
+    return values[len(values) // 2]
+
+
+# ==================== CURSOR PAGINATION AND FILTER PUSHDOWN ====================
+
+def test_list_signatures():
+    assert parameters(InMemoryDatabaseService.get_all_events)[1:] == PAGE_ARGUMENTS + [
+        "start_from", "start_to", "status", "group_id"]
+    assert parameters(InMemoryDatabaseService.get_all_members)[1:] == PAGE_ARGUMENTS + [
+        "role", "group_id", "joined_from", "joined_to"]
+    assert parameters(InMemoryDatabaseService.get_all_groups)[1:] == PAGE_ARGUMENTS + ["group_type", "leader_id"]
+    assert parameters(InMemoryDatabaseService.get_all_tasks)[1:] == PAGE_ARGUMENTS + [
+        "status", "member_id", "group_id", "due_from", "due_to"]
+
+
+def test_pages_follow_the_id_cursor(database):
+    everything = run(database.get_all_members())
+    ids = [member["id"] for member in everything]
+    assert ids == sorted(ids) and len(ids) == len(database.tables["members"])
+
+    paged, after = [], None
+    while True:
+        page = run(database.get_all_members(after=after, limit=7))
+        assert len(page) <= 7
+        if not page:
+            break
+        paged += page
+        after = page[-1]["id"]
+    assert paged == everything
+    assert run(database.get_all_members(after=ids[-1])) == []
+
+
+def test_fields_select_only_the_requested_columns(database):
+    events = run(database.get_all_events(limit=5, fields={"id", "title", "group_ids"}, include_relations=False))
+    assert len(events) == 5
+    assert all(set(event) == {"id", "title", "group_ids"} for event in events)
+
+
+def test_filters_are_applied_before_the_limit(database):
+    tables = database.tables
+    events = run(database.get_all_events(status="published", group_id=1))
+    assert events and [event["id"] for event in events] == [
+        event["id"] for event in tables["events"] if event["status"] == "published" and 1 in event["group_ids"]]
+    assert len(run(database.get_all_events(status="published", limit=3))) == 3
+
+    leader_id = tables["groups"][0]["leader_id"]
+    groups = run(database.get_all_groups(leader_id=leader_id))
+    assert groups and all(group["leader_id"] == leader_id for group in groups)
+
+    # A task belongs to the groups of its member
+    members_of_group = {member["id"] for member in tables["members"] if 1 in member["group_ids"]}
+    tasks = run(database.get_all_tasks(group_id=1, status="pending"))
+    assert [task["id"] for task in tasks] == [
+        task["id"] for task in tables["tasks"] if task["member_id"] in members_of_group and task["status"] == "pending"]
+
+
+@pytest.mark.parametrize("method, column, start, end", [
+    ("get_all_events", "start_date", "start_from", "start_to"),
+    ("get_all_members", "created_at", "joined_from", "joined_to"),
+    ("get_all_tasks", "due_date", "due_from", "due_to"),
+])
+def test_date_ranges_include_the_start_and_exclude_the_end(database, method, column, start, end):
+    table = {"get_all_events": "events", "get_all_members": "members", "get_all_tasks": "tasks"}[method]
+    moments = [row[column] for row in database.tables[table]]
+    low = middle(moments)
+    high = low + timedelta(days=60)
+    rows = run(getattr(database, method)(**{start: low, end: high}))
+    assert low in {row[column] for row in rows}
+    assert [row["id"] for row in rows] == [
+        row["id"] for row in database.tables[table] if row[column] is not None and low <= row[column] < high]
+    assert all(row[column] >= low for row in run(getattr(database, method)(**{start: low})))
+    assert all(row[column] < low for row in run(getattr(database, method)(**{end: low})))
+
+
+# ==================== STREAMING EXPORTS ====================
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+def test_stream_signatures():
+    assert parameters(InMemoryDatabaseService.stream_events)[1:] == ["updated_since"]
+    assert parameters(InMemoryDatabaseService.stream_members)[1:] == ["updated_since"]
+    assert parameters(InMemoryDatabaseService.stream_tasks)[1:] == ["updated_since"]
+    assert parameters(InMemoryDatabaseService.stream_attendance)[1:] == ["event_id", "attended_from"]
+
+
+@pytest.mark.parametrize("table", ["events", "members", "tasks", "attendance"])
+def test_streams_yield_every_row_in_id_order(database, table):
+    rows = getattr(database, f"stream_{table}")()
+    assert inspect.isasyncgen(rows)  # Called without await; rows arrive as the cursor reads them
+    rows = run(collect(rows))
+    assert rows == database.tables[table]
+    assert rows[0] is not database.tables[table][0]  # Copies, not the stored rows
+
+
+def test_stream_filters(database):
+    attendance = database.tables["attendance"]
+    event_id = attendance[0]["event_id"]
+    assert run(collect(database.stream_attendance(event_id=event_id))) == [
+        record for record in attendance if record["event_id"] == event_id]
+
+    since = middle(record["attended_at"] for record in attendance)
+    rows = run(collect(database.stream_attendance(event_id=event_id, attended_from=since)))
+    assert rows == [record for record in attendance if record["event_id"] == event_id and record["attended_at"] >= since]
+
+    # updated_since is exclusive: a row last touched at that moment was already exported
+    events = database.tables["events"]
+    since = middle(event["updated_at"] for event in events)
+    assert run(collect(database.stream_events(updated_since=since))) == [
+        event for event in events if event["updated_at"] > since]
+    assert run(collect(database.stream_events(updated_since=max(event["updated_at"] for event in events)))) == []
+
+
+# ==================== RELATION BATCHES ====================
+
+def test_relation_batch_signatures():
+    for method, argument in [
+        ("get_groups_for_events", "event_ids"), ("count_attendance_by_event", "event_ids"),
+        ("get_groups_for_members", "member_ids"), ("count_tasks_by_member", "member_ids"),
+        ("get_members_by_ids", "member_ids"),
+        ("get_members_for_groups", "group_ids"), ("count_members_by_group", "group_ids"),
+    ]:
+        assert parameters(getattr(InMemoryDatabaseService, method))[1:] == [argument]
+
+
+def test_relation_batches_answer_one_query_keyed_by_id(database):
+    tables, missing = database.tables, 10 ** 9
+    event, member, group = tables["events"][0], tables["members"][0], tables["groups"][0]
+
+    before = database.queries
+    groups = run(database.get_groups_for_events([event["id"], missing]))
+    assert database.queries == before + 1
+    assert groups == {event["id"]: [{"id": group_id, "name": database.by_id["groups"][group_id]["name"]}
+                                    for group_id in event["group_ids"]]}
+    assert run(database.get_groups_for_members([member["id"]]))[member["id"]] == [
+        {"id": group_id, "name": database.by_id["groups"][group_id]["name"]} for group_id in member["group_ids"]]
+
+    leaders = run(database.get_members_by_ids([group["leader_id"], missing]))
+    leader = database.by_id["members"][group["leader_id"]]
+    assert leaders == {leader["id"]: {"id": leader["id"], "name": leader["name"], "email": leader["email"]}}
+
+    in_group = [{"id": row["id"], "name": row["name"]} for row in tables["members"] if group["id"] in row["group_ids"]]
+    assert run(database.get_members_for_groups([group["id"], missing])) == {group["id"]: in_group}
+
+
+def test_relation_counts_omit_ids_without_rows(database):
+    tables, missing = database.tables, 10 ** 9
+    event_id = tables["attendance"][0]["event_id"]
+    assert run(database.count_attendance_by_event([event_id, missing])) == {
+        event_id: sum(1 for record in tables["attendance"] if record["event_id"] == event_id)}
+
+    member_id = tables["tasks"][0]["member_id"]
+    tasks = [task for task in tables["tasks"] if task["member_id"] == member_id]
+    completed = sum(1 for task in tasks if task["status"] == "completed")
+    # Every task that is not completed counts as pending, in_progress included
+    assert run(database.count_tasks_by_member([member_id, missing])) == {
+        member_id: {"completed": completed, "pending": len(tasks) - completed}}
+
+    group_id = tables["groups"][0]["id"]
+    assert run(database.count_members_by_group([group_id, missing])) == {
+        group_id: sum(1 for member in tables["members"] if group_id in member["group_ids"])}
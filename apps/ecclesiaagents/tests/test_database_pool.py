@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from services.database_pool import PREPARED_QUERIES, DatabasePool, PoolTimeout
+from services.database_settings import DatabaseSettings
+
+
+class FakeStatement:
+    def __init__(self, connection, query):
+        self.connection = connection
+        self.query = query
+
+    async def fetch(self, *args):
+        return [(self.connection.number, self.query, args)]
+
+    async def fetchrow(self, *args):
+        return (self.connection.number, self.query, args)
+
+
+class FakeConnection:
+    """Records what the pool asks of a driver connection"""
+
+    def __init__(self, number):
+        self.number = number
+        self.prepared = []
+        self.closed = False
+
+    async def prepare(self, query):
+        self.prepared.append(query)
+        return FakeStatement(self, query)
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeDriver:
+    def __init__(self):
+        self.connections = []
+
+    async def connect(self, url, statement_cache_size):
+        connection = FakeConnection(len(self.connections) + 1)
+        self.connections.append(connection)
+        return connection
+
+
+def make_pool(driver, name="primary", fallback=None, **settings):
+    settings = DatabaseSettings(url=f"postgresql://localhost/{name}", **settings)
+    return DatabasePool(settings, name, fallback=fallback, connect=driver.connect)
+
+
+def test_open_starts_min_size_and_grows_to_max_size():
+    async def scenario():
+        driver = FakeDriver()
+        pool = make_pool(driver, pool_min_size=1, pool_max_size=2)
+        await pool.open()
+        assert (pool.stats()["size"], pool.stats()["idle"]) == (1, 1)
+        async with pool.acquire() as first, pool.acquire() as second:
+            assert first is not second
+            stats = pool.stats()
+            assert (stats["size"], stats["in_use"], stats["idle"]) == (2, 2, 0)
+        assert pool.stats()["in_use"] == 0
+        assert len(driver.connections) == 2
+        await pool.close()
+        assert all(connection.closed for connection in driver.connections)
+
+    asyncio.run(scenario())
+
+
+def test_saturated_pool_hands_connections_to_waiters_in_order_and_times_out():
+    async def scenario():
+        pool = make_pool(FakeDriver(), pool_min_size=1, pool_max_size=1, acquire_timeout=0.05)
+        await pool.open()
+        served = []
+
+        async def query(label):
+            async with pool.acquire():
+                served.append(label)
+                await asyncio.sleep(0.01)
+
+        async with pool.acquire():
+            waiters = [asyncio.ensure_future(query(label)) for label in ("first", "second")]
+            await asyncio.sleep(0)
+            assert pool.stats()["waiting"] == 2
+        await asyncio.gather(*waiters)
+        assert served == ["first", "second"]
+
+        async with pool.acquire():
+            with pytest.raises(PoolTimeout):
+                async with pool.acquire():
+                    pass
+        stats = pool.stats()
+        assert (stats["timeouts"], stats["waiting"], stats["in_use"], stats["peak_in_use"]) == (1, 0, 0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_hot_queries_are_prepared_once_per_connection():
+    async def scenario():
+        driver = FakeDriver()
+        pool = make_pool(driver, pool_min_size=1, pool_max_size=1)
+        await pool.open()
+        for event_id in (1, 2, 3):
+            number, query, args = await pool.fetchrow_prepared("get_event_by_id", event_id)
+            assert (query, args) == (PREPARED_QUERIES["get_event_by_id"], (event_id,))
+        await pool.fetch_prepared("get_member_tasks", 7)
+        assert driver.connections[0].prepared == [PREPARED_QUERIES["get_event_by_id"], PREPARED_QUERIES["get_member_tasks"]]
+        assert pool.stats()["prepared_statements"] == 2
+        with pytest.raises(KeyError):
+            await pool.fetchrow_prepared("drop_everything")
+
+    asyncio.run(scenario())
+
+
+def test_closed_connection_is_replaced():
+    async def scenario():
+        driver = FakeDriver()
+        pool = make_pool(driver, pool_min_size=1, pool_max_size=1, acquire_timeout=0.5)
+        await pool.open()
+        waiter = None
+        async with pool.acquire() as connection:
+            waiter = asyncio.ensure_future(pool.fetchrow_prepared("get_event_by_id", 1))
+            await asyncio.sleep(0)
+            connection.closed = True  # e.g. the server restarted
+        number, _, _ = await waiter
+        assert number == 2
+        assert pool.stats()["size"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_passes_the_connection_on():
+    async def scenario():
+        pool = make_pool(FakeDriver(), pool_min_size=1, pool_max_size=1, acquire_timeout=1.0)
+        await pool.open()
+        async with pool.acquire():
+            first = asyncio.ensure_future(pool.fetchrow_prepared("get_event_by_id", 1))
+            second = asyncio.ensure_future(pool.fetchrow_prepared("get_event_by_id", 2))
+            await asyncio.sleep(0)
+        first.cancel()  # Handed the connection, but the client went away before it ran
+        await asyncio.gather(first, return_exceptions=True)
+        assert (await second)[2] == (2,)
+        assert pool.stats()["in_use"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_replica_reads_fall_back_to_the_primary():
+    async def scenario():
+        primary_driver, replica_driver = FakeDriver(), FakeDriver()
+        primary = make_pool(primary_driver, pool_min_size=1, pool_max_size=2)
+        replica = make_pool(replica_driver, "replica", fallback=primary, pool_min_size=1, pool_max_size=1,
+                            acquire_timeout=0.05)
+        await primary.open()
+
+        # Replica not open yet (down at startup): reads go to the primary
+        async with replica.acquire() as connection:
+            assert connection is primary_driver.connections[0]
+
+        await replica.open()
+        async with replica.acquire() as connection:
+            assert connection is replica_driver.connections[0]
+            # Replica saturated: the next read waits out the acquire timeout, then uses the primary
+            async with replica.acquire() as overflow:
+                assert overflow in primary_driver.connections
+        assert replica.stats()["fallbacks"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_pool_without_url_stays_closed():
+    async def scenario():
+        pool = DatabasePool(DatabaseSettings(), "primary")
+        await pool.open()
+        assert not pool.is_open
+        with pytest.raises(RuntimeError, match="not open"):
+            await pool.fetchrow_prepared("get_event_by_id", 1)
+
+    asyncio.run(scenario())
+
+
+def test_health_reports_the_pools(client):
+    body = client.get("/health").json()
+    assert body["status"] == "healthy"
+    assert body["saturated_pools"] == []
+    assert body["database_pools"]["primary"]["max_size"] == 10
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+
+
+@pytest.fixture(params=[False, True], ids=["validated", "fast_json"])
+def serialization(request, monkeypatch):
+    monkeypatch.setattr(main, "FAST_LIST_SERIALIZATION", request.param)
+
+
+def export(client, table, **params):
+    response = client.get(f"/api/v1/export/{table}", params=params)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == f'attachment; filename="{table}.ndjson"'
+    assert not response.text or response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def database():
+    return main.read_database_service._target
+
+
+def test_every_row_is_exported_as_one_line(client, serialization):
+    tables = database().tables
+    events = export(client, "events")
+    assert [event["id"] for event in events] == [event["id"] for event in tables["events"]]
+    assert set(events[0]) == set(main.EventResponse.__fields__)
+    members = export(client, "members")
+    assert len(members) == len(tables["members"])
+    assert set(members[0]) == set(main.MemberResponse.__fields__)
+    assert len(export(client, "attendance")) == len(tables["attendance"])
+
+
+def test_both_serializers_write_the_same_documents(client, monkeypatch):
+    monkeypatch.setattr(main, "FAST_LIST_SERIALIZATION", False)
+    validated = export(client, "events")
+    monkeypatch.setattr(main, "FAST_LIST_SERIALIZATION", True)
+    assert export(client, "events") == validated
+
+
+def test_export_filters(client):
+    tables = database().tables
+    event_id = tables["attendance"][0]["event_id"]
+    rows = export(client, "attendance", event_id=event_id)
+    assert rows and {row["event_id"] for row in rows} == {event_id}
+    assert len(rows) == sum(1 for record in tables["attendance"] if record["event_id"] == event_id)
+
+    attended = sorted(record["attended_at"] for record in tables["attendance"])
+    since = attended[len(attended) // 2]
+    rows = export(client, "attendance", attended_from=since.isoformat())
+    assert len(rows) == sum(1 for moment in attended if moment >= since)
+
+    future = (datetime.now() + timedelta(days=1)).isoformat()
+    assert export(client, "events", updated_since=future) == []
+    assert export(client, "members", updated_since=future) == []
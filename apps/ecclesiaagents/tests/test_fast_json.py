@@ -0,0 +1,76 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+import main
+from models import EventResponse
+from services import fast_json
+from services.fast_json import FastJSONResponse, dumps, project_rows
+
+
+class Color(Enum):
+    RED = "red"
+
+
+VALUES = {
+    "moment": datetime(2026, 6, 17, 9, 30, 5, 120000), "day": date(2026, 6, 17), "color": Color.RED,
+    "uuid": UUID("12345678-1234-5678-1234-567812345678"), "price": Decimal("2.50"), "text": "Café", 3: None,
+}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(fast_json, "orjson", None)
+
+
+def test_dumps_matches_jsonable_encoder(encoder):
+    encoded = dumps(VALUES)
+    assert json.loads(encoded) == json.loads(json.dumps(jsonable_encoder(VALUES)))  # Non-str keys become strings
+    assert b", " not in encoded and b": " not in encoded and "Café".encode() in encoded  # Compact UTF-8
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_project_rows_shapes_rows_like_the_model():
+    groups = [{"id": 1, "name": "Choir"}]
+    row = {
+        "id": 1, "title": "Service", "description": None, "start_date": datetime(2026, 6, 17, 9), "end_date": None,
+        "location": None, "status": "published", "max_attendees": None, "created_at": datetime(2026, 1, 1),
+        "updated_at": datetime(2026, 1, 1), "groups": groups, "group_ids": [1],
+    }
+    projected = project_rows([row], EventResponse)[0]
+    assert set(projected) == set(EventResponse.__fields__)  # group_ids dropped, attendees_count defaulted
+    assert projected["attendees_count"] == 0
+    assert projected["groups"] is groups
+    assert project_rows([row], EventResponse, {"id", "title", "unknown"}) == [{"id": 1, "title": "Service"}]
+
+
+def test_fast_json_response_renders_with_dumps(encoder):
+    response = FastJSONResponse(content=[{"at": datetime(2026, 6, 17, 9)}], headers={"X-Next-Cursor": "7"})
+    assert response.body == b'[{"at":"2026-06-17T09:00:00"}]'
+    assert (response.media_type, response.headers["x-next-cursor"]) == ("application/json", "7")
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/events?limit=20",
+    "/api/v1/events?limit=20&fields=id,title,groups",
+    "/api/v1/members?limit=20",
+    "/api/v1/groups?limit=20&fields=id,name,leader,members",
+    "/api/v1/tasks?limit=20&fields=id,status,member",
+])
+def test_fast_path_returns_the_validated_documents(client, monkeypatch, url):
+    monkeypatch.setattr(main, "FAST_LIST_SERIALIZATION", False)
+    validated = client.get(url)
+    monkeypatch.setattr(main, "FAST_LIST_SERIALIZATION", True)
+    fast = client.get(url)
+    assert validated.status_code == fast.status_code == 200
+    assert fast.json() == validated.json()
+    assert fast.headers.get("x-next-cursor") == validated.headers.get("x-next-cursor")
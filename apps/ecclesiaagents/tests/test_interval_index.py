@@ -0,0 +1,119 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from services.interval_index import EventConflictIndex, IntervalTree
+
+BASE = datetime(2027, 1, 3, 9, 0)
+
+
+def hours(offset):
+    return BASE + timedelta(hours=offset)
+
+
+def depth(node):
+    return 0 if node is None else 1 + max(depth(node.left), depth(node.right))
+
+
+def check_invariants(node):
+    """Binary-search order on (start, key), heap order on priority and correct max_end"""
+    if node is None:
+        return
+    for child in (node.left, node.right):
+        if child is not None:
+            assert child.priority <= node.priority
+            check_invariants(child)
+    if node.left is not None:
+        assert (node.left.start, node.left.key) < (node.start, node.key)
+    if node.right is not None:
+        assert (node.right.start, node.right.key) >= (node.start, node.key)
+    ends = [node.end] + [child.max_end for child in (node.left, node.right) if child is not None]
+    assert node.max_end == max(ends)
+
+
+def brute_force(intervals, start, end):
+    return sorted(key for key, (low, high) in intervals.items() if low < end and high > start)
+
+
+def test_overlap_queries_match_a_scan_through_inserts_and_removes():
+    rng = random.Random(7)
+    tree, intervals = IntervalTree(), {}
+    for key in range(500):
+        low = rng.randint(0, 5000)
+        intervals[key] = (low, low + rng.randint(1, 200))
+        tree.insert(*intervals[key], key, key)
+    for key in rng.sample(sorted(intervals), 200):
+        assert tree.remove(intervals.pop(key)[0], key)
+    assert len(tree) == 300
+    check_invariants(tree._root)
+    for _ in range(200):
+        start = rng.randint(0, 5200)
+        end = start + rng.randint(1, 300)
+        assert sorted(tree.overlapping(start, end)) == brute_force(intervals, start, end)
+
+
+def test_remove_missing_interval_is_a_no_op():
+    tree = IntervalTree()
+    tree.insert(1, 2, "a", "a")
+    assert not tree.remove(1, "b")
+    assert not tree.remove(5, "a")
+    assert len(tree) == 1
+    assert tree.remove(1, "a")
+    assert tree.overlapping(0, 10) == []
+
+
+def test_rotations_keep_the_tree_balanced_for_sorted_inserts():
+    tree = IntervalTree()
+    for key in range(2000):  # Sorted input degenerates an unbalanced BST into a list
+        tree.insert(key, key + 1, key, key)
+    check_invariants(tree._root)
+    assert depth(tree._root) < 60
+
+
+def test_touching_intervals_do_not_overlap():
+    tree = IntervalTree()
+    tree.insert(hours(0), hours(2), 1, "first service")
+    assert tree.overlapping(hours(2), hours(4)) == []
+    assert tree.overlapping(hours(-2), hours(0)) == []
+    assert tree.overlapping(hours(1), hours(3)) == ["first service"]
+
+
+def test_conflicts_by_location_and_group():
+    index = EventConflictIndex()
+    index.add({"id": 1, "title": "Service", "start_date": hours(0), "end_date": hours(2), "location": "Main Hall"})
+    index.add({"id": 2, "title": "Choir", "start_date": hours(1), "end_date": hours(3), "location": "Room 2", "group_ids": [7]})
+    index.add({"id": 3, "title": "Cancelled", "start_date": hours(0), "end_date": hours(2),
+               "location": "Main Hall", "status": "cancelled"})
+
+    found = index.find_conflicts({"start_date": hours(1), "end_date": hours(2), "location": " main hall ", "group_ids": [7]})
+    assert [(conflict["event_id"], conflict["reasons"]) for conflict in found] == [(1, ["location"]), (2, ["group:7"])]
+    assert index.find_conflicts({"start_date": hours(2), "location": "Main Hall"}) == []
+    index.remove(1)
+    assert index.find_conflicts({"start_date": hours(1), "location": "Main Hall"}) == []
+
+
+def test_aware_and_naive_start_dates_share_one_index():
+    index = EventConflictIndex()
+    aware = BASE.astimezone(timezone.utc)  # The same instant as BASE, with a time zone
+    index.add({"id": 1, "title": "Naive", "start_date": hours(0), "end_date": hours(2), "location": "Main Hall"})
+    index.add({"id": 2, "title": "Aware", "start_date": aware + timedelta(hours=4), "location": "Main Hall"})
+    index.add({"id": 3, "title": "ISO", "start_date": (aware + timedelta(hours=8)).isoformat().replace("+00:00", "Z"),
+               "location": "Main Hall"})
+
+    found = index.find_conflicts({"start_date": aware + timedelta(hours=1), "end_date": aware + timedelta(hours=9),
+                                  "location": "Main Hall"})
+    assert [conflict["event_id"] for conflict in found] == [1, 2, 3]
+    assert all(conflict["start_date"].tzinfo is None for conflict in found)
+
+
+def test_check_batch_reports_clashes_within_the_series():
+    index = EventConflictIndex()
+    index.add({"id": 1, "title": "Stored", "start_date": hours(0), "location": "Main Hall"})
+    proposals = [
+        {"title": "A", "start_date": "2027-01-03T09:30:00", "location": "Main Hall"},
+        {"title": "B", "start_date": "2027-01-03T13:00:00Z", "location": "Main Hall"},
+        {"title": "C", "start_date": "2027-01-03T13:30:00Z", "location": "Main Hall"},
+    ]
+    results = index.check_batch(proposals)
+    assert [conflict.get("event_id") for conflict in results[0]] == [1]
+    assert [conflict.get("proposal_index") for conflict in results[1]] == [2]
+    assert [conflict.get("proposal_index") for conflict in results[2]] == [1]
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from models import JobStatus
+from services.job_queue import JobQueue
+from tests.fakes import InMemoryDatabaseService
+
+
+def test_backlog_of_one_agent_does_not_hold_up_another():
+    async def scenario():
+        queue = JobQueue(InMemoryDatabaseService(), agent_limits={"content": 1, "calendar": 1})
+        await queue.start()
+        release = asyncio.Event()
+
+        async def slow(job):
+            await release.wait()
+            return {"agent": "content"}
+
+        async def fast(job):
+            return {"agent": "calendar"}
+
+        try:
+            content = [await queue.submit("content", "generate", "Poster", slow) for _ in range(3)]
+            calendar = await queue.submit("calendar", "create_event", "Sunday service", fast)
+            for _ in range(20):
+                await asyncio.sleep(0)
+            assert (await queue.get(calendar.id))["status"] == JobStatus.COMPLETED
+            stats = queue.stats()
+            assert (stats["running"], stats["queued_by_agent"]) == (1, {"content": 2, "calendar": 0})
+            assert stats["workers"] == 2
+            release.set()
+        finally:
+            await queue.stop(timeout=1.0)
+        assert all(job.status == JobStatus.COMPLETED for job in content)
+
+    asyncio.run(scenario())
+
+
+def test_agent_task_rows_follow_the_prisma_schema():
+    async def scenario():
+        database = InMemoryDatabaseService()
+        queue = JobQueue(database)
+        await queue.start()
+
+        async def succeed(job):
+            return {"id": 1}
+
+        async def fail(job):
+            raise RuntimeError("agent timed out")
+
+        try:
+            done = await queue.submit("onboarding", "onboard_member", "Onboard a@example.org", succeed)
+            failed = await queue.submit("onboarding", "onboard_member", "Onboard b@example.org", fail)
+        finally:
+            await queue.stop(timeout=1.0)
+
+        # Both rows belong to the one ONBOARDING agent, registered on first use
+        (agent,) = database.ai_agents.values()
+        assert agent["type"] == "ONBOARDING"
+        rows = [database.agent_tasks[job.id] for job in (done, failed)]
+        assert [row["agent_id"] for row in rows] == [agent["id"], agent["id"]]
+        assert [row["status"] for row in rows] == ["COMPLETED", "FAILED"]
+
+        # Once the queue has forgotten the jobs, the rows answer in the JobResponse shape
+        queue._jobs.clear()
+        record = await queue.get(failed.id)
+        assert (record["agent"], record["status"], record["error"], record["result"]) == (
+            "onboarding", JobStatus.FAILED, "agent timed out", None,
+        )
+        assert (await queue.get(done.id))["result"] == {"id": 1}
+        assert await queue.get("missing") is None
+
+    asyncio.run(scenario())
+
+
+def test_fake_rejects_rows_the_schema_would_reject():
+    async def scenario():
+        database = InMemoryDatabaseService()
+        with pytest.raises(ValueError, match="foreign key"):
+            await database.create_agent_task({"agent_id": "calendar", "type": "t", "description": "d", "status": "PENDING"})
+        agent = await database.create_ai_agent({"name": "Calendar Agent", "type": "CALENDAR", "capabilities": []})
+        with pytest.raises(ValueError, match="TaskStatus"):
+            await database.create_agent_task({"agent_id": agent["id"], "type": "t", "description": "d", "status": "pending"})
+
+    asyncio.run(scenario())
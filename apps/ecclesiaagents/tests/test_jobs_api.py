@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta
+
+
+def poll_job(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_background_create_event_returns_job_and_completes(client):
+    start = datetime.now() + timedelta(days=14)
+    response = client.post("/api/v1/events?background=true", json={
+        "title": "Youth retreat", "start_date": start.isoformat(), "location": "Retreat center",
+    })
+    assert response.status_code == 202
+    accepted = response.json()
+    assert accepted["agent"] == "calendar"
+    assert accepted["status"] in ("pending", "running", "completed")
+
+    job = poll_job(client, accepted["id"])
+    assert job["status"] == "completed", job
+    assert job["result"]["title"] == "Youth retreat"
+
+
+def test_background_create_member_returns_job_and_completes(client):
+    response = client.post("/api/v1/members?background=true", json={"name": "New Member", "email": "new.member@example.org"})
+    assert response.status_code == 202
+    job = poll_job(client, response.json()["id"])
+    assert job["status"] == "completed", job
+    assert job["result"]["email"] == "new.member@example.org"
+    steps = {event["step"]: event["status"] for event in job["progress"] if event["type"] == "step"}
+    assert steps == {"member": "completed", "record": "completed"}
+    assert set(job["result"]["workflow"]["timings"]) == {"member", "record"}
+
+
+def test_create_member_makes_one_agent_call(client):
+    import main
+
+    agents = main.agent_service.load()
+    calls = agents.calls
+    response = client.post("/api/v1/members", json={"name": "Single Call", "email": "single.call@example.org"})
+    assert response.status_code == 200
+    # onboard_new_member already produces the welcome materials; nothing generates them a second time
+    assert agents.calls == calls + 1
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/v1/jobs/does-not-exist").status_code == 404
+
+
+def test_openapi_documents_the_202_job_response(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    for path in ("/api/v1/events", "/api/v1/members"):
+        accepted = paths[path]["post"]["responses"]["202"]
+        assert accepted["content"]["application/json"]["schema"]["$ref"].endswith("/JobResponse")
+
+
+def test_create_event_with_aware_start_date_reports_conflicts(client):
+    first = client.post("/api/v1/events", json={
+        "title": "Easter sunrise", "start_date": "2031-04-13T06:00:00Z", "end_date": "2031-04-13T08:00:00Z",
+        "location": "Hall 1",  # Seeded events there have naive start dates
+    })
+    assert first.status_code == 200, first.text
+    assert first.json()["conflicts"] == []
+
+    second = client.post("/api/v1/events", json={
+        "title": "Easter breakfast", "start_date": "2031-04-13T07:00:00+00:00", "location": "hall 1",
+    })
+    assert second.status_code == 200, second.text
+    conflicts = second.json()["conflicts"]
+    assert [(conflict["event_id"], conflict["reasons"]) for conflict in conflicts] == [(first.json()["id"], ["location"])]
+
+    response = client.post("/api/v1/events/conflicts", json={"events": [
+        {"title": "Easter egg hunt", "start_date": "2031-04-13T07:30:00Z", "location": "Hall 1"},
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["total_conflicting"] == 1
+
+
+def test_background_create_event_with_aware_start_date(client):
+    response = client.post("/api/v1/events?background=true", json={
+        "title": "Advent concert", "start_date": "2031-12-07T18:00:00Z", "location": "Hall 2",
+    })
+    assert response.status_code == 202
+    job = poll_job(client, response.json()["id"])
+    assert job["status"] == "completed", job
@@ -0,0 +1,50 @@
+import pytest
+
+import main
+from services.relation_loader import Relation, relation_columns
+
+
+def test_relation_columns_adds_the_keys_of_requested_relations():
+    relations = [Relation("leader", "members_by_id", key="leader_id"), Relation("members", "members")]
+    assert relation_columns(None, relations) is None
+    assert relation_columns({"id", "name"}, relations) == {"id", "name"}
+    assert relation_columns({"id", "leader"}, relations) == {"id", "leader", "leader_id"}
+
+
+@pytest.fixture(params=[False, True], ids=["validated", "fast_json"])
+def serialization(request, monkeypatch):
+    monkeypatch.setattr(main, "FAST_LIST_SERIALIZATION", request.param)
+
+
+def test_group_projection_embeds_the_leader(client, serialization):
+    response = client.get("/api/v1/groups?fields=id,leader&limit=5")
+    assert response.status_code == 200, response.text
+    groups = response.json()
+    assert groups
+    leaders = {group["id"]: group["leader_id"] for group in main.read_database_service._target.tables["groups"]}
+    for group in groups:
+        assert set(group) == {"id", "leader"}  # leader_id was selected for the join, not returned
+        assert (group["leader"] or {}).get("id") == leaders[group["id"]]  # Groups created without a leader embed None
+
+
+def test_task_projection_embeds_the_member(client, serialization):
+    response = client.get("/api/v1/tasks?fields=member&limit=5")
+    assert response.status_code == 200, response.text
+    tasks = response.json()
+    assert tasks
+    for task in tasks:
+        assert set(task) == {"id", "member"}
+        assert task["member"] is not None and task["member"]["name"]
+
+
+def test_projection_without_relations_and_cursor(client):
+    first = client.get("/api/v1/events?fields=id,title&limit=3")
+    assert first.status_code == 200
+    assert all(set(event) == {"id", "title"} for event in first.json())
+    cursor = first.headers["X-Next-Cursor"]
+    following = client.get(f"/api/v1/events?fields=id,title&limit=3&after={cursor}").json()
+    assert following[0]["id"] > int(cursor)
+
+
+def test_unknown_projection_field_is_rejected(client):
+    assert client.get("/api/v1/groups?fields=id,leader_id").status_code == 400
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from models import MemberRole
+from services.member_import import MemberImportError, candidate_emails, parse_member_rows, validate_member_rows
+
+
+def test_csv_rows_are_parsed_with_groups_and_empty_cells_dropped():
+    body = "\ufeffname,email,phone,role,group_ids\nAda,Ada@Example.org,,leader,1; 2\nBen,ben@example.org,555,,\n"
+    rows = parse_member_rows(body.encode("utf-8"), "text/csv; charset=utf-8")
+    assert rows == [
+        {"name": "Ada", "email": "Ada@Example.org", "role": "leader", "group_ids": ["1", "2"]},
+        {"name": "Ben", "email": "ben@example.org", "phone": "555", "group_ids": []},
+    ]
+    assert candidate_emails(rows) == {"ada@example.org", "ben@example.org"}
+
+
+def test_json_upload_must_be_an_array():
+    rows = [{"name": "Ada", "email": "ada@example.org"}]
+    assert parse_member_rows(json.dumps(rows).encode(), "application/json") == rows
+    with pytest.raises(MemberImportError, match="array"):
+        parse_member_rows(b'{"name": "Ada"}', "application/json")
+    with pytest.raises(MemberImportError, match="Invalid JSON"):
+        parse_member_rows(b"[{", "application/json")
+
+
+@pytest.mark.parametrize("body, content_type, message", [
+    ("name,email\nJosé,jose@example.org\n".encode("latin-1"), "text/csv", "not UTF-8"),
+    (b"", "text/csv", "no header"),
+    (b"name,email\n" + b"x" * 200000 + b",big@example.org\n", "text/csv", "Invalid CSV"),
+])
+def test_unreadable_uploads_raise_member_import_error(body, content_type, message):
+    with pytest.raises(MemberImportError, match=message):
+        parse_member_rows(body, content_type)
+
+
+def test_validation_reports_bad_rows_and_duplicate_emails():
+    rows = [
+        {"name": "Ada", "email": "Ada@Example.org", "group_ids": ["1"]},
+        {"name": "", "email": "not-an-email"},
+        {"name": "Ada again", "email": "ada@example.org"},
+        {"name": "Existing", "email": "member1@example.org"},
+        "not a row",
+        {"name": "Ben", "email": "ben@example.org", "role": "visitor"},
+    ]
+    valid, errors, duplicates = validate_member_rows(rows, {"member1@example.org"})
+    assert [(row, member.email) for row, member in valid] == [(1, "ada@example.org"), (6, "ben@example.org")]
+    assert valid[0][1].group_ids == [1]
+    assert valid[1][1].role == MemberRole.VISITOR
+    assert duplicates == 2
+    assert [(error["row"], error["email"]) for error in errors] == [
+        (2, "not-an-email"), (3, "ada@example.org"), (4, "member1@example.org"), (5, None),
+    ]
+    assert "name" in errors[0]["error"] and "email" in errors[0]["error"]
+    assert errors[1]["error"] == "Duplicate email"
+
+
+def test_import_endpoint_imports_valid_rows_and_reports_the_rest(client):
+    body = (
+        "name,email,role,group_ids\n"
+        "Import One,import-one@example.org,member,1\n"
+        "Bad Row,not-an-email,member,\n"
+        "Import Two,IMPORT-TWO@example.org,visitor,\n"
+        "Existing,member1@example.org,member,\n"
+        "Import One Again,import-one@example.org,member,\n"
+    )
+    response = client.post("/api/v1/members/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total_rows"], report["imported"], report["duplicates"], report["failed"]) == (5, 2, 2, 1)
+    assert [(error["row"], error["error"] == "Duplicate email") for error in report["errors"]] == [
+        (2, False), (4, True), (5, True),
+    ]
+    assert report["onboarding_job_id"]
+
+    # The same upload again: everything is now a duplicate and no job is queued
+    report = client.post("/api/v1/members/import", content=body, headers={"Content-Type": "text/csv"}).json()
+    assert (report["imported"], report["duplicates"], report["onboarding_job_id"]) == (0, 4, None)
+
+
+def test_import_endpoint_rejects_non_utf8_uploads(client):
+    body = "name,email\nJosé,jose@example.org\n".encode("latin-1")
+    response = client.post("/api/v1/members/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 400
+    assert "UTF-8" in response.json()["detail"]
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from services.metrics import Histogram, MetricsRegistry, TracedService, metrics, span_breakdown, start_trace
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(seconds)
+    assert (histogram.counts, histogram.count, histogram.total) == ([1, 2], 4, 6.05)
+    assert histogram.quantiles() == {0.5: 0.5, 0.95: 5.0, 0.99: 5.0}
+    assert Histogram().quantiles() == {0.5: 0.0, 0.95: 0.0, 0.99: 0.0}
+
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    registry.observe_request("GET", "/api/v1/events/{event_id}", 200, 0.02)
+    registry.observe_request("GET", "/api/v1/events/{event_id}", 404, 0.2)
+    registry.observe_span("db", 'get_"event"', 0.004)
+    lines = registry.render_prometheus().splitlines()
+
+    request = 'method="GET",route="/api/v1/events/{event_id}"'
+    assert "# TYPE ecclesiaflow_http_request_duration_seconds histogram" in lines
+    assert f'ecclesiaflow_http_request_duration_seconds_bucket{{{request},le="0.01"}} 0' in lines
+    assert f'ecclesiaflow_http_request_duration_seconds_bucket{{{request},le="0.025"}} 1' in lines  # Cumulative
+    assert f'ecclesiaflow_http_request_duration_seconds_bucket{{{request},le="+Inf"}} 2' in lines
+    assert f"ecclesiaflow_http_request_duration_seconds_sum{{{request}}} 0.220000" in lines
+    assert f'ecclesiaflow_http_request_duration_quantile_seconds{{{request},quantile="0.5"}} 0.200000' in lines
+    assert f'ecclesiaflow_http_responses_total{{{request},status="404"}} 1' in lines
+    assert 'ecclesiaflow_span_duration_seconds_count{kind="db",name="get_\\"event\\""} 1' in lines
+
+
+class Service:
+    label = "not wrapped"
+
+    async def fetch(self, value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    async def fail(self):
+        raise ValueError("boom")
+
+    async def rows(self):
+        for value in range(3):
+            yield value
+
+
+def test_traced_service_records_spans_and_calls():
+    calls = []
+
+    async def on_call(name, succeeded):
+        calls.append((name, succeeded))
+
+    service = TracedService(Service(), "test_traced", on_call=on_call)
+
+    async def scenario():
+        with start_trace() as spans:
+            assert await service.fetch(21) == 42
+            assert [row async for row in service.rows()] == [0, 1, 2]
+            with pytest.raises(ValueError):
+                await service.fail()
+        return spans
+
+    spans = asyncio.run(scenario())
+    assert service.label == "not wrapped"
+    assert [(recorded["kind"], recorded["name"]) for recorded in spans] == [
+        ("test_traced", "fetch"), ("test_traced", "rows"), ("test_traced", "fail"),
+    ]
+    assert calls == [("fetch", True), ("rows", True), ("fail", False)]
+    assert metrics.spans[("test_traced", "fetch")].count == 1
+
+    breakdown = span_breakdown(spans, spans[0]["started"], total_ms=1000.0)
+    assert set(breakdown["by_kind_ms"]) == {"test_traced"}
+    assert breakdown["other_ms"] == round(1000.0 - breakdown["by_kind_ms"]["test_traced"], 2)
+    assert breakdown["spans"][0]["offset_ms"] == 0.0
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client):
+    assert client.get("/api/v1/events/1").status_code == 200
+    body = client.get("/metrics").text
+    assert 'route="/api/v1/events/{event_id}"' in body
+    assert 'route="/api/v1/events/1"' not in body
+    assert 'kind="db",name="get_event_by_id"' in body or 'kind="db_replica",name="get_event_by_id"' in body
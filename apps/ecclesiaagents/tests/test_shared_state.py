@@ -0,0 +1,185 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from services.shared_state import (
+    ChangeFeed,
+    MemorySharedState,
+    SharedState,
+    SQLiteSharedState,
+    shared_state_from_url,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return lambda: MemorySharedState()
+    return lambda: SQLiteSharedState(str(tmp_path / "state.db"))
+
+
+async def wait_until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_incomplete_backend_fails_on_creation():
+    class CountersOnly(SharedState):
+        async def incr(self, key, amount=1):
+            return amount
+
+    with pytest.raises(TypeError, match="abstract"):
+        CountersOnly()
+
+
+def test_url_picks_backend(tmp_path):
+    assert shared_state_from_url("memory://").name == "memory"
+    assert shared_state_from_url(f"sqlite:///{tmp_path / 'state.db'}").name == "sqlite"
+    with pytest.raises(ValueError):
+        shared_state_from_url("postgres://localhost/state")
+
+
+def test_round_trip(backend):
+    async def scenario():
+        state = backend()
+        try:
+            assert await state.incr("jobs:completed") == 1
+            assert await state.incr("jobs:completed", 2) == 3
+            await state.incr("jobs_failed")  # "_" is not a wildcard for the prefix scan
+            assert await state.counters("jobs:") == {"jobs:completed": 3}
+
+            snapshot = {"status": "completed", "created_at": datetime(2031, 3, 1, 9, 30), "progress": [1, 2]}
+            await state.set("job:1", snapshot)
+            assert await state.get("job:1") == snapshot
+            assert isinstance((await state.get("job:1"))["created_at"], datetime)
+            await state.set("job:2", {"status": "pending"}, ttl=0.05)
+            assert await state.get("job:2") == {"status": "pending"}
+            await asyncio.sleep(0.1)
+            assert await state.get("job:2") is None
+            assert await state.get("job:missing") is None
+
+            assert await state.take_token("agent_rate:content", rate=1.0, burst=2) == 0
+            assert await state.take_token("agent_rate:content", rate=1.0, burst=2) == 0
+            assert await state.take_token("agent_rate:content", rate=1.0, burst=2) > 0
+
+            start = await state.cursor("changes")
+            for number in range(5):
+                await state.publish("changes", {"n": number})
+            await state.publish("other", {"n": -1})
+            messages, after = await state.read("changes", start, limit=3)
+            assert messages == [{"n": 0}, {"n": 1}, {"n": 2}]
+            messages, after = await state.read("changes", after)
+            assert messages == [{"n": 3}, {"n": 4}]
+            assert await state.read("changes", after) == ([], after)
+        finally:
+            await state.close()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_state_is_shared_between_connections(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "state.db")
+        first, second = SQLiteSharedState(path), SQLiteSharedState(path)
+        try:
+            await first.incr("jobs:completed")
+            await second.incr("jobs:completed")
+            await first.set("job:1", {"status": "running"})
+            assert await second.counters("jobs:") == {"jobs:completed": 2}
+            assert await second.get("job:1") == {"status": "running"}
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(scenario())
+
+
+def test_change_feed_delivers_changes_between_workers(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "state.db")
+        states = [SQLiteSharedState(path), SQLiteSharedState(path)]
+        applied = [[], []]
+
+        def applier(index):
+            async def apply(kind, payload):
+                applied[index].append((kind, payload))
+            return apply
+
+        feeds = [ChangeFeed(state, applier(index), poll_interval=0.01) for index, state in enumerate(states)]
+        loaded = asyncio.Event()
+
+        async def ready():
+            await loaded.wait()
+
+        try:
+            for feed in feeds:
+                await feed.start(ready)
+            start_date = datetime(2031, 3, 1, 9, 30)
+            await feeds[0].publish("event_created", {"id": 7, "start_date": start_date})
+            await feeds[1].publish("member_created", {"id": 3})
+            await asyncio.sleep(0.05)
+            assert applied == [[], []]  # Nothing is applied before the worker has loaded its data
+
+            loaded.set()
+            await wait_until(lambda: applied[0] and applied[1])
+            assert applied[0] == [("member_created", {"id": 3})]
+            assert applied[1] == [("event_created", {"id": 7, "start_date": start_date})]
+            assert feeds[0].stats()["published"] == 1
+            assert feeds[0].stats()["applied"] == 1
+        finally:
+            for feed in feeds:
+                await feed.stop()
+            for state in states:
+                await state.close()
+
+    asyncio.run(scenario())
+
+
+def test_change_feed_counts_failed_changes_and_keeps_going(tmp_path):
+    async def scenario():
+        state = SQLiteSharedState(str(tmp_path / "state.db"))
+        applied = []
+
+        async def apply(kind, payload):
+            if payload["id"] == 1:
+                raise ValueError("bad change")
+            applied.append(payload["id"])
+
+        reader = ChangeFeed(state, apply, poll_interval=0.01)
+        writer = ChangeFeed(state, apply, poll_interval=0.01)
+        await reader.start()
+        try:
+            await writer.publish("event_updated", {"id": 1})
+            await writer.publish("event_updated", {"id": 2})
+            await wait_until(lambda: applied)
+            assert applied == [2]
+            assert reader.stats()["failed"] == 1
+        finally:
+            await reader.stop()
+            await state.close()
+
+    asyncio.run(scenario())
+
+
+def test_change_feed_is_inert_over_the_memory_backend():
+    async def scenario():
+        state = MemorySharedState()
+        applied = []
+
+        async def apply(kind, payload):
+            applied.append(payload)
+
+        feed = ChangeFeed(state, apply, poll_interval=0.01)
+        await feed.start()
+        try:
+            await feed.publish("event_created", {"id": 1})
+            assert feed._task is None  # Nothing polls
+            assert await state.read("changes", 0) == ([], 0)  # Nothing is kept for readers that do not exist
+            assert (feed.stats()["active"], feed.stats()["published"]) == (False, 0)
+        finally:
+            await feed.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from agents.dag_executor import WorkflowStep
+from services.warmup import LazyService, StartupWarmUp
+
+
+def test_lazy_service_builds_on_first_use_only_once():
+    built = []
+
+    def factory():
+        built.append(1)
+        return {"agents": ["calendar"]}
+
+    service = LazyService(factory, "agents")
+    assert not service.loaded and not built
+    assert service.get("agents") == ["calendar"]
+    assert service.load() is service.load()
+    assert service.loaded and len(built) == 1
+
+
+def test_wait_returns_when_required_steps_finish_not_optional_ones():
+    release_agents = None
+
+    async def connect(_):
+        await asyncio.sleep(0.01)
+
+    async def load_agents(_):
+        await release_agents.wait()
+
+    async def scenario():
+        nonlocal release_agents
+        release_agents = asyncio.Event()
+        warmup = StartupWarmUp([
+            WorkflowStep("db", connect),
+            WorkflowStep("agents", load_agents, depends_on=["db"], required=False),
+        ], step_timeout=5)
+        warmup.start()
+        ready = await warmup.wait(timeout=1)
+        agents_pending = "agents" not in warmup.steps
+        release_agents.set()
+        await warmup.stop()
+        return ready, agents_pending, warmup.status()
+
+    ready, agents_pending, status = asyncio.run(scenario())
+    assert ready and agents_pending
+    assert status["state"] == "ready" and status["required_steps"] == ["db"]
+
+
+def test_failed_required_step_leaves_worker_not_ready():
+    async def broken(_):
+        raise ConnectionError("database unreachable")
+
+    async def scenario():
+        warmup = StartupWarmUp([WorkflowStep("db", broken)], step_timeout=5)
+        warmup.start()
+        return await warmup.wait(timeout=1), warmup.status()
+
+    ready, status = asyncio.run(scenario())
+    assert not ready
+    assert status["state"] == "failed" and "database unreachable" in status["error"]
+
+
+def test_liveness_and_readiness_probes(client):
+    assert client.get("/health/live").json()["status"] == "alive"
+    deadline = time.monotonic() + 5
+    while client.get("/health/ready").status_code != 200:
+        assert time.monotonic() < deadline, "worker never became ready"
+        time.sleep(0.02)
+    assert client.get("/health/ready").json()["warmup"]["state"] == "ready"
@@ -0,0 +1,9 @@
+-- Agent jobs that fail are recorded as FAILED instead of staying IN_PROGRESS.
+-- Guarded so it also runs on a database created later with `prisma db push`.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_type WHERE typname = 'TaskStatus') THEN
+    ALTER TYPE "TaskStatus" ADD VALUE IF NOT EXISTS 'FAILED';
+  END IF;
+END
+$$;
@@ -123,7 +123,8 @@ export interface User {
     PENDING = 'PENDING',
     IN_PROGRESS = 'IN_PROGRESS',
     COMPLETED = 'COMPLETED',
-    SKIPPED = 'SKIPPED'
+    SKIPPED = 'SKIPPED',
+    FAILED = 'FAILED'
   }
   
   // AI Agent Types